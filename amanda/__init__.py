@@ -0,0 +1,16 @@
+# The runtime is imported on first use, so running a program with
+# 'python -m amanda' doesn't load the compiler when it isn't needed
+_EXPORTS = {
+    "AmandaRuntime": "amanda.runtime",
+    "CompileResult": "amanda.runtime",
+    "MemoryResolver": "amanda.compiler.imports",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        from importlib import import_module
+
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'amanda' has no attribute '{name}'")
@@ -1,16 +1,13 @@
 import argparse
+import multiprocessing
 import time
 from io import StringIO
 import os
 import sys
 import subprocess
 from os import path
-from amanda.compiler.symbols.core import Module
 from amanda.compiler.error import AmandaError, handle_exception, throw_error
-from amanda.compiler.parse import parse
-from amanda.compiler.compile import Generator
-from amanda.compiler.check.core import Analyzer
-from amanda.compiler.codegen import ByteGen
+from amanda.compiler import cache
 from amanda.libamanda import run_module
 
 
@@ -19,37 +16,83 @@ def write_file(name, code):
         output.write(code)
 
 
-def run_frontend(filename) -> tuple:
+def run_frontend(filename, jobs: int = 1) -> tuple:
+    # The compiler is only imported when a program has to be compiled,
+    # so runs that hit the cache don't pay for loading it
+    from amanda.compiler.symbols.core import Module
+    from amanda.compiler.check.core import Analyzer
+
     try:
-        program = parse(filename)
-        valid_program = Analyzer(filename, [], Module(filename)).visit_module(
-            program
-        )
-        return valid_program
+        analyzer = Analyzer(filename, [], Module(filename))
+        program = analyzer.load_program(workers=jobs)
+        module, imports = analyzer.visit_module(program)
+        return module, imports, analyzer.import_map
     except AmandaError as e:
         throw_error(e)
 
 
-def run_file(args):
-    module, imports = run_frontend(args.file)
+def compile_file(args) -> bytes:
+    use_cache = not (args.debug or args.no_cache)
+    if use_cache:
+        bin_obj = cache.load(args.file)
+        if bin_obj is not None:
+            return bin_obj
+
+    from amanda.compiler.codegen import ByteGen
+
+    module, imports, import_map = run_frontend(args.file, args.jobs)
     compiler = ByteGen(module)
-    bin_obj = compiler.compile(imports)
+    try:
+        bin_obj = compiler.compile(imports)
+    except AmandaError as e:
+        throw_error(e)
 
     if args.debug:
         write_file("debug.amasm", compiler.make_debug_asm())
+    if use_cache:
+        cache.store(args.file, imports.keys(), bin_obj, import_map)
+    return bin_obj
 
+
+def run_file(args):
+    bin_obj = compile_file(args)
     exit_code = run_module(bin_obj)
     if exit_code != 0:
         sys.exit(exit_code)
 
 
 def main(*args):
+    argv = list(args) if len(args) else sys.argv[1:]
+    if argv[:1] == ["build"]:
+        from amanda.build import main as build_main
+
+        sys.exit(build_main(argv[1:]))
+    if argv[:1] == ["check"]:
+        from amanda.check import main as check_main
+
+        sys.exit(check_main(argv[1:]))
+
     parser = argparse.ArgumentParser()
 
     parser.add_argument(
         "-d", "--debug", help="Generate a debug amasm file", action="store_true"
     )
 
+    parser.add_argument(
+        "--no-cache",
+        help="Do not read or write the compilation cache",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to parse the imports of the "
+        "program, 1 by default",
+    )
+
     parser.add_argument("file", help="source file to be executed")
 
     if len(args):
@@ -64,4 +107,8 @@ def main(*args):
 
 
 if __name__ == "__main__":
+    # In the bundled executable, the worker processes used to parse
+    # imports and to check programs are started by running the
+    # executable again. This makes those runs act as workers.
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,203 @@
+"""
+Incremental builds of amanda programs.
+
+'python -m amanda build <paths>' compiles every program found in the
+given files and dirs into the compilation cache, so that running them
+afterwards skips compilation entirely.
+
+The build keeps a manifest in the cache dir of the current dir. It
+records the hashes of the sources each program was built from: its
+own and those of every module it imports, directly or not. On the
+next build, a program is only compiled again if one of those sources
+or the compiler changed. As imports are resolved
+relative to the cwd, it is also compiled again when built from another
+cwd or when one of its imports would resolve to another module.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from os import path
+from typing import Optional
+from amanda.compiler import cache
+from amanda.compiler.error import AmandaError, report_error
+from amanda.compiler.resolve import same_resolution
+
+MANIFEST = path.join(cache.CACHE_DIR, "manifest.json")
+
+
+def empty_manifest() -> dict:
+    return {"version": cache.compiler_version(), "programs": {}}
+
+
+def load_manifest(filename: str) -> dict:
+    try:
+        with open(filename, encoding="utf8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return empty_manifest()
+    if manifest.get("version") != cache.compiler_version():
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(filename: str, manifest: dict):
+    os.makedirs(path.dirname(filename) or ".", exist_ok=True)
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    os.replace(tmp, filename)
+
+
+def find_programs(paths: list[str]) -> list[str]:
+    """Every '.ama' file in 'paths'. Dirs are searched recursively."""
+    programs = []
+    for target in paths:
+        if not path.isdir(target):
+            programs.append(path.abspath(target))
+            continue
+        for root, dirs, files in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if d != cache.CACHE_DIR)
+            programs.extend(
+                path.abspath(path.join(root, filename))
+                for filename in sorted(files)
+                if filename.endswith(".ama")
+            )
+    return programs
+
+
+class Builder:
+    def __init__(self, paths: list[str], manifest: str = MANIFEST):
+        self.paths = paths
+        self.manifest_path = manifest
+        self.manifest = load_manifest(manifest)
+        # Hashes of the sources read during the current build
+        self.hashes: dict[str, Optional[str]] = {}
+
+    def source_hash(self, filename: str) -> Optional[str]:
+        if filename not in self.hashes:
+            try:
+                self.hashes[filename] = cache.source_hash(filename)
+            except OSError:
+                self.hashes[filename] = None
+        return self.hashes[filename]
+
+    def is_up_to_date(self, program: str) -> bool:
+        entry = self.manifest["programs"].get(program, {})
+        sources = entry.get("sources")
+        if sources is None or not path.exists(cache.cache_path(program)):
+            return False
+        if not same_resolution(entry["cwd"], entry["imports"]):
+            return False
+        return all(
+            self.source_hash(src) == src_hash
+            for src, src_hash in sources.items()
+        )
+
+    def compile(self, program: str):
+        """Compiles a program into the cache and records its imports
+        in the manifest."""
+        # Imported lazily so that up to date builds don't load the compiler
+        from amanda.compiler.check.core import Analyzer
+        from amanda.compiler.codegen import ByteGen
+        from amanda.compiler.module import Module
+
+        analyzer = Analyzer(program, [], Module(program))
+        module, imports = analyzer.visit_module(analyzer.load_program())
+        bin_obj = ByteGen(module).compile(imports)
+        cache.store(program, imports.keys(), bin_obj, analyzer.import_map)
+
+        # Programs keep their own copy of the hashes, as a module shared
+        # by several programs may change between their builds
+        sources = {src: self.source_hash(src) for src in [program, *imports]}
+        self.manifest["programs"][program] = {
+            "sources": sources,
+            "cwd": os.getcwd(),
+            "imports": analyzer.import_map,
+        }
+
+    def build(self) -> int:
+        """Builds all the programs that changed since the last build.
+        Returns the number of programs that failed to compile."""
+        self.hashes = {}
+        built = up_to_date = failed = 0
+        for program in find_programs(self.paths):
+            if self.is_up_to_date(program):
+                up_to_date += 1
+                continue
+            try:
+                self.compile(program)
+                built += 1
+                print(f"Built {path.relpath(program)}")
+            except (AmandaError, OSError, UnicodeDecodeError) as e:
+                # Build it again next time, even if nothing changes
+                self.manifest["programs"].pop(program, None)
+                if isinstance(e, AmandaError):
+                    report_error(e)
+                else:
+                    sys.stderr.write(
+                        f"\nErro ao ler '{path.relpath(program)}': {e}\n"
+                    )
+                failed += 1
+        save_manifest(self.manifest_path, self.manifest)
+        print(f"{built} built, {up_to_date} up to date, {failed} failed")
+        return failed
+
+    def mtimes(self) -> dict[str, float]:
+        """Modification times of the programs being built and of all
+        the modules they import."""
+        files = set(find_programs(self.paths))
+        for entry in self.manifest["programs"].values():
+            files.update(entry["sources"])
+        stamps = {}
+        for filename in files:
+            try:
+                stamps[filename] = os.stat(filename).st_mtime
+            except OSError:
+                continue
+        return stamps
+
+    def watch(self, interval: float):
+        """Rebuilds whenever a program or one of its imports changes."""
+        while True:
+            # Taken before building, so that a change saved while the
+            # build runs is still seen as a change afterwards
+            stamps = self.mtimes()
+            self.build()
+            while self.mtimes() == stamps:
+                time.sleep(interval)
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="amanda build",
+        description="Compiles programs ahead of time, only rebuilding "
+        "the ones that changed since the last build",
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="source files or dirs with source files"
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        help="Keep running and rebuild when sources change",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks for changes in watch mode",
+    )
+    args = parser.parse_args(args)
+
+    builder = Builder(args.paths)
+    if not args.watch:
+        return 1 if builder.build() else 0
+    try:
+        builder.watch(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
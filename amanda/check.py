@@ -0,0 +1,170 @@
+"""
+Batch type checking of amanda programs.
+
+'python -m amanda check <paths>' runs the front end of the compiler
+(parsing and analysis) on every program found in the given files, dirs
+and glob patterns, without generating code or running anything. The
+programs are checked across a pool of processes, each of which
+analyses the builtin module only once.
+
+The results are written to stdout as a json report with the errors
+found in each program and the time it took to check it. The exit code
+is 0 if every program is valid, 1 if some program has errors and 2 if
+the checker itself failed on some program.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob, has_magic
+from os import path
+from typing import Optional
+from amanda.build import find_programs
+from amanda.compiler.error import AmandaError
+
+# Checking fewer programs than this is not worth the cost
+# of starting worker processes
+MIN_PARALLEL_PROGRAMS = 8
+
+ERROR_KINDS = {
+    AmandaError.SYNTAX_ERR: "syntax",
+    AmandaError.COMMON_ERR: "semantic",
+    AmandaError.RUNTIME_ERR: "runtime",
+}
+
+
+def expand_paths(paths: list[str]) -> list[str]:
+    """Every '.ama' file in 'paths', which may be files, dirs or glob
+    patterns. Each file is only listed once."""
+    targets = []
+    for target in paths:
+        if has_magic(target):
+            targets.extend(
+                match
+                for match in sorted(glob(target, recursive=True))
+                if path.isdir(match) or match.endswith(".ama")
+            )
+        else:
+            targets.append(target)
+    return list(dict.fromkeys(find_programs(targets)))
+
+
+def diagnostic(error: AmandaError) -> dict:
+    return {
+        "kind": ERROR_KINDS[error.err_type],
+        "file": error.fpath,
+        "line": error.line,
+        "col": error.col,
+        "message": error.message,
+    }
+
+
+def check_program(program: str) -> dict:
+    """Parses and analyses a program, returning its entry in the
+    report."""
+    # Imported here so that the main process doesn't load the compiler
+    # when the programs are checked by workers
+    from amanda.compiler.check.core import Analyzer
+    from amanda.compiler.module import Module
+
+    start = time.perf_counter()
+    errors = []
+    try:
+        analyzer = Analyzer(program, [], Module(program))
+        analyzer.visit_module(analyzer.load_program())
+    except AmandaError as e:
+        errors.append(diagnostic(e))
+    except (OSError, UnicodeDecodeError) as e:
+        errors.append({"kind": "read", "file": program, "message": str(e)})
+    except Exception as e:
+        errors.append(
+            {
+                "kind": "internal",
+                "file": program,
+                "message": f"{type(e).__name__}: {e}",
+            }
+        )
+    return {
+        "file": program,
+        "ok": not errors,
+        "errors": errors,
+        "time_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def check_programs(programs: list[str], jobs: Optional[int] = None) -> dict:
+    """Checks every program, in parallel if there are enough of them,
+    and returns the report."""
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs < 2 or len(programs) < MIN_PARALLEL_PROGRAMS:
+        results = [check_program(program) for program in programs]
+    else:
+        jobs = min(jobs, len(programs))
+        # Big chunks keep the overhead of sending programs to the workers
+        # low, small ones keep the workers busy until the end
+        chunksize = max(1, len(programs) // (jobs * 8))
+        with ProcessPoolExecutor(jobs) as pool:
+            results = list(
+                pool.map(check_program, programs, chunksize=chunksize)
+            )
+    failed = [result for result in results if not result["ok"]]
+    return {
+        "programs": results,
+        "summary": {
+            "checked": len(results),
+            "failed": len(failed),
+            "errors": sum(len(result["errors"]) for result in failed),
+            "internal_errors": sum(
+                error["kind"] == "internal"
+                for result in failed
+                for error in result["errors"]
+            ),
+            "time_ms": round((time.perf_counter() - start) * 1000, 3),
+        },
+    }
+
+
+def exit_code(report: dict) -> int:
+    summary = report["summary"]
+    if summary["internal_errors"]:
+        return 2
+    return 1 if summary["failed"] else 0
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="amanda check",
+        description="Checks programs for errors without running them and "
+        "reports the results as json",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="source files, dirs with source files or glob patterns",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes, the number of cpus by default",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to write the report to, instead of stdout",
+    )
+    args = parser.parse_args(args)
+
+    report = check_programs(expand_paths(args.paths), args.jobs)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as out_file:
+            json.dump(report, out_file, indent=1, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=1, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return exit_code(report)
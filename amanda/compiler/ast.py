@@ -14,6 +14,8 @@ from typing import (
     Type as PyTy,
     TypeVar,
     Callable,
+    ClassVar,
+    Iterator,
     Tuple,
     TYPE_CHECKING,
 )
@@ -38,31 +40,48 @@ class Annotation:
 
 
 class ASTNode:
+    # Every node class lists the attributes it adds in '__slots__',
+    # so that nodes don't carry a __dict__, and the attributes that
+    # may hold child nodes (or lists of them) in '_fields'
+    __slots__ = ("token", "parent", "lineno")
+    _fields: ClassVar[tuple[str, ...]] = ()
+
     def __init__(self, token: Token):
         self.token = token
         self.parent: Optional[ASTNode] = None
         self.lineno: int = token.line
 
     def for_each_child(self, f: Callable[[ASTNode, ChildAttr], None]):
-        for attr in self.__dict__:
-            if attr == "parent":
-                continue
+        for attr in self._fields:
             maybe_node = getattr(self, attr, None)
             if isinstance(maybe_node, ASTNode):
                 f(maybe_node, attr)
             elif isinstance(maybe_node, list):
-                nodes = maybe_node
-                for i, node in enumerate(nodes):
-                    if not node_of_type(node, ASTNode):
-                        continue
-                    f(node, (attr, i))
+                for i, node in enumerate(maybe_node):
+                    if isinstance(node, ASTNode):
+                        f(node, (attr, i))
 
-    def _tag(self, node: ASTNode, _: str | Tuple[str, int]):
-        node.parent = self
-        node.tag_children()
+    def child_nodes(self) -> Iterator[ASTNode]:
+        for attr in self._fields:
+            maybe_node = getattr(self, attr, None)
+            if isinstance(maybe_node, ASTNode):
+                yield maybe_node
+            elif isinstance(maybe_node, list):
+                for node in maybe_node:
+                    if isinstance(node, ASTNode):
+                        yield node
 
     def tag_children(self):
-        self.for_each_child(self._tag)
+        """Sets the parent of every node below this one.
+        The tree is walked with an explicit stack rather than by
+        recursion, so that its depth is not bound by the recursion
+        limit."""
+        pending: list[ASTNode] = [self]
+        while pending:
+            node = pending.pop()
+            for child in node.child_nodes():
+                child.parent = node
+                pending.append(child)
 
     def is_assignable(self):
         return False
@@ -76,6 +95,9 @@ class ASTNode:
 
 
 class Block(ASTNode):
+    __slots__ = ("children", "symbols")
+    _fields = ("children",)
+
     def __init__(self, children: list[ASTNode] | None = None):
         super().__init__(Token(TT.PROGRAM, "", 1, 1))
         self.children: List[ASTNode] = children if children else []
@@ -87,6 +109,8 @@ class Block(ASTNode):
 
 @dataclass
 class Module(Block):
+    __slots__ = ("annotations",)
+
     annotations: list[Annotation]
 
     def __init__(self, children: list[ASTNode] | None = None, annotations=None):
@@ -101,6 +125,8 @@ class UsaMode(enum.Enum):
 
 
 class Usa(ASTNode):
+    __slots__ = ("usa_mode", "module", "alias", "items")
+
     def __init__(
         self,
         token: Token,
@@ -118,6 +144,8 @@ class Usa(ASTNode):
 
 
 class Expr(ASTNode):
+    __slots__ = ("eval_type", "prom_type")
+
     def __init__(self, token: Token):
         super().__init__(token)
         self.eval_type: types.Type = Builtins.Unknown
@@ -128,17 +156,24 @@ class Expr(ASTNode):
 
 
 class Constant(Expr):
+    __slots__ = ()
+
     def __init__(self, token):
         super().__init__(token)
 
 
 class FmtStr(Expr):
+    __slots__ = ("parts",)
+    _fields = ("parts",)
+
     def __init__(self, token: Token, parts: list[Expr]):
         super().__init__(token)
         self.parts = parts
 
 
 class Variable(Expr):
+    __slots__ = ("var_symbol",)
+
     def __init__(self, token):
         super().__init__(token)
         self.var_symbol: types.VariableSymbol = None  # type: ignore Symbol will contain extra info for python code gen phase
@@ -148,6 +183,9 @@ class Variable(Expr):
 
 
 class Converta(Expr):
+    __slots__ = ("target", "new_type")
+    _fields = ("target", "new_type")
+
     def __init__(self, token: Token, target: Expr, new_type: Type):
         super().__init__(token)
         self.target = target
@@ -155,6 +193,9 @@ class Converta(Expr):
 
 
 class Lista(Expr):
+    __slots__ = ("array_type", "expression")
+    _fields = ("array_type", "expression")
+
     def __init__(self, token, array_type, expression):
         super().__init__(token)
         self.array_type = array_type
@@ -163,6 +204,8 @@ class Lista(Expr):
 
 @dataclass
 class Alvo(Expr):
+    __slots__ = ("var_symbol",)
+
     var_symbol: symbols.VariableSymbol | None
 
     def __init__(self, token):
@@ -171,6 +214,9 @@ class Alvo(Expr):
 
 
 class BinOp(Expr):
+    __slots__ = ("right", "left")
+    _fields = ("right", "left")
+
     def __init__(
         self, token, *, left: Expr, right: Expr, ty: types.Type | None = None
     ):
@@ -183,6 +229,9 @@ class BinOp(Expr):
 
 
 class UnaryOp(Expr):
+    __slots__ = ("operand",)
+    _fields = ("operand",)
+
     def __init__(self, token: Token, *, operand: Expr):
         super().__init__(token)
         self.operand = operand
@@ -190,9 +239,12 @@ class UnaryOp(Expr):
 
 @dataclass
 class YieldBlock(Expr):
+    __slots__ = ("children", "symbols", "has_return")
+    _fields = ("children",)
+
     children: list[ASTNode]
-    symbols: symbols.Scope | None = None
-    has_return: bool = False
+    symbols: symbols.Scope | None
+    has_return: bool
 
     def __init__(self, token: Token, children: list[ASTNode]):
 
@@ -203,6 +255,9 @@ class YieldBlock(Expr):
 
 
 class VarDecl(ASTNode):
+    __slots__ = ("var_type", "assign", "name")
+    _fields = ("var_type", "assign")
+
     def __init__(
         self, token: Token, *, name: Token, var_type=None, assign=None
     ):
@@ -213,6 +268,9 @@ class VarDecl(ASTNode):
 
 
 class Assign(Expr):
+    __slots__ = ("left", "right")
+    _fields = ("left", "right")
+
     def __init__(self, token, left=None, right=None):
         super().__init__(token)
         self.left: Variable = left  # type: ignore
@@ -221,6 +279,9 @@ class Assign(Expr):
 
 @dataclass
 class Statement(ASTNode):
+    __slots__ = ("exp",)
+    _fields = ("exp",)
+
     exp: Expr | None
 
     def __init__(self, token: Token, exp: Expr | None = None):
@@ -229,22 +290,25 @@ class Statement(ASTNode):
 
 
 class LoopCtlStmt(Statement):
-    pass
+    __slots__ = ()
 
 
 class Retorna(Statement):
-    pass
+    __slots__ = ()
 
 
 class Produz(Statement):
-    pass
+    __slots__ = ()
 
 
 class Mostra(Statement):
-    pass
+    __slots__ = ()
 
 
 class Se(ASTNode):
+    __slots__ = ("condition", "then_branch", "elsif_branches", "else_branch")
+    _fields = ("condition", "then_branch", "elsif_branches", "else_branch")
+
     def __init__(
         self,
         token: Token,
@@ -262,6 +326,9 @@ class Se(ASTNode):
 
 
 class SenaoSe(ASTNode):
+    __slots__ = ("condition", "then_branch")
+    _fields = ("condition", "then_branch")
+
     def __init__(self, token, condition, then_branch):
         super().__init__(token)
         self.condition = condition
@@ -269,6 +336,9 @@ class SenaoSe(ASTNode):
 
 
 class Enquanto(ASTNode):
+    __slots__ = ("condition", "statement")
+    _fields = ("condition", "statement")
+
     def __init__(self, token, condition, statement):
         super().__init__(token)
         self.condition = condition
@@ -277,6 +347,9 @@ class Enquanto(ASTNode):
 
 
 class CaseBlock(ASTNode):
+    __slots__ = ("expression", "block")
+    _fields = ("expression", "block")
+
     def __init__(self, token, expression, block):
         super().__init__(token)
         self.expression = expression
@@ -284,6 +357,9 @@ class CaseBlock(ASTNode):
 
 
 class Escolha(ASTNode):
+    __slots__ = ("expression", "cases", "default_case")
+    _fields = ("expression", "cases", "default_case")
+
     def __init__(self, token, expression, cases, default_case):
         super().__init__(token)
         self.expression = expression
@@ -293,6 +369,8 @@ class Escolha(ASTNode):
 
 @dataclass
 class IntPattern(Expr):
+    __slots__ = ("val",)
+
     val: Token
 
     def __init__(self, val: Token):
@@ -303,6 +381,8 @@ class IntPattern(Expr):
 
 @dataclass
 class StrPattern(Expr):
+    __slots__ = ("val",)
+
     val: Token
 
     def __init__(self, val: Token):
@@ -313,6 +393,9 @@ class StrPattern(Expr):
 
 @dataclass
 class BindingPattern(Expr):
+    __slots__ = ("var",)
+    _fields = ("var",)
+
     var: Variable
 
     def __init__(self, var: Variable):
@@ -322,6 +405,9 @@ class BindingPattern(Expr):
 
 @dataclass
 class ADTPattern(Expr):
+    __slots__ = ("adt", "args", "cons")
+    _fields = ("adt", "args")
+
     adt: Path | Variable
     args: list[Pattern]
     cons: Constructor | None
@@ -334,6 +420,9 @@ class ADTPattern(Expr):
 
 
 class IgualaArm(ASTNode):
+    __slots__ = ("pattern", "body")
+    _fields = ("pattern", "body")
+
     pattern: Pattern
     body: YieldBlock
 
@@ -347,19 +436,26 @@ Pattern = IntPattern | ADTPattern | BindingPattern
 
 
 class Iguala(Expr):
+    __slots__ = ("target", "arms", "target_binding", "ir")
+    _fields = ("target", "arms")
+
     target: Expr
     arms: list[IgualaArm]
-    target_binding: symbols.VariableSymbol | None = None
-    ir: Any = None
+    target_binding: symbols.VariableSymbol | None
+    ir: Any
 
     def __init__(self, token: Token, target: Expr, arms: list[IgualaArm]):
         super().__init__(token)
         self.target = target
         self.arms = arms
         self.target_binding = None
+        self.ir = None
 
 
 class SeIguala(ASTNode):
+    __slots__ = ("target", "pattern", "then_branch", "else_branch")
+    _fields = ("target", "pattern", "then_branch", "else_branch")
+
     target: Expr
     pattern: Pattern
     then_branch: Block
@@ -385,6 +481,9 @@ class SeIguala(ASTNode):
 
 
 class Para(ASTNode):
+    __slots__ = ("expression", "statement")
+    _fields = ("expression", "statement")
+
     def __init__(self, token, expression: ParaExpr, statement: Block):
         super().__init__(token)
         self.expression = expression
@@ -392,6 +491,9 @@ class Para(ASTNode):
 
 
 class ParaExpr(ASTNode):
+    __slots__ = ("name", "range_expr")
+    _fields = ("range_expr",)
+
     def __init__(self, name: Token, range_expr: RangeExpr):
         super().__init__(name)
         self.name = name
@@ -399,6 +501,9 @@ class ParaExpr(ASTNode):
 
 
 class RangeExpr(ASTNode):
+    __slots__ = ("start", "end", "inc")
+    _fields = ("start", "end", "inc")
+
     def __init__(self, token: Token, start: Expr, end: Expr, inc: Expr):
         super().__init__(token)
         self.start = start
@@ -407,6 +512,9 @@ class RangeExpr(ASTNode):
 
 
 class Call(Expr):
+    __slots__ = ("callee", "fargs", "symbol")
+    _fields = ("callee", "fargs")
+
     def __init__(
         self, *, callee: Expr, paren: Token | None = None, fargs: List[Expr]
     ):
@@ -417,6 +525,9 @@ class Call(Expr):
 
 
 class ListLiteral(Expr):
+    __slots__ = ("list_type", "elements")
+    _fields = ("list_type", "elements")
+
     def __init__(self, token, *, list_type=None, elements=None):
         super().__init__(token)
         self.list_type = list_type
@@ -424,6 +535,9 @@ class ListLiteral(Expr):
 
 
 class NamedArg(Expr):
+    __slots__ = ("name", "arg")
+    _fields = ("arg",)
+
     def __init__(self, *, name: Token, arg: Expr):
         super().__init__(name)
         self.name = name
@@ -431,6 +545,9 @@ class NamedArg(Expr):
 
 
 class Get(Expr):
+    __slots__ = ("target", "member")
+    _fields = ("target",)
+
     def __init__(self, *, target: Expr, member: Token):
         super().__init__(member)
         self.target = target
@@ -441,6 +558,9 @@ class Get(Expr):
 
 
 class IndexGet(Expr):
+    __slots__ = ("target", "index")
+    _fields = ("target", "index")
+
     def __init__(self, token, target, index):
         super().__init__(token)
         self.target = target
@@ -451,6 +571,9 @@ class IndexGet(Expr):
 
 
 class IndexSet(Expr):
+    __slots__ = ("index", "value")
+    _fields = ("index", "value")
+
     def __init__(self, token, index, value):
         super().__init__(token)
         self.index = index
@@ -461,6 +584,9 @@ class IndexSet(Expr):
 
 
 class Set(Expr):
+    __slots__ = ("target", "expr")
+    _fields = ("target", "expr")
+
     def __init__(self, *, target: Get, expr: Expr):
         super().__init__(expr.token)
         self.target = target
@@ -468,6 +594,9 @@ class Set(Expr):
 
 
 class Unwrap(Expr):
+    __slots__ = ("option", "default_val")
+    _fields = ("option", "default_val")
+
     def __init__(self, *, option: Expr, default_val: Expr | None):
         super().__init__(option.token)
         self.option = option
@@ -476,15 +605,30 @@ class Unwrap(Expr):
 
 @dataclass
 class Path(Expr):
+    __slots__ = ("components", "symbol")
+    _fields = ("components",)
+
     components: Sequence[Variable]
-    symbol: symbols.Typed | None = None
+    symbol: symbols.Typed | None
 
     def __init__(self, components: Sequence[Variable]):
         super().__init__(components[0].token)
         self.components = components
+        self.symbol = None
 
 
 class FunctionDecl(ASTNode):
+    __slots__ = (
+        "name",
+        "params",
+        "func_type",
+        "block",
+        "is_native",
+        "annotations",
+        "symbol",
+    )
+    _fields = ("params", "func_type", "block")
+
     def __init__(
         self,
         *,
@@ -508,6 +652,16 @@ class FunctionDecl(ASTNode):
 
 
 class MethodDecl(FunctionDecl):
+    __slots__ = ("generic_params", "target_ty", "return_ty")
+    _fields = (
+        "params",
+        "func_type",
+        "block",
+        "generic_params",
+        "target_ty",
+        "return_ty",
+    )
+
     def __init__(
         self,
         *,
@@ -536,6 +690,9 @@ class MethodDecl(FunctionDecl):
 
 
 class Registo(ASTNode):
+    __slots__ = ("name", "fields", "annotations", "generic_params")
+    _fields = ("fields", "generic_params")
+
     def __init__(
         self,
         *,
@@ -553,6 +710,9 @@ class Registo(ASTNode):
 
 @dataclass
 class UniaoVariant(ASTNode):
+    __slots__ = ("name", "params")
+    _fields = ("params",)
+
     def __init__(self, name: Token, params: list[Type]):
         super().__init__(name)
         self.name = name
@@ -561,6 +721,9 @@ class UniaoVariant(ASTNode):
 
 @dataclass
 class Uniao(ASTNode):
+    __slots__ = ("name", "variants", "generic_params", "annotations")
+    _fields = ("variants", "generic_params")
+
     def __init__(
         self,
         *,
@@ -577,6 +740,8 @@ class Uniao(ASTNode):
 
 
 class GenericParam(ASTNode):
+    __slots__ = ("name",)
+
     def __init__(
         self,
         name: Token,
@@ -586,6 +751,9 @@ class GenericParam(ASTNode):
 
 
 class GenericArg(ASTNode):
+    __slots__ = ("arg",)
+    _fields = ("arg",)
+
     def __init__(
         self,
         arg: Type,
@@ -595,6 +763,9 @@ class GenericArg(ASTNode):
 
 
 class Param(ASTNode):
+    __slots__ = ("param_type", "name")
+    _fields = ("param_type",)
+
     def __init__(self, param_type: Type = None, name: Token = None):  # type: ignore
         super().__init__(name)
         self.param_type = param_type
@@ -603,6 +774,9 @@ class Param(ASTNode):
 
 @dataclass
 class Type(ASTNode):
+    __slots__ = ("name", "maybe_ty", "generic_args")
+    _fields = ("generic_args",)
+
     name: Token
     generic_args: list[GenericArg] | None
     maybe_ty: bool
@@ -616,6 +790,8 @@ class Type(ASTNode):
 
 @dataclass
 class TypePath(Type):
+    __slots__ = ("components",)
+
     components: list[str]
     maybe_ty: bool
     generic_args: list[GenericArg] | None
@@ -635,6 +811,9 @@ class TypePath(Type):
 
 @dataclass
 class ArrayType(Type):
+    __slots__ = ("element_type",)
+    _fields = ("generic_args", "element_type")
+
     element_type: Type
 
     def __init__(self, element_type: Type, maybe_ty: bool):
@@ -643,6 +822,8 @@ class ArrayType(Type):
 
 
 class NoOp(ASTNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(Token(TT.EOF, "", 0, 0))
 
@@ -657,3 +838,31 @@ class Visitor:
 
     def general_visit(self, node):
         pass
+
+
+class Dispatcher:
+    """Finds the method of a visitor that handles a node, following the
+    '<prefix>_<node class in lowercase>' naming convention, or 'default'
+    when the visitor has none.
+    Lookups are cached per visitor class and node class, so the method
+    name is only built and looked up the first time a class is seen.
+    The cached methods are plain functions, called with the visitor as
+    the first argument."""
+
+    def __init__(self, prefix: str, default: str):
+        self.prefix = prefix
+        self.default = default
+        self.methods: dict[Tuple[type, type], Callable[..., Any]] = {}
+
+    def method(self, visitor: Any, node: ASTNode) -> Callable[..., Any]:
+        key = (type(visitor), type(node))
+        method = self.methods.get(key)
+        if method is None:
+            visitor_class, node_class = key
+            method = getattr(
+                visitor_class,
+                f"{self.prefix}_{node_class.__name__.lower()}",
+                None,
+            ) or getattr(visitor_class, self.default)
+            self.methods[key] = method
+        return method
@@ -1,4 +1,11 @@
-from io import BytesIO
+"""
+BSON writer for compiled modules.
+
+The compiler writes modules in the flat format of binmod. This writer is
+kept for compatibility only: the VM still loads modules written as BSON
+and benchmarks/modformat.py compares the two formats.
+"""
+
 import struct
 from typing import Dict, Any, Sized, List, cast
 
@@ -27,78 +34,104 @@ def bson_int32_len(obj: Sized) -> bytes:
     return into_bson_int32(len(obj))
 
 
-def dump_value(buf: BytesIO, type_code: bytes, *args: bytes) -> None:
-    buf.write(type_code)
-    for arg in args:
-        buf.write(arg)
+_pack_int64 = struct.Struct("<q").pack
+_pack_int32 = struct.Struct("<l").pack
+_pack_f64 = struct.Struct("<d").pack
+
+# Encoded keys of the elements of arrays, with their null byte
+_index_keys: list[bytes] = []
+
+
+def index_keys(size: int) -> list[bytes]:
+    for i in range(len(_index_keys), size):
+        _index_keys.append(str(i).encode() + b"\x00")
+    return _index_keys
+
+
+def dump_element(buf: bytearray, name: bytes, value: Any) -> None:
+    """Writes an element. 'name' is the encoded key, with its null
+    byte."""
+    val_t = type(value)
+    if val_t is int:
+        buf += b"\x12"
+        buf += name
+        buf += _pack_int64(value)
+    elif val_t is str:
+        str_bytes = value.encode()
+        buf += b"\x02"
+        buf += name
+        buf += bson_int32_len(str_bytes)
+        buf += str_bytes
+        buf += b"\x00"
+    elif val_t is dict:
+        buf += b"\x03"
+        buf += name
+        dump_document(buf, value)
+    elif val_t is list:
+        buf += b"\x04"
+        buf += name
+        dump_array(buf, value)
+    elif val_t is float:
+        buf += b"\x01"
+        buf += name
+        buf += _pack_f64(value)
+    elif val_t is bytes:
+        buf += b"\x05"
+        buf += name
+        buf += _pack_int32(len(value))
+        buf += b"\x80"
+        buf += value
+    elif val_t is bool:
+        buf += b"\x08"
+        buf += name
+        buf += b"\x01" if value else b"\x00"
+    elif value is None:
+        buf += b"\x0a"
+        buf += name
+    else:
+        raise NotImplementedError(f"Cannot serialize type: {str(val_t)}")
+
+
+def start_document(buf: bytearray) -> int:
+    start = len(buf)
+    # The size is only known after the elements are written, so it
+    # is patched in by end_document
+    buf += b"\x00\x00\x00\x00"
+    return start
+
+
+def end_document(buf: bytearray, start: int) -> None:
+    # The size excludes the size itself and the trailing null byte
+    size = len(buf) - start - 4
+    if size >= 2 ** (31):
+        raise OverflowError(
+            f"Object too large to be bsonyfied. Object size: {size}"
+        )
+    struct.pack_into("<l", buf, start, size)
+    buf += b"\x00"
+
+
+def dump_document(buf: bytearray, data: Dict[str, Any]) -> None:
+    start = start_document(buf)
+    for key, value in data.items():
+        dump_element(buf, key.encode() + b"\x00", value)
+    end_document(buf, start)
+
+
+def dump_array(buf: bytearray, values: List[Any]) -> None:
+    start = start_document(buf)
+    for name, value in zip(index_keys(len(values)), values):
+        dump_element(buf, name, value)
+    end_document(buf, start)
 
 
 def dumps(data: Dict[str, Any]) -> bytes:
     """
     Converts bytecode ops and extra metadata into the BSON format.
     Link to the spec: https://bsonspec.org/spec.html
+    Nested documents and arrays are written into the same buffer as
+    the document that holds them.
     """
-    document = BytesIO()
-    e_list = BytesIO()
-    for key, value in data.items():
-        val_t = type(value)
-        if val_t == float:
-            dump_value(
-                e_list, b"\x01", key.encode(), b"\x00", into_bson_f64(value)
-            )
-        elif val_t == str:
-            str_bytes = value.encode()
-            str_len = bson_int32_len(str_bytes)
-            dump_value(
-                e_list,
-                b"\x02",
-                key.encode(),
-                b"\x00",
-                str_len,
-                value.encode(),
-                b"\x00",
-            )
-        elif val_t == dict:
-            dump_value(
-                e_list,
-                b"\x03",
-                key.encode(),
-                b"\x00",
-                dumps(value),
-            )
-        elif val_t == list:
-            arr_obj = {}
-            for i, val in enumerate(value):
-                arr_obj[str(i)] = val
-            dump_value(
-                e_list,
-                b"\x04",
-                key.encode(),
-                b"\x00",
-                dumps(arr_obj),
-            )
-        elif val_t == bytes:
-            size = len(value)
-            dump_value(
-                e_list,
-                b"\x05",
-                key.encode(),
-                b"\x00",
-                into_bson_int32(size),
-                b"\x80",
-                value,
-            )
-        elif val_t == int:
-            dump_value(
-                e_list, b"\x12", key.encode(), b"\x00", into_bson_int64(value)
-            )
-        else:
-            raise NotImplementedError(f"Cannot serialize type: {str(val_t)}")
-    doc_len = bson_int32_len(e_list.getvalue())
-    document.write(doc_len)
-    document.write(e_list.getvalue())
-    document.write(b"\x00")
-    doc = document.getvalue()
-    document.close()
-    e_list.close()
-    return doc
+    buf = bytearray()
+    dump_document(buf, data)
+    return bytes(buf)
@@ -0,0 +1,193 @@
+"""
+Flat binary format of compiled modules.
+
+All integers are little endian. A file starts with a header, followed
+by a table with the offset of each module. The first module is the
+main module and the others are its imports, in order:
+
+    magic       4 bytes, b"AMAB"
+    version     u16
+    reserved    u16
+    count       u32, number of modules
+    offsets     u32 * count, offset of each module in the file
+
+Each module starts with its own header and a table of sections. The
+offsets of the sections are relative to the start of the module:
+
+    flags           u32, see BUILTIN and COMPACT
+    entry_locals    u32
+    sections        (offset u32, size u32) * SECTION_COUNT
+
+The sections, in the order of the table, are:
+
+    name        the name of the module, as utf-8
+    constants   u32 count, then a tag byte (see CONST_*) and a value
+                for each constant
+    names       u32 count, then a string for each name
+    code        the encoded ops
+    functions   u32 count, then a string (name), u32 (start_ip), u32
+                (locals) and i32 (module, -1 for the main module)
+                for each function
+    registos    u32 count, then a string (name), u32 field count and
+                a string for each field, for each registo
+    src_map     u32 count, then an i64 for each entry
+
+Strings are a u32 size followed by their utf-8 bytes. The VM reads
+the code and string constants directly from the buffer.
+"""
+
+import struct
+from typing import Any
+
+MAGIC = b"AMAB"
+VERSION = 1
+
+# Module flags
+BUILTIN = 0x1
+COMPACT = 0x2
+
+SECTION_COUNT = 7
+MODULE_HEADER_SIZE = 8 + 8 * SECTION_COUNT
+
+# Tags of the values on the constant pool
+CONST_NULL = 0
+CONST_BOOL = 1
+CONST_INT = 2
+CONST_F64 = 3
+CONST_STR = 4
+
+
+_pack_u32 = struct.Struct("<I").pack
+_pack_function = struct.Struct("<IIi").pack
+# Tag and packer of the constants of fixed size, by their exact type
+_const_packers = {
+    bool: (CONST_BOOL, struct.Struct("<BB").pack),
+    int: (CONST_INT, struct.Struct("<Bq").pack),
+    float: (CONST_F64, struct.Struct("<Bd").pack),
+}
+
+
+def dump_str(buf: bytearray, string: str):
+    encoded = string.encode()
+    buf += _pack_u32(len(encoded))
+    buf += encoded
+
+
+def dump_strs(buf: bytearray, strings: list[str]):
+    """Writes the number of strings followed by each string."""
+    buf += _pack_u32(len(strings))
+    for string in strings:
+        encoded = string.encode()
+        buf += _pack_u32(len(encoded))
+        buf += encoded
+
+
+def dump_const(buf: bytearray, constant: Any):
+    const_t = type(constant)
+    if const_t is str:
+        buf.append(CONST_STR)
+        dump_str(buf, constant)
+    elif const_t in _const_packers:
+        tag, pack = _const_packers[const_t]
+        buf += pack(tag, constant)
+    elif constant is None:
+        buf.append(CONST_NULL)
+    else:
+        raise NotImplementedError(
+            f"Cannot serialize constant of type: {type(constant)}"
+        )
+
+
+def dump_name(buf: bytearray, module: dict[str, Any]):
+    buf += module["name"].encode()
+
+
+def dump_constants(buf: bytearray, module: dict[str, Any]):
+    buf += _pack_u32(len(module["constants"]))
+    for constant in module["constants"]:
+        packer = _const_packers.get(type(constant))
+        if packer is None:
+            dump_const(buf, constant)
+        else:
+            buf += packer[1](packer[0], constant)
+
+
+def dump_names(buf: bytearray, module: dict[str, Any]):
+    dump_strs(buf, module["names"])
+
+
+def dump_code(buf: bytearray, module: dict[str, Any]):
+    buf += module["ops"]
+
+
+def dump_functions(buf: bytearray, module: dict[str, Any]):
+    buf += _pack_u32(len(module["functions"]))
+    for func in module["functions"]:
+        name = func["name"].encode()
+        buf += _pack_u32(len(name))
+        buf += name
+        buf += _pack_function(func["start_ip"], func["locals"], func["module"])
+
+
+def dump_registos(buf: bytearray, module: dict[str, Any]):
+    buf += _pack_u32(len(module["registos"]))
+    for registo in module["registos"]:
+        dump_str(buf, registo["name"])
+        dump_strs(buf, registo["fields"])
+
+
+def dump_src_map(buf: bytearray, module: dict[str, Any]):
+    buf += struct.pack(
+        f"<I{len(module['src_map'])}q",
+        len(module["src_map"]),
+        *module["src_map"],
+    )
+
+
+# Writers of the sections of a module, in the order of the table
+SECTIONS = (
+    dump_name,
+    dump_constants,
+    dump_names,
+    dump_code,
+    dump_functions,
+    dump_registos,
+    dump_src_map,
+)
+
+
+def dump_module(buf: bytearray, module: dict[str, Any]):
+    """Writes a module at the end of 'buf'. Each section is written in
+    place and its entry on the table is filled once its size is known."""
+    flags = 0
+    if module["builtin"]:
+        flags |= BUILTIN
+    if module.get("compact"):
+        flags |= COMPACT
+    start = len(buf)
+    buf += struct.pack("<II", flags, module["entry_locals"])
+    table = len(buf)
+    buf += bytes(8 * SECTION_COUNT)
+    for i, dump_section in enumerate(SECTIONS):
+        offset = len(buf)
+        dump_section(buf, module)
+        struct.pack_into(
+            "<II", buf, table + 8 * i, offset - start, len(buf) - offset
+        )
+
+
+def dumps(data: dict[str, Any]) -> bytes:
+    """
+    Converts a compiled module and its imports into the flat binary
+    format. Everything is written into a single buffer, so the time it
+    takes is linear in the size of the output, however many imports
+    there are.
+    """
+    modules = (data, *data["imports"])
+    out = bytearray(struct.pack("<4sHHI", MAGIC, VERSION, 0, len(modules)))
+    table = len(out)
+    out += bytes(4 * len(modules))
+    for i, module in enumerate(modules):
+        struct.pack_into("<I", out, table + 4 * i, len(out))
+        dump_module(out, module)
+    return bytes(out)
@@ -0,0 +1,110 @@
+"""
+On disk cache for compiled programs.
+
+Each program is cached in a '__amacache__' dir next to its entry
+file. A cache entry is a one line json header followed by the
+serialized module. The header records the compiler version and the
+hash of every source that went into the module (the entry file,
+the builtin module and every imported module), so an entry is only
+used if none of those sources has changed since it was written.
+
+Imports are resolved relative to the cwd before the import paths, so
+the same program may import different modules depending on where it
+is run from. The header also records the cwd and the module each
+import resolved to, and an entry is only used from the same cwd and
+while its imports still resolve to the same modules.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+from glob import glob
+from os import path
+from typing import Iterable, Optional
+from amanda.compiler.resolve import same_resolution
+from amanda.config import BUNDLED
+
+CACHE_DIR = "__amacache__"
+CACHE_EXT = ".amac"
+
+
+@lru_cache(maxsize=None)
+def compiler_version() -> str:
+    """Fingerprint of the compiler. When running from source it is the
+    hash of the compiler's own sources, so caches are invalidated as
+    soon as the compiler changes."""
+    digest = hashlib.sha256()
+    if BUNDLED:
+        stat = os.stat(sys.executable)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    else:
+        compiler_dir = path.dirname(path.abspath(__file__))
+        pattern = path.join(compiler_dir, "**", "*.py")
+        for filename in sorted(glob(pattern, recursive=True)):
+            digest.update(path.relpath(filename, compiler_dir).encode())
+            with open(filename, "rb") as src_file:
+                digest.update(src_file.read())
+    return digest.hexdigest()
+
+
+def source_hash(filename: str) -> str:
+    with open(filename, "rb") as src_file:
+        return hashlib.sha256(src_file.read()).hexdigest()
+
+
+def cache_path(filename: str) -> str:
+    src_dir, name = path.split(path.abspath(filename))
+    return path.join(src_dir, CACHE_DIR, name + CACHE_EXT)
+
+
+def load(filename: str) -> Optional[bytes]:
+    """Returns the cached module for the program in 'filename' or
+    None if there is no valid entry for it."""
+    try:
+        with open(cache_path(filename), "rb") as cache_file:
+            header = json.loads(cache_file.readline())
+            if header["version"] != compiler_version():
+                return None
+            if not same_resolution(header["cwd"], header["imports"]):
+                return None
+            for dep, dep_hash in header["sources"].items():
+                if source_hash(dep) != dep_hash:
+                    return None
+            return cache_file.read()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store(
+    filename: str,
+    sources: Iterable[str],
+    module_bin: bytes,
+    import_map: dict[str, str],
+):
+    """Caches the module compiled from 'filename'. 'sources' are the
+    paths of all the modules it depends on and 'import_map' maps the
+    path in each of its 'usa' statements to the module it resolved to."""
+    deps = [path.abspath(filename), *(path.abspath(src) for src in sources)]
+    header = {
+        "version": compiler_version(),
+        "sources": {dep: source_hash(dep) for dep in deps},
+        "cwd": os.getcwd(),
+        "imports": import_map,
+    }
+    entry = cache_path(filename)
+    tmp = f"{entry}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(path.dirname(entry), exist_ok=True)
+        with open(tmp, "wb") as cache_file:
+            cache_file.write(json.dumps(header).encode())
+            cache_file.write(b"\n")
+            cache_file.write(module_bin)
+        # Replace atomically so that concurrent runs never
+        # read a partially written entry
+        os.replace(tmp, entry)
+    except OSError:
+        # Caching is best effort, e.g. the source dir may be read only
+        if path.exists(tmp):
+            os.remove(tmp)
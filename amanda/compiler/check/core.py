@@ -1,8 +1,17 @@
 import keyword
+from functools import lru_cache
 from os import path
-from typing import Iterable, NoReturn, Optional, List, cast, Tuple
+from typing import ClassVar, Iterable, NoReturn, Optional, List, cast, Tuple
 from amanda.compiler.module import Module
-from amanda.compiler.parse import parse
+from amanda.compiler.options import DEFAULT_OPTIONS, CompileOptions
+from amanda.compiler.imports import (
+    FILE_RESOLVER,
+    ImportResolver,
+    ParsedModules,
+    parse_module,
+    parse_program,
+    usa_path,
+)
 from amanda.compiler.symbols.base import TypeVar, Typed
 from amanda.compiler.tokens import TokenType as TT, Token
 import amanda.compiler.ast as ast
@@ -27,63 +36,134 @@ from amanda.compiler.error import AmandaError, Errors
 from amanda.compiler.builtinfn import BUILTINS, BuiltinFn
 from amanda.config import STD_LIB
 from amanda.compiler.transform import transform
+from amanda.compiler.deadcode import eliminate_dead_code
 import amanda.compiler.check.uniao as uniao
 import amanda.compiler.check.iguala as igualacheck
 from utils.tycheck import unwrap
 
-
 MAX_AMA_INT = 2**63 - 1
 
 
+def copy_methods(
+    methods: dict[Types, dict[str, symbols.MethodSym]],
+) -> dict[Types, dict[str, symbols.MethodSym]]:
+    return {tag: dict(type_methods) for tag, type_methods in methods.items()}
+
+
+@lru_cache(maxsize=None)
+def is_import_dir(dir_path: str) -> bool:
+    return path.isdir(dir_path)
+
+
 class Analyzer(ast.Visitor):
 
     # Error messages
     ID_IN_USE = "O identificador '{name}' já foi declarado neste escopo"
     INVALID_REF = "o identificador '{name}' não é uma referência válida"
-
-    def __init__(self, filename: str, import_paths: list[str], module: Module):
+    # Scope with the builtin types and the symbols declared in the
+    # builtin module. It is built by the first analyzer of the process
+    # and every global scope is nested in it.
+    builtin_scope: ClassVar[Optional[symbols.BuiltinScope]] = None
+    # Methods that the builtin module declares on primitive types
+    builtin_methods: ClassVar[dict[Types, dict[str, symbols.MethodSym]]] = {}
+    _visitors = ast.Dispatcher("visit", "general_visit")
+    _has_return = ast.Dispatcher("has_return", "general_check")
+
+    def __init__(
+        self,
+        filename: str,
+        import_paths: list[str],
+        module: Module,
+        resolver: ImportResolver = FILE_RESOLVER,
+        options: CompileOptions = DEFAULT_OPTIONS,
+    ):
         # Relative path to the file being run
         self.filename = filename
         # Dirs to be used when resolving relative imports
         self.import_paths = [STD_LIB, *import_paths]
-        # Just to have quick access to things like types and e.t.c
-        self.global_scope: symbols.Scope = symbols.Scope()
+        # Finds and reads the imported modules
+        self.resolver = resolver
+        # Optimisations applied to the modules once they are checked
+        self.options = options
         self.scope_depth = 0
-        self.ctx_scope: symbols.Scope = self.global_scope
         self.ctx_node: Optional[ast.ASTNode] = None
         self.ctx_reg = None
         self.ctx_func = None
         self.ctx_yield_block: ast.YieldBlock | None = None
         self.in_loop = False
         self.imports = {}
+        # Maps the path in each 'usa' statement to the module it
+        # resolved to, which depends on the cwd
+        self.import_map: dict[str, str] = {}
+        # Modules parsed ahead of time, see 'load_program'
+        self.parsed: ParsedModules = {}
         # Module currently being executed
         self.ctx_module: Module = module
         # Scope used primarily to store generic types
         self.ty_ctx: symbols.Scope = symbols.Scope()
 
-        # Initialize builtin types
-        for type_id, sym in builtin_types:
-            self.global_scope.define(type_id, sym)
-
-        # Validate dirs
+        # Validate dirs, unless the modules don't come from files
         for dir_path in self.import_paths:
-            assert path.isdir(
+            assert resolver is not FILE_RESOLVER or is_import_dir(
                 dir_path
             ), f"Invalid import path provided:  '{dir_path}'"
 
-        # Load builtin module
+        if Analyzer.builtin_scope is None:
+            self.load_builtins()
+        # Just to have quick access to things like types and e.t.c
+        self.global_scope: symbols.Scope = symbols.Scope(Analyzer.builtin_scope)
+        self.ctx_scope: symbols.Scope = self.global_scope
+        self.imports[builtin_module.fpath] = builtin_module
+
+    def load_program(
+        self, workers: int = 1, source: Optional[str] = None
+    ) -> ast.Module:
+        """Parses the module being analysed and all of its imports, with
+        'workers' processes if there are enough of them. Returns the
+        module's ast. 'source' is the text of the module, when it
+        doesn't have to be read from its file."""
+        # Methods on primitive types are stored globally. Drop the ones
+        # declared by programs analysed earlier in this process.
+        Primitive.methods = copy_methods(Analyzer.builtin_methods)
+        self.parsed = parse_program(
+            self.filename, self.import_paths, workers, source, self.resolver
+        )
+        return self.parse_module(path.abspath(self.filename))
+
+    def parse_module(self, fpath: str) -> ast.Module:
+        program = self.parsed.pop(fpath, None)
+        if program is None:
+            return parse_module(fpath, self.resolver.read(fpath))
+        if isinstance(program, AmandaError):
+            raise program
+        return program
+
+    @classmethod
+    def init_builtins(cls):
+        """Analyses the builtin module, unless an analyzer created
+        earlier in this process already did."""
+        if cls.builtin_scope is None:
+            cls(builtin_module.fpath, [], builtin_module)
+
+    def load_builtins(self):
+        """Analyses the builtin module into the builtin scope."""
+        scope = symbols.BuiltinScope()
+        for type_id, sym in builtin_types:
+            scope.define(type_id, sym)
+        self.global_scope = self.ctx_scope = scope
         self.load_module(builtin_module, ast.UsaMode.Global)
-        SrcBuiltins.init_embutidos(self.global_scope)
+        SrcBuiltins.init_embutidos(scope)
+        scope.freeze()
+        Analyzer.builtin_scope = scope
+        Analyzer.builtin_methods = copy_methods(Primitive.methods)
 
     # Helper methods
     def has_return(self, node):
         """Method that checks if function non void
         function has return statement"""
-        node_class = type(node).__name__.lower()
-        method_name = f"has_return_{node_class}"
-        visitor_method = getattr(self, method_name, self.general_check)
+        check_method = self._has_return.method(self, node)
         self.ctx_node = node
-        return visitor_method(node)
+        return check_method(self, node)
 
     def has_return_block(self, node):
         for child in node.children:
@@ -139,7 +219,7 @@ class Analyzer(ast.Visitor):
 
     def general_visit(self, node):
         raise NotImplementedError(
-            f"Have not defined method for this node type: {type(node)} {node.__dict__}"
+            f"Have not defined method for this node type: {type(node)}"
         )
 
     def error(self, code, **kwargs) -> NoReturn:
@@ -289,13 +369,11 @@ class Analyzer(ast.Visitor):
 
     # Visitor methods
     def visit(self, node: ast.ASTNode, args=None):
-        node_class = type(node).__name__.lower()
-        method_name = f"visit_{node_class}"
-        visitor_method = getattr(self, method_name, self.general_visit)
+        visitor_method = self._visitors.method(self, node)
         self.ctx_node = node
-        if node_class == "block":
-            return visitor_method(node, args)
-        return visitor_method(node)
+        if type(node) is ast.Block:
+            return visitor_method(self, node, args)
+        return visitor_method(self, node)
 
     def visit_children(self, children):
         for child in children:
@@ -320,15 +398,30 @@ class Analyzer(ast.Visitor):
         # The top level global scope will have it's own "locals"
         self.visit_children(node.children)
         node.symbols = self.global_scope
-        transformed = transform(node, self.ctx_module)
+        transformed = transform(
+            node, self.ctx_module, self.options.fold_constants
+        )
+        if self.options.dead_code:
+            # Only the functions of the entry module can't be used elsewhere
+            exported = self.ctx_module.fpath in self.imports
+            eliminate_dead_code(transformed, exported)
         self.ctx_module.ast = transformed
 
         return self.ctx_module, self.imports
 
     def load_module_scoped(self, module: Module) -> tuple[Module, dict]:
-        analyzer = Analyzer(module.fpath, self.import_paths, module)
+        # STD_LIB is added back by the new analyzer
+        analyzer = Analyzer(
+            module.fpath,
+            self.import_paths[1:],
+            module,
+            self.resolver,
+            self.options,
+        )
         analyzer.imports = self.imports
-        return analyzer.visit_module(parse(module.fpath))
+        analyzer.parsed = self.parsed
+        analyzer.import_map = self.import_map
+        return analyzer.visit_module(analyzer.parse_module(module.fpath))
 
     def define_module_alias(
         self, alias: str, *, importing_mod, imported_mod: Module
@@ -404,7 +497,7 @@ class Analyzer(ast.Visitor):
         # TODO: Handle errors while loading another module
         match mode:
             case ast.UsaMode.Global:
-                self.visit_module(parse(module.fpath))
+                self.visit_module(self.parse_module(module.fpath))
             case ast.UsaMode.Scoped:
                 if not alias:
                     raise TypeError("Arg 'alias' should not be None")
@@ -427,31 +520,20 @@ class Analyzer(ast.Visitor):
         self.ctx_module = prev_module
 
     def resolve_import(self, fpath: str) -> str | None:
-        # Try to resolve path using cwd
-        if path.isfile(fpath):
-            return path.abspath(fpath)
-        # Attempt to resolve using the import_paths
-        for dir_path in self.import_paths:
-            mod_path = path.join(dir_path, fpath)
-            if path.isfile(path.join(dir_path, fpath)):
-                return path.abspath(mod_path)
-        return None
+        return self.resolver.resolve(fpath, self.import_paths)
 
     def visit_usa(self, node: ast.Usa):
         fpath = node.module.lexeme.replace("'", "").replace('"', "")
         # Check if path refers to a valid file
-        head, tail = path.split(fpath)
+        _, tail = path.split(fpath)
         err_msg = f"Erro ao importar módulo. O caminho '{fpath}' não é um ficheiro válido"
         if not tail:
             self.error(err_msg)
-        # If file doesn't have .ama extensions, add it
-        if tail.split(".")[-1] != "ama":
-            tail = tail + ".ama"
-        fpath = path.join(head, tail)
 
-        mod_path = self.resolve_import(fpath)
+        mod_path = self.resolve_import(usa_path(node))
         if not mod_path:
             self.error(err_msg)
+        self.import_map[usa_path(node)] = mod_path
 
         module = Module(mod_path)
         self.load_module(
@@ -461,8 +543,17 @@ class Analyzer(ast.Visitor):
             usa_items=node.items,
         )
 
+    def get_in_scope(self, name: str) -> Optional[symbols.Symbol]:
+        """Looks up a name in the current scope only. Builtins count
+        as part of the global scope."""
+        symbol = self.ctx_scope.get(name)
+        builtins = self.global_scope.enclosing_scope
+        if symbol is None and self.ctx_scope is self.global_scope and builtins:
+            symbol = builtins.get(name)
+        return symbol
+
     def assert_can_use_ident(self, node: ast.ASTNode, name: str):
-        in_use = self.ctx_scope.get(name)
+        in_use = self.get_in_scope(name)
         if in_use and not self.ctx_reg:
             self.error(self.ID_IN_USE, name=name)
         elif in_use and self.ctx_reg:
@@ -499,7 +590,7 @@ class Analyzer(ast.Visitor):
             self.error(local_function_err)
 
         # Check if id is already in use
-        if self.ctx_scope.get(name):
+        if self.get_in_scope(name):
             self.error(id_in_use_err, name=name)
 
     def validate_num_params(self, node: ast.FunctionDecl):
@@ -1,8 +1,9 @@
+from functools import cache
 from os import path
+import struct
 import sys
-from typing import List, cast, Sequence
-from io import StringIO, BytesIO
-from enum import Enum, auto
+from typing import cast, Sequence
+from io import StringIO
 from amanda.compiler.check.exhaustiveness import (
     Case,
     DSuccess,
@@ -26,145 +27,36 @@ from amanda.compiler.types.core import (
 import amanda.compiler.ast as ast
 from amanda.compiler.tokens import TokenType as TT
 from amanda.compiler.error import AmandaError, throw_error
-from amanda.compiler import bindump
+from amanda.compiler import binmod, fold
 from amanda.compiler.module import Module
-import struct
+from amanda.compiler.options import DEFAULT_OPTIONS, CompileOptions
+from amanda.compiler.opcode import Instruction, OpCode, op_sizes
+from amanda.compiler import peephole
 
 from utils.tycheck import unwrap, unreachable
 
+# struct format of the args of each size in bytes
+ARG_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+# Largest module index that fits in compact operands
+MAX_COMPACT_MODULE = 0xFFFF
+# Largest index in the constant and name tables, which are always
+# loaded with 16 bit operands
+MAX_TABLE_INDEX = 0xFFFF
+
+
+@cache
+def op_encoders(
+    compact: bool,
+) -> dict[OpCode, tuple[struct.Struct, int, bool]]:
+    """Returns, for each op, the struct used to encode it with its args,
+    the value of the op and whether its first arg is a label."""
+    encoders = {}
+    for op in OpCode:
+        arg_formats = (ARG_FORMATS[size] for size in op.arg_sizes(compact))
+        op_struct = struct.Struct(">B" + "".join(arg_formats))
+        encoders[op] = (op_struct, op.value, op.is_jump())
+    return encoders
 
-OP_SIZE = 8
-
-
-class OpCode(Enum):
-    # Prints TOS
-    MOSTRA = 0x00
-    # Loads the constant at index specified by arg. Constant becomes TOS.
-    LOAD_CONST = auto()
-    # Loads the name at index specified by arg. Name becomes TOS.
-    LOAD_NAME = auto()
-    # All OP instructions use 1 or 2 on the stack add pop them
-    OP_ADD = auto()
-    OP_MINUS = auto()
-    OP_MUL = auto()
-    OP_DIV = auto()
-    OP_FLOORDIV = auto()
-    OP_MODULO = auto()
-    OP_INVERT = auto()
-    OP_AND = auto()
-    OP_OR = auto()
-    OP_NOT = auto()
-    OP_EQ = auto()
-    OP_NOTEQ = auto()
-    OP_GREATER = auto()
-    OP_GREATEREQ = auto()
-    OP_LESS = auto()
-    OP_LESSEQ = auto()
-    # Uses TOS to index into TOS - 1. The result is pushed onto the stack
-    OP_INDEX_GET = auto()
-    # Performs TOS-2[TOS-1] = TOS.
-    OP_INDEX_SET = auto()
-    # Gets a global variable. The arg is the index to the name of the var on the
-    # constant table. Pushes value to the top of the stack
-    GET_GLOBAL = auto()
-    # Sets global variable. The arg is the index to the name of the var on the
-    # constant table. Pops TOS and sets it as the value of the local
-    SET_GLOBAL = auto()
-    # Sets the pc to the arg.
-    JUMP = auto()
-    # If TOS == false, sets pc to the args. Pops TOS
-    JUMP_IF_FALSE = auto()
-    # Gets the value of a non-global variable. The arg is the slot on the stack where the var was stored
-    GET_LOCAL = auto()
-    # Sets the value of a non-global variable. The arg is the slot on the stack where the var should be stored
-    SET_LOCAL = auto()
-    # Calls a function. The argument of the op is the number args. Expects function value to be TOS.
-    CALL_FUNCTION = auto()
-    # Returns  from the caller.
-    RETURN = auto()
-    # Converts a value into the desired type. Expects TOS to be the target type and TOS-1 the value to convert.
-    # Takes an 8-bit argument that changes the 'strictness' of the conversion.
-    # 0 (cast): Performs the cast as long as the builtin type can be cast into type.
-    # 1 (check cast): Validates if 'interface' type can be cast into the desired type.
-    CAST = auto()
-    # Builds a string using elements on the stack. 8-bit arg indicates the number of elements
-    # on the stack to use
-    BUILD_STR = auto()
-    # Builds a vec using elements on the stack. 8-bit arg indicates the number of elements
-    # on the stack to use.
-    # Builds a vec using elements on the stack. 8-bit arg indicates the number of elements
-    # on the stack to use.
-    BUILD_VEC = auto()
-    # Loads a record definition. 16 bit-arg indicates the index of the reg definition.
-    LOAD_REGISTO = auto()
-    # Builds a new instance of a record using arguments on the stack. 8-bit arg indicates the number of fields to initialize.
-    # Expects n + 1 elements on the stack (first one is the Record object of the instance)
-    BUILD_OBJ = auto()
-    # Gets the propery TOS from the record instance TOS - 1.
-    GET_PROP = auto()
-    # Sets property TOS - 1 of the record instance at TOS - 2 to TOS.
-    SET_PROP = auto()
-    # Checks if value at TOS is null. if it is, either panic or return the value TOS - 1.
-    # 8-bit arg indicates whether to panic in case of null or to use the 8-bit arg at TOS - 1
-    OP_UNWRAP = auto()
-    # Checks if value at TOS is null. if it is, pushes 'true', else, pushes false
-    # 8-bit arg indicates whether to panic in case of null or to use the 8-bit arg at TOS - 1
-    OP_ISNULL = auto()
-    # Get the value of a global declared in another module. arg-1 (64-bit) is the index of the module in the table of imported modules,
-    # arg-2 (64-bit) is the index to the name of the var on the constant table.
-    LOAD_MODULE_DEF = auto()
-    # Builds a new variant object. The argument of the op is the number of variant constructor args. Expects the variant unique tag id to be TOS.
-    BUILD_VARIANT = auto()
-    # Binds the arguments of a variant or other supported object to local variables. The argument is the number of arguments to bind (N).
-    # Expects the object used for binding and N integers on the stack, where each integer is the index to a slot in the local variables of the current function where value shall be bound.
-    # e.g. for a variant with 3 args:  locals[TOS - 2] = TOS - 3[arg0],  locals[TOS - 1] = TOS - 3[arg1] and local[TOS] = TOS-3[arg2]
-    BIND_MATCH_ARGS = auto()
-    # Checks if the variant at TOS is has the integer tag specified by the 64-bit argument.
-    MATCH_VARIANT = auto()
-    # Stops execution of the VM. Must always be added to stop execution of the vm
-    HALT = 0xFF
-
-    def op_size(self) -> int:
-        # Return number of bytes (including args) that each op
-        # uses
-        num_ops = len(list(OpCode))
-        assert (
-            num_ops == 43
-        ), f"Please update the size of ops after adding a new Op. New size: {num_ops}"
-        match self:
-            case (
-                OpCode.CALL_FUNCTION
-                | OpCode.CAST
-                | OpCode.BUILD_STR
-                | OpCode.BUILD_VEC
-                | OpCode.BUILD_OBJ
-                | OpCode.OP_UNWRAP
-                | OpCode.BUILD_VARIANT
-                | OpCode.BIND_MATCH_ARGS
-            ):
-                return OP_SIZE * 2
-            case (
-                OpCode.LOAD_CONST
-                | OpCode.LOAD_NAME
-                | OpCode.SET_LOCAL
-                | OpCode.GET_LOCAL
-                | OpCode.GET_GLOBAL
-                | OpCode.SET_GLOBAL
-                | OpCode.LOAD_REGISTO
-            ):
-                return OP_SIZE * 3
-            case OpCode.JUMP | OpCode.JUMP_IF_FALSE | OpCode.MATCH_VARIANT:
-                return OP_SIZE * 9
-            case OpCode.LOAD_MODULE_DEF:
-                return OP_SIZE * 17
-            case _:
-                return OP_SIZE
-
-    def __str__(self) -> str:
-        return str(self.value)
-
-
-Instruction = tuple[OpCode, tuple[int, ...]]
 
 uniao_tag_attr = "_field"
 
@@ -177,13 +69,24 @@ class ByteGen:
     CONST_TABLE = 0
     NAME_TABLE = 1
 
-    def __init__(self, module: Module):
+    _generators = ast.Dispatcher("gen", "bad_gen")
+
+    def __init__(
+        self, module: Module, options: CompileOptions = DEFAULT_OPTIONS
+    ):
+        self.options = options
+        # Whether jump addresses are encoded with 32 bits and module
+        # indices with 16 bits instead of 64 bits
+        self.compact = options.compact_operands
         self.depth: int = -1
         self.ama_lineno: int = 1  # tracks lineno in input amanda src
         self.program_symtab: symbols.Scope = None  # type: ignore
         self.scope_symtab: symbols.Scope = None  # type: ignore
         self.func_locals: dict[str, int] = {}
-        self.const_table: dict[str, int] = {}
+        # Constants are keyed by their type and repr, so that 1, 1.0
+        # and verdadeiro, or 0.0 and -0.0, get different slots
+        self.const_table: dict[tuple[type, str], int] = {}
+        self.constants: list[fold.Value | None] = []
         self.uniao_variants: dict[str, int] = {}
         self.names = {}
         self.labels = {}
@@ -195,21 +98,21 @@ class ByteGen:
         self.ctx_module: Module = module
         self.ctx_loop_start: int = -1
         self.ctx_loop_exit: int = -1
-        self.src_map: dict[int, list[int]] = (
-            {}
-        )  # Maps source lines to bytecode offset
+        # Maps source lines to the ranges of offsets of their ops. A line
+        # has several ranges when its ops are split by those of other
+        # lines, like the increment of a 'para' loop, emitted after the body.
+        self.src_map: dict[int, list[list[int]]] = {}
+        # Line of the last op appended
+        self.map_lineno: int = -1
         self.modules: dict[str, int] = {}
 
     def compile_builtin(self, raw: bool = True) -> bytes | dict:
         self.append_op(OpCode.HALT)
-        ops = BytesIO()
-        for op in self.ops:
-            ops.write(self.write_op_bytes(op))
-        code = ops.getvalue()
-        ops.close()
+        code = self.encode_ops()
         module = {
             "name": path.split(self.ctx_module.fpath)[1].replace(".ama", ""),
             "builtin": 1,
+            "compact": 1 if self.compact else 0,
             "entry_locals": 0,
             "constants": [],
             "names": [],
@@ -221,7 +124,7 @@ class ByteGen:
         }
         if not raw:
             return module
-        return bindump.dumps(module)
+        return binmod.dumps(module)
 
     def compile(
         self, imports: dict[str, Module], raw: bool = True
@@ -233,8 +136,8 @@ class ByteGen:
         program = self.ctx_module.ast
         self.program_symtab = self.scope_symtab = program.symbols
         # Define builtin constants
-        self.get_table_index("verdadeiro", self.CONST_TABLE)
-        self.get_table_index("falso", self.CONST_TABLE)
+        self.get_table_index(True, self.CONST_TABLE)
+        self.get_table_index(False, self.CONST_TABLE)
         sym_types = (
             symbols.VariableSymbol,
             symbols.FunctionSymbol,
@@ -243,54 +146,52 @@ class ByteGen:
         if self.ctx_module.builtin:
             return self.compile_builtin(raw)
 
-        for name, symbol in program.symbols.symbols.items():
-            if type(symbol) in sym_types:
-                self.get_table_index(name, self.NAME_TABLE)
+        # Builtins live in the scopes enclosing the global scope
+        scopes = []
+        scope = program.symbols
+        while scope is not None:
+            scopes.append(scope)
+            scope = scope.enclosing_scope
+        for scope in reversed(scopes):
+            for name, symbol in scope.symbols.items():
+                if type(symbol) in sym_types:
+                    self.get_table_index(name, self.NAME_TABLE)
 
         for mod in imports.values():
             idx = len(self.modules)
             self.modules[mod.fpath] = idx
+        # Programs with too many modules for their indices to fit in
+        # compact operands fall back to wide ones
+        if len(self.modules) - 1 > MAX_COMPACT_MODULE:
+            self.compact = False
 
         compiled_imports = []
         for mod in imports.values():
-            if mod.fpath in self.modules and mod.compiled:
-                continue
-            compiler = ByteGen(mod)
+            compiler = ByteGen(mod, self.options)
             compiler.modules = self.modules
             module_out = compiler.compile({}, raw=False)
             compiled_imports.append(module_out)
-            mod.compiled = True
 
         self.compile_block(program)
         assert self.depth == -1, "A block was not exited in some local scope!"
         # Add halt ops
         self.lineno = 0
         self.append_op(OpCode.HALT)
-
-        ops = BytesIO()
-        for op in self.ops:
-            ops.write(self.write_op_bytes(op))
-        code = ops.getvalue()
-        ops.close()
+        self.optimize()
+        code = self.encode_ops()
 
         src_map = []
-        for lineno, offsets in self.src_map.items():
+        for lineno, ranges in self.src_map.items():
             if lineno == 0:
                 continue
-            # Offset array must contain start and end
-            # If it only contains one value, start == end
-            if len(offsets) == 1:
-                offsets.append(offsets[0])
-            assert (
-                len(offsets) == 2
-            ), f"Found line with offset != 2: {(lineno, offsets)}"
-            offsets.append(lineno)
-            src_map.extend(offsets)
+            for start, end in ranges:
+                src_map.extend((start, end, lineno))
         module = {
             "name": path.split(self.ctx_module.fpath)[1].replace(".ama", ""),
             "builtin": 1 if self.ctx_module.builtin else 0,
+            "compact": 1 if self.compact else 0,
             "entry_locals": len(self.func_locals),
-            "constants": list(self.const_table.keys()),
+            "constants": self.constants,
             "names": list(self.names.keys()),
             "ops": code,
             "functions": self.funcs,
@@ -300,7 +201,37 @@ class ByteGen:
         }
         if not raw:
             return module
-        return bindump.dumps(module)
+        return binmod.dumps(module)
+
+    def optimize(self):
+        """Runs the peephole pass over the ops and moves the labels,
+        function addresses and source map into the optimised code."""
+        if not self.options.peephole:
+            return
+        entries = [func["start_ip"] for func in self.funcs]
+        optimizer = peephole.Peephole(
+            self.ops,
+            self.labels,
+            entries,
+            self.options.superinstructions,
+            self.compact,
+        )
+        self.ops = optimizer.optimize()
+        self.ip = optimizer.size
+        self.labels = {
+            label: optimizer.relocate(addr)
+            for label, addr in self.labels.items()
+        }
+        for func in self.funcs:
+            func["start_ip"] = optimizer.relocate(func["start_ip"])
+        src_map = {}
+        for lineno, ranges in self.src_map.items():
+            for start, end in ranges:
+                start = optimizer.relocate(start)
+                end = optimizer.relocate_end(end)
+                if start <= end:
+                    src_map.setdefault(lineno, []).append([start, end])
+        self.src_map = src_map
 
     def new_label(self) -> int:
         idx = len(self.labels)
@@ -308,25 +239,24 @@ class ByteGen:
         return idx
 
     def patch_label_loc(self, label):
-        if self.ip > (2**64) - 1:
+        address_bits = 32 if self.compact else 64
+        if self.ip > (2**address_bits) - 1:
             raise Exception(
                 f"Address of jump ({self.ip}) is too large to be supported by the vm"
             )
         self.labels[label] = self.ip
 
     def append_op(self, op: OpCode, *args: int):
-        if self.lineno in self.src_map:
-            offsets = self.src_map[self.lineno]
-            if len(offsets) < 2:
-                offsets.append(self.ip)
-            elif offsets[-1] < self.ip:
-                offsets[-1] = self.ip
+        ranges = self.src_map.setdefault(self.lineno, [])
+        if ranges and self.map_lineno == self.lineno:
+            ranges[-1][1] = self.ip
         else:
-            self.src_map[self.lineno] = [self.ip]
-        self.ip += op.op_size() // OP_SIZE
+            ranges.append([self.ip, self.ip])
+        self.map_lineno = self.lineno
+        self.ip += op_sizes(self.compact)[op]
         self.ops.append((op, args))
 
-    def load_const(self, const):
+    def load_const(self, const: fold.Value | None):
         self.append_op(
             OpCode.LOAD_CONST, self.get_table_index(const, self.CONST_TABLE)
         )
@@ -336,49 +266,36 @@ class ByteGen:
             OpCode.LOAD_NAME, self.get_table_index(name, self.NAME_TABLE)
         )
 
-    def format_u64_arg(self, arg) -> List[int]:
-        u64 = struct.pack(">Q", arg)
-        return [int(b) for b in u64]
-
-    def format_u16_arg(self, arg):
-        high = (arg & 0xFF00) >> 8
-        low = arg & 0x00FF
-        return high, low
-
     def write_op_bytes(self, op) -> bytes:
         op, args = op
+        op_struct, value, is_jump = op_encoders(self.compact)[op]
         # Get patched jump label
-        if op in (OpCode.JUMP_IF_FALSE, OpCode.JUMP):
-            args = [self.labels[args[0]]]
-
-        if op.op_size() == OP_SIZE:
-            return bytes([op.value])
-        elif op.op_size() == OP_SIZE * 2:
-            return bytes([op.value, args[0]])
-        elif op.op_size() == OP_SIZE * 3:
-            high, low = self.format_u16_arg(args[0])
-            return bytes([op.value, high, low])
-        elif op.op_size() == OP_SIZE * 9:
-            u64 = self.format_u64_arg(args[0])
-            return bytes([op.value, *u64])
-        elif op.op_size() == OP_SIZE * 17:
-            return bytes(
-                [
-                    op.value,
-                    *self.format_u64_arg(args[0]),
-                    *self.format_u64_arg(args[1]),
-                ]
-            )
-
-        else:
-            raise NotImplementedError(
-                f"Encoding of op {op.name} has not yet been implemented"
-            )
+        if is_jump:
+            args = [self.labels[args[0]], *args[1:]]
+        return op_struct.pack(value, *args)
+
+    def encode_ops(self) -> bytes:
+        """Encodes all ops into a single buffer, allocated up front
+        using the size of each op."""
+        encoders = op_encoders(self.compact)
+        labels = self.labels
+        code = bytearray(sum(encoders[op][0].size for op, _ in self.ops))
+        offset = 0
+        for op, args in self.ops:
+            op_struct, value, is_jump = encoders[op]
+            if is_jump:
+                op_struct.pack_into(
+                    code, offset, value, labels[args[0]], *args[1:]
+                )
+            else:
+                op_struct.pack_into(code, offset, value, *args)
+            offset += op_struct.size
+        return bytes(code)
 
     def disassemble_op(self, op, args) -> str:
-        if op in (OpCode.JUMP_IF_FALSE, OpCode.JUMP):
+        if op.is_jump():
             # get jump address
-            args = [self.labels[args[0]]]
+            args = [self.labels[args[0]], *args[1:]]
         if len(args):
             op_args = " ".join([str(s) for s in args])
             return f"{op_args}"
@@ -391,18 +308,19 @@ class ByteGen:
         debug_out.write(str(len(self.func_locals)))
         debug_out.write("\n")
         debug_out.write(".consts\n")
-        for const, i in self.const_table.items():
-            debug_out.write(f"{i}: {const}\n")
+        for i, const in enumerate(self.constants):
+            debug_out.write(f"{i}: {const!r}\n")
         debug_out.write(".names\n")
         for name, i in self.names.items():
             debug_out.write(f"{i}: {name}\n")
         debug_out.write(".ops\n")
 
+        sizes = op_sizes(self.compact)
         i = 0
         for op, args in self.ops:
             op_args = self.disassemble_op(op, args)
             debug_out.write(f"{i}: {op.name} {op_args}".strip() + "\n")
-            i += op.op_size() // OP_SIZE
+            i += sizes[op]
 
         return self.build_str(debug_out)
 
@@ -420,15 +338,11 @@ class ByteGen:
         return string
 
     def gen(self, node: ast.ASTNode, args=None):
-        node_class = type(node).__name__.lower()
-        method_name = f"gen_{node_class}"
-        gen_method = getattr(self, method_name, self.bad_gen)
+        gen_method = self._generators.method(self, node)
         self.lineno = getattr(node, "lineno", self.lineno)
-        if node_class == "block":
-            result = gen_method(node, args)
-        else:
-            result = gen_method(node)
-        return result
+        if type(node) is ast.Block:
+            return gen_method(self, node, args)
+        return gen_method(self, node)
 
     def enter_block(self, scope):
         self.depth += 1
@@ -445,6 +359,10 @@ class ByteGen:
             self.gen(child)
         self.exit_block()
 
+    def gen_block(self, node: ast.Block, args=None):
+        # Branches of statements that were removed as dead code
+        self.compile_block(node)
+
     def gen_yieldblock(self, node: ast.YieldBlock):
         self.enter_block(node.symbols)
         for child in node.children:
@@ -456,23 +374,29 @@ class ByteGen:
             variant.variant_id(), len(self.uniao_variants)
         )
 
-    def get_table_index(self, item: str | int, table):
+    def get_table_index(self, item: fold.Value | None, table):
         # TODO: Make load const instruction use 64 bit arg
-        tab = self.const_table if table == self.CONST_TABLE else self.names
-        if item in tab:
-            idx = tab[item]
+        if table == self.CONST_TABLE:
+            key = (type(item), repr(item))
+            idx = self.const_table.setdefault(key, len(self.constants))
+            if idx == len(self.constants):
+                self.constants.append(item)
+        elif item in self.names:
+            idx = self.names[item]
         else:
-            idx = len(tab)
-            tab[item] = idx
-        assert (
-            idx < (2**16) - 1
-        ), f"Too many items in a single table for the current file."
+            idx = len(self.names)
+            self.names[item] = idx
+        if idx > MAX_TABLE_INDEX:
+            kind = "constantes" if table == self.CONST_TABLE else "nomes"
+            raise AmandaError.common_error(
+                self.ctx_module.fpath,
+                f"O módulo excede o limite de {MAX_TABLE_INDEX + 1} {kind}",
+                self.lineno,
+            )
         return idx
 
     def gen_constant(self, node: ast.Constant):
-        literal = str(node.token.lexeme)
-        idx = self.get_table_index(literal, self.CONST_TABLE)
-        self.append_op(OpCode.LOAD_CONST, idx)
+        self.load_const(fold.literal_value(node.token))
         self.gen_auto_cast(node.prom_type)
 
     def load_variable(self, symbol: Symbol):
@@ -534,16 +458,14 @@ class ByteGen:
         # Find a better way to do this
         init_values = {
             "int": 0,
-            "real": "0.0",  # Warning: This might come back to haunt me
-            "bool": "falso",
-            "texto": "''",
+            "real": 0.0,
+            "bool": False,
+            "texto": "",
         }
         if assign:
             self.gen_assign(assign)
         else:
-            initializer = init_values.get(str(node.var_type), "falso")
-            init_idx = self.get_table_index(initializer, self.CONST_TABLE)
-            self.append_op(OpCode.LOAD_CONST, init_idx)
+            self.load_const(init_values.get(str(node.var_type), False))
             self.set_variable(symbol)
 
     def set_variable(self, symbol: Symbol):
@@ -714,6 +636,14 @@ class ByteGen:
         range_expr = para_expr.range_expr
         scope = node.statement.symbols
         control_var = scope.resolve(para_expr.name.lexeme)
+        if (
+            self.options.superinstructions
+            and not control_var.is_global
+            and isinstance(range_expr.end, (ast.Constant, ast.Variable))
+            and (not range_expr.inc or isinstance(range_expr.inc, ast.Constant))
+        ):
+            self.gen_counted_para(node, control_var)
+            return
         # BEGIN LOOP
         after_loop = self.new_label()
         loop = self.new_label()
@@ -747,6 +677,42 @@ class ByteGen:
         self.patch_label_loc(after_loop)
         self.exit_block()
 
+    def gen_counted_para(self, node, control_var: Symbol):
+        """Generates a 'para' loop with a constant increment and a
+        simple end using superinstructions. The condition is tested
+        after the body, so an iteration runs the body and two ops."""
+        range_expr = node.expression.range_expr
+        end = range_expr.end
+        inc = range_expr.inc
+        cond = self.new_label()
+        loop = self.new_label()
+        block = node.statement
+        self.enter_block(block.symbols)
+
+        # initializer
+        self.gen(range_expr.start)
+        self.set_variable(control_var)
+        slot = self.func_locals[control_var.out_id]
+        self.append_op(OpCode.JUMP, cond)
+        # Body
+        self.patch_label_loc(loop)
+        for child in block.children:
+            self.gen(child)
+        # update: control_var += inc. Errors in the increment and in the
+        # condition are reported on the line of the loop.
+        self.lineno = node.lineno
+        step = fold.literal_value(inc.token) if inc else 1
+        const = self.get_table_index(step, self.CONST_TABLE)
+        self.append_op(OpCode.INC_LOCAL_CONST, slot, const)
+        # Condition: loop while control_var < end
+        self.patch_label_loc(cond)
+        if isinstance(end, ast.Constant):
+            self.gen_constant(end)
+        else:
+            self.gen_variable(end)
+        self.append_op(OpCode.LOCAL_LESS_JUMP_IF_TRUE, loop, slot)
+        self.exit_block()
+
     def gen_iguala(self, node: ast.Iguala):
         self.gen_iguala_from_ir(node, node.ir.tree)
 
@@ -770,9 +736,13 @@ class ByteGen:
     ):
         self.load_variable(var)
         match constructor:
-            case IntCons(val) | StrCons(val):
+            case IntCons(val):
                 self.load_const(val)
                 self.append_op(OpCode.OP_EQ)
+            case StrCons(val):
+                # The constructor holds the lexeme of the pattern
+                self.load_const(val[1:-1])
+                self.append_op(OpCode.OP_EQ)
             case VariantCons(tag=tag, uniao=uniao):
                 variant = uniao.variant_by_tag(tag)
                 # TODO: Fix this please!!!
@@ -847,7 +817,7 @@ class ByteGen:
             self.exit_block()
 
         # default return
-        self.load_const("falso")
+        self.load_const(False)
         self.append_op(OpCode.RETURN)
         num_locals = len(self.func_locals)
         self.func_locals = prev_func_locals
@@ -890,7 +860,7 @@ class ByteGen:
         if node.exp:
             self.gen(node.exp)
         else:
-            self.load_const("falso")
+            self.load_const(False)
         self.append_op(OpCode.RETURN)
 
     def gen_produz(self, node: ast.Produz):
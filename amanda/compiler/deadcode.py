@@ -0,0 +1,179 @@
+"""
+Removal of code that can never run.
+
+The pass runs on a module after it has been transformed and before
+code is generated for it. It removes:
+- statements that follow a 'retorna', 'quebra' or 'continua' in the
+same block;
+- 'se' branches and 'enquanto' loops whose condition is a constant
+(after constant folding), as well as 'escolha' cases that repeat the
+value of an earlier case;
+- in the entry module, top level functions that are never referenced.
+Imported modules keep all their functions, as any of them may be used
+by the modules that import them.
+"""
+
+from typing import Optional
+import amanda.compiler.ast as ast
+import amanda.compiler.symbols.core as symbols
+from amanda.compiler import fold
+from amanda.compiler.tokens import TokenType as TT
+
+
+class DeadCode:
+    def __init__(self, program: ast.Module, exported: bool):
+        self.program = program
+        self.exported = exported
+
+    def eliminate(self):
+        pending: list[ast.ASTNode] = [self.program]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, (ast.Block, ast.YieldBlock)):
+                node.children = self.prune(node.children)
+            pending.extend(node.child_nodes())
+        if not self.exported:
+            self.remove_unused_functions()
+
+    def prune(self, children: list[ast.ASTNode]) -> list[ast.ASTNode]:
+        live = []
+        for child in children:
+            if isinstance(child, ast.Se):
+                child = self.prune_se(child)
+            elif isinstance(child, ast.Enquanto):
+                if condition_value(child.condition) is False:
+                    child = None
+            if child is None:
+                continue
+            live.append(child)
+            if isinstance(child, (ast.Retorna, ast.LoopCtlStmt)):
+                break
+        return live
+
+    def prune_se(self, node: ast.Se) -> Optional[ast.ASTNode]:
+        """The 'se' statement without the branches that can't be
+        taken, the only branch that is always taken or None if no
+        branch is ever taken."""
+        branches = [(node.condition, node.then_branch)]
+        branches += [
+            (branch.condition, branch.then_branch)
+            for branch in node.elsif_branches
+        ]
+        else_branch = node.else_branch
+        live: list[int] = []
+        # Whether the conditions evaluated so far have no side effects
+        pure = True
+        for i, (condition, block) in enumerate(branches):
+            value = condition_value(condition)
+            if value is False:
+                continue
+            if value is True:
+                else_branch = block
+                break
+            if pure and any(
+                repeats_case(condition, branches[j][0]) for j in live
+            ):
+                continue
+            pure = pure and is_pure(condition)
+            live.append(i)
+
+        if not live:
+            if else_branch:
+                else_branch.parent = node.parent
+            return else_branch
+        first, *rest = live
+        node.elsif_branches = [node.elsif_branches[i - 1] for i in rest]
+        node.condition, node.then_branch = branches[first]
+        node.else_branch = else_branch
+        return node
+
+    def remove_unused_functions(self):
+        functions = {
+            child.name.lexeme: child
+            for child in self.program.children
+            if type(child) is ast.FunctionDecl
+            and not child.is_native
+            and not child.annotations
+        }
+        # Functions are only referenced by name, which over
+        # approximates the ones that are used
+        used: set[str] = set()
+        pending = [
+            child
+            for child in self.program.children
+            if type(child) is not ast.FunctionDecl
+            or child.name.lexeme not in functions
+        ]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, ast.Variable):
+                name = node.token.lexeme
+                if name in functions and name not in used:
+                    used.add(name)
+                    pending.append(functions[name])
+            pending.extend(node.child_nodes())
+
+        unused = functions.keys() - used
+        if not unused:
+            return
+        self.program.children = [
+            child
+            for child in self.program.children
+            if type(child) is not ast.FunctionDecl
+            or child.name.lexeme not in unused
+        ]
+        scope: symbols.Scope = self.program.symbols
+        for name in unused:
+            scope.symbols.pop(name, None)
+
+
+def condition_value(condition: ast.Expr) -> Optional[fold.Value]:
+    if isinstance(condition, ast.BinOp):
+        folded = fold.fold_binop(condition)
+        return fold.operand_value(folded) if folded else None
+    return fold.operand_value(condition)
+
+
+def repeats_case(condition: ast.Expr, prev: ast.Expr) -> bool:
+    """Whether 'condition' compares the same variable to the same
+    constant as 'prev', which happens when an 'escolha' repeats a case.
+    If the conditions evaluated in between have no side effects, the
+    variable can't change between both comparisons, so 'condition'
+    is false whenever it is evaluated."""
+    if not (
+        isinstance(condition, ast.BinOp)
+        and isinstance(prev, ast.BinOp)
+        and condition.token.token == prev.token.token == TT.DOUBLEEQUAL
+        and same_variable(condition.right, prev.right)
+    ):
+        return False
+    value = fold.operand_value(condition.left)
+    prev_value = fold.operand_value(prev.left)
+    return (
+        value is not None
+        and type(value) is type(prev_value)
+        and value == prev_value
+    )
+
+
+def same_variable(expr: ast.Expr, other: ast.Expr) -> bool:
+    if expr is other:
+        return isinstance(expr, (ast.Variable, ast.Constant))
+    return (
+        isinstance(expr, ast.Variable)
+        and isinstance(other, ast.Variable)
+        and expr.var_symbol is not None
+        and expr.var_symbol is other.var_symbol
+    )
+
+
+def is_pure(expr: ast.ASTNode) -> bool:
+    if isinstance(expr, (ast.Constant, ast.Variable)):
+        return True
+    if isinstance(expr, (ast.BinOp, ast.UnaryOp)):
+        return all(is_pure(child) for child in expr.child_nodes())
+    return False
+
+
+def eliminate_dead_code(program: ast.Module, exported: bool):
+    DeadCode(program, exported).eliminate()
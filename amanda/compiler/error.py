@@ -85,7 +85,8 @@ def fmt_error(context: str, error: AmandaError) -> str:
     return f"\n{err_header}\n    {context}\n{err_msg}\n"
 
 
-def throw_error(err: AmandaError) -> NoReturn:
+def report_error(err: AmandaError):
+    """Writes the formatted error to stderr."""
     # Attempt to get error line from file
     filename = path.abspath(err.fpath)
     assert path.isfile(filename), "Invalid filename supplied to error"
@@ -99,6 +100,10 @@ def throw_error(err: AmandaError) -> NoReturn:
     assert context is not None, "Context should always be a line from the file"
 
     sys.stderr.write(fmt_error(context, err))
+
+
+def throw_error(err: AmandaError) -> NoReturn:
+    report_error(err)
     sys.exit()
 
 
@@ -0,0 +1,175 @@
+"""
+Compile time evaluation of operations on constants.
+
+The values produced here must be exactly the ones the VM would
+compute at runtime, so the rules below mirror the VM's and not
+Python's: integer arithmetic is checked i64 arithmetic, '%' and '//'
+truncate towards zero, and so on.
+Whenever the VM would raise an error (overflow, division by zero)
+or not support an operation, nothing is folded and the operation
+is left for the runtime, so that it fails the same way it would
+without folding.
+"""
+
+import math
+from typing import Optional
+import amanda.compiler.ast as ast
+from amanda.compiler.tokens import Token, TokenType as TT
+from amanda.compiler.types.builtins import Builtins
+
+I64_MIN = -(2**63)
+I64_MAX = 2**63 - 1
+
+# Value of a constant as seen by the VM
+Value = int | float | bool | str
+
+
+def literal_value(token: Token) -> Optional[Value]:
+    """Value the VM loads for a literal, or None for 'nulo'."""
+    match token.token:
+        case TT.INTEGER:
+            value = int(token.lexeme)
+            if I64_MIN <= value <= I64_MAX:
+                return value
+            # Integers that don't fit in an i64 are loaded as reals
+            return float(str(value))
+        case TT.REAL:
+            return float(token.lexeme)
+        case TT.STRING:
+            return str(token.lexeme)[1:-1]
+        case TT.VERDADEIRO | TT.FALSO:
+            return token.token == TT.VERDADEIRO
+        case _:
+            return None
+
+
+def operand_value(node: ast.ASTNode) -> Optional[Value]:
+    """Value of a constant operand, after the promotion the
+    analyzer added to it, or None if it is not a constant."""
+    if not isinstance(node, ast.Constant):
+        return None
+    value = literal_value(node.token)
+    if type(value) is float and not math.isfinite(value):
+        return None
+    if node.prom_type == Builtins.Real:
+        # The VM only converts integers to reals
+        return float(value) if type(value) is int else None
+    return value
+
+
+def _int_result(value: int) -> Optional[int]:
+    return value if I64_MIN <= value <= I64_MAX else None
+
+
+def _real_result(value: float) -> Optional[float]:
+    return value if math.isfinite(value) else None
+
+
+def _trunc_div(left: int, right: int) -> int:
+    quotient = abs(left) // abs(right)
+    return -quotient if (left < 0) != (right < 0) else quotient
+
+
+def _trunc_rem(left: int, right: int) -> int:
+    rem = abs(left) % abs(right)
+    return -rem if left < 0 else rem
+
+
+def binop(op: TT, left: Value, right: Value) -> Optional[Value]:
+    left_ty, right_ty = type(left), type(right)
+    numeric = left_ty in (int, float) and right_ty in (int, float)
+    is_real = numeric and float in (left_ty, right_ty)
+    is_int = left_ty is int and right_ty is int
+    match op:
+        case TT.PLUS | TT.MINUS | TT.STAR if numeric:
+            if op == TT.PLUS:
+                result = left + right
+            elif op == TT.MINUS:
+                result = left - right
+            else:
+                result = left * right
+            if is_real:
+                return _real_result(float(result))
+            return _int_result(result)
+        case TT.SLASH if numeric and right != 0:
+            return _real_result(float(left) / float(right))
+        case TT.MODULO if numeric and right != 0:
+            if is_real:
+                return _real_result(math.fmod(left, right))
+            if left == I64_MIN and right == -1:
+                # Overflows in the VM, even though the result is 0
+                return None
+            return _trunc_rem(left, right)
+        case TT.DOUBLESLASH if is_int and right != 0:
+            return _int_result(_trunc_div(left, right))
+        case TT.E | TT.OU if left_ty is bool and right_ty is bool:
+            return left and right if op == TT.E else left or right
+        case TT.DOUBLEEQUAL | TT.NOTEQUAL if numeric or left_ty is right_ty:
+            if is_real:
+                left, right = float(left), float(right)
+            return (left == right) == (op == TT.DOUBLEEQUAL)
+        case TT.GREATER | TT.GREATEREQ | TT.LESS | TT.LESSEQ if numeric:
+            if is_real:
+                left, right = float(left), float(right)
+            if op == TT.GREATER:
+                return left > right
+            elif op == TT.GREATEREQ:
+                return left >= right
+            elif op == TT.LESS:
+                return left < right
+            return left <= right
+    return None
+
+
+def unaryop(op: TT, operand: Value) -> Optional[Value]:
+    match op:
+        case TT.MINUS if type(operand) is float:
+            return -operand
+        case TT.MINUS if type(operand) is int and operand != I64_MIN:
+            return -operand
+        case TT.NAO if type(operand) is bool:
+            return not operand
+    return None
+
+
+def constant(value: Value, node: ast.Expr) -> Optional[ast.Constant]:
+    """Constant node holding 'value', to replace 'node'.
+    The promotion of 'node', if any, is applied to the value."""
+    eval_type, prom_type = node.eval_type, node.prom_type
+    if prom_type == Builtins.Real:
+        if type(value) is not int:
+            return None
+        value, eval_type, prom_type = float(value), Builtins.Real, None
+    line, col = node.token.line, node.token.col
+    if type(value) is bool:
+        lexeme = "verdadeiro" if value else "falso"
+        token = Token(TT.VERDADEIRO if value else TT.FALSO, lexeme, line, col)
+    elif type(value) is int:
+        token = Token(TT.INTEGER, value, line, col)
+    elif type(value) is float:
+        token = Token(TT.REAL, value, line, col)
+    else:
+        return None
+    folded = ast.Constant(token)
+    folded.eval_type = eval_type
+    folded.prom_type = prom_type
+    folded.parent = node.parent
+    folded.lineno = node.lineno
+    return folded
+
+
+def fold_binop(node: ast.BinOp) -> Optional[ast.Constant]:
+    left = operand_value(node.left)
+    right = operand_value(node.right)
+    if left is None or right is None:
+        return None
+    value = binop(node.token.token, left, right)
+    return None if value is None else constant(value, node)
+
+
+def fold_unaryop(node: ast.UnaryOp) -> Optional[ast.Constant]:
+    operand = operand_value(node.operand)
+    if operand is None:
+        return None
+    value = unaryop(node.token.token, operand)
+    return None if value is None else constant(value, node)
@@ -0,0 +1,223 @@
+"""
+Discovery and parsing of the modules imported by a program.
+
+Modules must declare their imports ('usa' statements) at the top,
+so the import graph of a program can be built by reading only
+those headers. Once the graph is known, every module in it is
+parsed up front, in worker processes if the caller asks for them
+and there are enough modules.
+The analyzer then picks up the parsed modules as it loads them,
+which it does in a topological order of the graph.
+
+Modules are found and read through an ImportResolver, so a program
+and its imports don't have to be files: a MemoryResolver serves them
+from a map of paths to source text.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+from typing import Mapping, Optional
+import amanda.compiler.ast as ast
+from amanda.compiler.error import AmandaError
+from amanda.compiler.parse import Parser, parse
+from amanda.compiler.resolve import resolve_import
+from amanda.compiler import stdbundle
+from amanda.config import STD_LIB
+
+# Parsing fewer modules than this is not worth the cost
+# of starting worker processes
+MIN_PARALLEL_MODULES = 8
+
+# A module that failed to parse maps to the error it raised.
+# The error is only reported when the analyzer gets to that module.
+ParsedModules = dict[str, ast.Module | AmandaError]
+
+
+def usa_path(node: ast.Usa) -> str:
+    """Path of the module referenced by a 'usa' statement, with the
+    '.ama' extension added if it is missing."""
+    fpath = node.module.lexeme.replace("'", "").replace('"', "")
+    head, tail = path.split(fpath)
+    if tail and tail.split(".")[-1] != "ama":
+        tail = tail + ".ama"
+    return path.join(head, tail)
+
+
+def in_std_lib(fpath: str) -> bool:
+    return path.dirname(fpath) == path.abspath(STD_LIB)
+
+
+class ImportResolver:
+    """Finds and reads the modules of a program in the file system."""
+
+    def resolve(self, fpath: str, import_paths: list[str]) -> Optional[str]:
+        return resolve_import(fpath, import_paths)
+
+    def read(self, fpath: str) -> str:
+        with open(fpath, encoding="utf-8") as src_file:
+            return src_file.read()
+
+
+class MemoryResolver(ImportResolver):
+    """Serves modules from a map of paths to their source text.
+    Paths are resolved like those of files, relative to the cwd or to
+    the import paths, but nothing outside of the map is read except
+    for the modules of the std lib."""
+
+    def __init__(self, files: Mapping[str, str]):
+        self.files = {path.abspath(fpath): src for fpath, src in files.items()}
+
+    def resolve(self, fpath: str, import_paths: list[str]) -> Optional[str]:
+        for mod_path in (fpath, *(path.join(d, fpath) for d in import_paths)):
+            mod_path = path.abspath(mod_path)
+            if mod_path in self.files:
+                return mod_path
+        std_path = path.abspath(path.join(STD_LIB, fpath))
+        if in_std_lib(std_path) and path.isfile(std_path):
+            return std_path
+        return None
+
+    def read(self, fpath: str) -> str:
+        if fpath in self.files:
+            return self.files[fpath]
+        if not in_std_lib(fpath):
+            raise FileNotFoundError(fpath)
+        return super().read(fpath)
+
+
+FILE_RESOLVER = ImportResolver()
+
+
+def read_imports(
+    filename: str,
+    import_paths: list[str],
+    source: Optional[str] = None,
+    resolver: ImportResolver = FILE_RESOLVER,
+) -> list[str]:
+    """Resolved paths of the modules imported by 'filename', or by
+    'source' if the module's text is given.
+    Imports that can't be read or resolved are left out, the analyzer
+    reports them when it gets to them."""
+    try:
+        if source is None:
+            source = resolver.read(filename)
+        _, usa_stmts = Parser(filename, source).usa_header()
+    except (OSError, UnicodeDecodeError, AmandaError):
+        return []
+    imports = []
+    for node in usa_stmts:
+        mod_path = resolver.resolve(usa_path(node), import_paths)
+        if mod_path:
+            imports.append(mod_path)
+    return imports
+
+
+def import_graph(
+    filename: str,
+    import_paths: list[str],
+    source: Optional[str] = None,
+    resolver: ImportResolver = FILE_RESOLVER,
+) -> dict[str, list[str]]:
+    """Maps every module reachable from 'filename' to the modules it
+    imports. 'source' is the text of the entry module, when it isn't
+    to be read from 'filename'."""
+    entry = path.abspath(filename)
+    graph: dict[str, list[str]] = {
+        entry: read_imports(entry, import_paths, source, resolver)
+    }
+    pending = list(graph[entry])
+    while pending:
+        module = pending.pop()
+        if module in graph:
+            continue
+        graph[module] = read_imports(module, import_paths, None, resolver)
+        pending.extend(graph[module])
+    return graph
+
+
+def parse_module(filename: str, source: str) -> ast.Module:
+    """Parses the module in 'filename', whose text is 'source'. Modules
+    of the std lib are taken from the std bundle when possible."""
+    program = stdbundle.load_module(filename, source)
+    return program if program is not None else parse(filename, source)
+
+
+def parse_file(filename: str, source: str) -> ast.Module | AmandaError:
+    try:
+        return parse_module(filename, source)
+    except AmandaError as e:
+        return e
+
+
+def _parse_untagged(filename: str, source: str):
+    # Runs in a worker process. Parent links are added by the caller,
+    # as they make the tree much deeper to pickle.
+    # AmandaError can't be pickled as is, so its fields are sent instead.
+    try:
+        return Parser(filename, source).parse(), None
+    except AmandaError as e:
+        return None, (e.err_type, e.fpath, e.message, e.line, e.col)
+
+
+def read_sources(
+    modules: list[str], resolver: ImportResolver
+) -> list[tuple[str, str]]:
+    """Pairs each module with its source text. Modules that can't be
+    read are left out, for the analyzer to report."""
+    sources = []
+    for module in modules:
+        try:
+            sources.append((module, resolver.read(module)))
+        except (OSError, UnicodeDecodeError):
+            continue
+    return sources
+
+
+def parse_modules(
+    modules: list[str],
+    workers: int = 1,
+    resolver: ImportResolver = FILE_RESOLVER,
+) -> ParsedModules:
+    """Parses 'modules', in 'workers' processes if there are enough of
+    them. Starting the workers and sending the trees back costs more than
+    parsing a small program, so modules are parsed in this process
+    unless more workers are asked for."""
+    sources = read_sources(modules, resolver)
+    if workers < 2 or len(sources) < MIN_PARALLEL_MODULES:
+        return {module: parse_file(module, src) for module, src in sources}
+
+    parsed: ParsedModules = {}
+    with ProcessPoolExecutor(min(workers, len(sources))) as pool:
+        futures = [pool.submit(_parse_untagged, *entry) for entry in sources]
+        for (module, _), future in zip(sources, futures):
+            try:
+                program, error = future.result()
+            except Exception:
+                # Leave it to the analyzer to parse it again
+                # and report whatever went wrong
+                continue
+            if error is not None:
+                parsed[module] = AmandaError(*error)
+            else:
+                program.tag_children()
+                parsed[module] = program
+    return parsed
+
+
+def parse_program(
+    filename: str,
+    import_paths: list[str],
+    workers: int = 1,
+    source: Optional[str] = None,
+    resolver: ImportResolver = FILE_RESOLVER,
+) -> ParsedModules:
+    """Parses the program in 'filename' and every module it imports,
+    directly or not. If 'source' is given, it is parsed as the text of
+    the program instead of the contents of 'filename'."""
+    modules = list(import_graph(filename, import_paths, source, resolver))
+    if source is None:
+        return parse_modules(modules, workers, resolver)
+    # The entry module is always the first one in the graph
+    parsed = parse_modules(modules[1:], workers, resolver)
+    parsed[modules[0]] = parse_file(filename, source)
+    return parsed
@@ -9,7 +9,6 @@ class Module:
     ast: Any = None
     loaded: bool = False
     builtin: bool = False
-    compiled: bool = False
 
     def __str__(self) -> str:
         _, tail = path.split(self.fpath)
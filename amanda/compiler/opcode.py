@@ -0,0 +1,181 @@
+from enum import Enum, auto
+
+OP_SIZE = 8
+
+
+class OpCode(Enum):
+    # Prints TOS
+    MOSTRA = 0x00
+    # Loads the constant at index specified by arg. Constant becomes TOS.
+    LOAD_CONST = auto()
+    # Loads the name at index specified by arg. Name becomes TOS.
+    LOAD_NAME = auto()
+    # All OP instructions use 1 or 2 on the stack add pop them
+    OP_ADD = auto()
+    OP_MINUS = auto()
+    OP_MUL = auto()
+    OP_DIV = auto()
+    OP_FLOORDIV = auto()
+    OP_MODULO = auto()
+    OP_INVERT = auto()
+    OP_AND = auto()
+    OP_OR = auto()
+    OP_NOT = auto()
+    OP_EQ = auto()
+    OP_NOTEQ = auto()
+    OP_GREATER = auto()
+    OP_GREATEREQ = auto()
+    OP_LESS = auto()
+    OP_LESSEQ = auto()
+    # Uses TOS to index into TOS - 1. The result is pushed onto the stack
+    OP_INDEX_GET = auto()
+    # Performs TOS-2[TOS-1] = TOS.
+    OP_INDEX_SET = auto()
+    # Gets a global variable. The arg is the index to the name of the var on the
+    # constant table. Pushes value to the top of the stack
+    GET_GLOBAL = auto()
+    # Sets global variable. The arg is the index to the name of the var on the
+    # constant table. Pops TOS and sets it as the value of the local
+    SET_GLOBAL = auto()
+    # Sets the pc to the arg.
+    JUMP = auto()
+    # If TOS == false, sets pc to the args. Pops TOS
+    JUMP_IF_FALSE = auto()
+    # Gets the value of a non-global variable. The arg is the slot on the stack where the var was stored
+    GET_LOCAL = auto()
+    # Sets the value of a non-global variable. The arg is the slot on the stack where the var should be stored
+    SET_LOCAL = auto()
+    # Calls a function. The argument of the op is the number args. Expects function value to be TOS.
+    CALL_FUNCTION = auto()
+    # Returns  from the caller.
+    RETURN = auto()
+    # Converts a value into the desired type. Expects TOS to be the target type and TOS-1 the value to convert.
+    # Takes an 8-bit argument that changes the 'strictness' of the conversion.
+    # 0 (cast): Performs the cast as long as the builtin type can be cast into type.
+    # 1 (check cast): Validates if 'interface' type can be cast into the desired type.
+    CAST = auto()
+    # Builds a string using elements on the stack. 8-bit arg indicates the number of elements
+    # on the stack to use
+    BUILD_STR = auto()
+    # Builds a vec using elements on the stack. 8-bit arg indicates the number of elements
+    # on the stack to use.
+    # Builds a vec using elements on the stack. 8-bit arg indicates the number of elements
+    # on the stack to use.
+    BUILD_VEC = auto()
+    # Loads a record definition. 16 bit-arg indicates the index of the reg definition.
+    LOAD_REGISTO = auto()
+    # Builds a new instance of a record using arguments on the stack. 8-bit arg indicates the number of fields to initialize.
+    # Expects n + 1 elements on the stack (first one is the Record object of the instance)
+    BUILD_OBJ = auto()
+    # Gets the propery TOS from the record instance TOS - 1.
+    GET_PROP = auto()
+    # Sets property TOS - 1 of the record instance at TOS - 2 to TOS.
+    SET_PROP = auto()
+    # Checks if value at TOS is null. if it is, either panic or return the value TOS - 1.
+    # 8-bit arg indicates whether to panic in case of null or to use the 8-bit arg at TOS - 1
+    OP_UNWRAP = auto()
+    # Checks if value at TOS is null. if it is, pushes 'true', else, pushes false
+    # 8-bit arg indicates whether to panic in case of null or to use the 8-bit arg at TOS - 1
+    OP_ISNULL = auto()
+    # Get the value of a global declared in another module. arg-1 (64-bit) is the index of the module in the table of imported modules,
+    # arg-2 (64-bit) is the index to the name of the var on the constant table.
+    LOAD_MODULE_DEF = auto()
+    # Builds a new variant object. The argument of the op is the number of variant constructor args. Expects the variant unique tag id to be TOS.
+    BUILD_VARIANT = auto()
+    # Binds the arguments of a variant or other supported object to local variables. The argument is the number of arguments to bind (N).
+    # Expects the object used for binding and N integers on the stack, where each integer is the index to a slot in the local variables of the current function where value shall be bound.
+    # e.g. for a variant with 3 args:  locals[TOS - 2] = TOS - 3[arg0],  locals[TOS - 1] = TOS - 3[arg1] and local[TOS] = TOS-3[arg2]
+    BIND_MATCH_ARGS = auto()
+    # Checks if the variant at TOS is has the integer tag specified by the 64-bit argument.
+    MATCH_VARIANT = auto()
+    # If TOS == true, sets pc to the args. Pops TOS
+    JUMP_IF_TRUE = auto()
+    # Pushes a copy of TOS
+    DUP = auto()
+    # Adds the constant at the index specified by arg-2 (16-bit) to the
+    # local at the slot specified by arg-1 (16-bit).
+    INC_LOCAL_CONST = auto()
+    # Pops TOS and checks if the local at the slot specified by arg-2 (16-bit)
+    # is less than it. If it is, sets the pc to arg-1 (address, 32 or 64 bits
+    # depending on compact operands).
+    LOCAL_LESS_JUMP_IF_TRUE = auto()
+    # Pushes the locals at the slots specified by arg-1 and arg-2 (16-bit).
+    GET_LOCAL_GET_LOCAL = auto()
+    # Stops execution of the VM. Must always be added to stop execution of the vm
+    HALT = 0xFF
+
+    def arg_sizes(self, compact: bool = False) -> tuple[int, ...]:
+        # Return number of bytes used by each arg of the op.
+        # With compact operands, addresses and variant tags use
+        # 32 bits and module and name indices use 16 bits
+        match self:
+            case (
+                OpCode.CALL_FUNCTION
+                | OpCode.CAST
+                | OpCode.BUILD_STR
+                | OpCode.BUILD_VEC
+                | OpCode.BUILD_OBJ
+                | OpCode.OP_UNWRAP
+                | OpCode.BUILD_VARIANT
+                | OpCode.BIND_MATCH_ARGS
+            ):
+                return (1,)
+            case (
+                OpCode.LOAD_CONST
+                | OpCode.LOAD_NAME
+                | OpCode.SET_LOCAL
+                | OpCode.GET_LOCAL
+                | OpCode.GET_GLOBAL
+                | OpCode.SET_GLOBAL
+                | OpCode.LOAD_REGISTO
+            ):
+                return (2,)
+            case OpCode.INC_LOCAL_CONST | OpCode.GET_LOCAL_GET_LOCAL:
+                return (2, 2)
+            case (
+                OpCode.JUMP
+                | OpCode.JUMP_IF_FALSE
+                | OpCode.JUMP_IF_TRUE
+                | OpCode.MATCH_VARIANT
+            ):
+                return (4,) if compact else (8,)
+            case OpCode.LOCAL_LESS_JUMP_IF_TRUE:
+                return (4, 2) if compact else (8, 2)
+            case OpCode.LOAD_MODULE_DEF:
+                return (2, 2) if compact else (8, 8)
+            case _:
+                return ()
+
+    def op_size(self, compact: bool = False) -> int:
+        # Return number of bits (including args) that each op
+        # uses
+        return OP_SIZE * op_sizes(compact)[self]
+
+    def is_jump(self) -> bool:
+        # Whether the first arg of the op is a label
+        return self in (
+            OpCode.JUMP,
+            OpCode.JUMP_IF_FALSE,
+            OpCode.JUMP_IF_TRUE,
+            OpCode.LOCAL_LESS_JUMP_IF_TRUE,
+        )
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+Instruction = tuple[OpCode, tuple[int, ...]]
+
+
+# Number of bytes (including args) used by each op. The tables are
+# checked against the list of ops in tests/test_opcode.py
+OP_SIZES: dict[OpCode, int] = {op: 1 + sum(op.arg_sizes()) for op in OpCode}
+# Number of bytes used by each op when encoded with compact operands
+COMPACT_OP_SIZES: dict[OpCode, int] = {
+    op: 1 + sum(op.arg_sizes(compact=True)) for op in OpCode
+}
+
+
+def op_sizes(compact: bool = False) -> dict[OpCode, int]:
+    """Returns the table with the size in bytes of each op."""
+    return COMPACT_OP_SIZES if compact else OP_SIZES
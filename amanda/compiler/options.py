@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CompileOptions:
+    """Optimisations applied when compiling a program, all on by default.
+    They are given to the Analyzer and to ByteGen of each compilation,
+    so compilations with different options can't affect each other."""
+
+    # Evaluate operations on constants at compile time
+    fold_constants: bool = True
+    # Remove code that can never run
+    dead_code: bool = True
+    # Run the peephole pass over the generated ops
+    peephole: bool = True
+    # Emit fused ops for common sequences of ops
+    superinstructions: bool = True
+    # Encode jump addresses with 32 bits and module indices with 16 bits
+    # instead of 64 bits, unless the program has too many modules
+    compact_operands: bool = True
+
+
+DEFAULT_OPTIONS = CompileOptions()
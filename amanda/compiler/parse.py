@@ -1,7 +1,7 @@
 import os
-import copy
+import re
 from io import StringIO
-from typing import List, NoReturn, Union
+from typing import List, NoReturn, Optional, Union
 from amanda.compiler.tokens import TokenType as TT, is_ambiguous_char
 from amanda.compiler.tokens import Token
 from amanda.compiler.tokens import KEYWORDS as TK_KEYWORDS
@@ -9,8 +9,18 @@ from amanda.compiler.error import AmandaError
 import amanda.compiler.ast as ast
 from utils.tycheck import unreachable
 
+# Runs of characters that the lexer skips or copies verbatim.
+# Matching them with a single regex call is much cheaper
+# than stepping through them one character at a time.
+_INLINE_SPACE = re.compile(r"[^\S\n]*")
+_STR_CHARS = {
+    "'": re.compile(r"[^'\\]*"),
+    '"': re.compile(r'[^"\\]*'),
+}
+# Same set of chars as str.isalnum() plus '_'
+_IDENT_CHARS = re.compile(r"\w*")
+
 
-# TODO: Stop concatenating strings. Use buffers instead
 class Lexer:
     # Special end of file token
     EOF = "__eof__"
@@ -24,7 +34,14 @@ class Lexer:
         self.pos = 1
         self.current_token = None
         self.current_char: str = None  # type: ignore
-        self.src = src  # A file object
+        # The whole source is kept in memory and scanned with an
+        # integer cursor. 'src' may be a string or a file object,
+        # in which case it is read once, before the first token.
+        self.src = src
+        self.text: str = ""
+        self.text_len = 0
+        # Index of the next character to be read
+        self.idx = 0
 
     def set_src(self, src):
         self.src = src
@@ -32,21 +49,44 @@ class Lexer:
         self.pos = 1
         self.current_token = None
         self.current_char = None  # type: ignore
+        self.text = ""
+        self.text_len = 0
+        self.idx = 0
+
+    def load_src(self):
+        src = self.src
+        self.text = src if isinstance(src, str) else src.read()
+        self.text_len = len(self.text)
+        self.idx = 0
 
     def advance(self):
         if self.current_char == Lexer.EOF:
             return
-        self.current_char = self.src.read(1)
-        if self.current_char == "":
+        idx = self.idx
+        if idx < self.text_len:
+            self.current_char = self.text[idx]
+            self.idx = idx + 1
+            self.pos += 1
+        else:
             self.current_char = Lexer.EOF
+
+    def advance_to(self, idx: int):
+        """Moves the cursor so that the char at 'idx' becomes
+        the current char. Equivalent to calling 'advance' until
+        that char is reached."""
+        current = self.idx - 1
+        if idx < self.text_len:
+            self.pos += idx - current
+            self.idx = idx + 1
+            self.current_char = self.text[idx]
         else:
-            self.pos += 1
+            self.pos += self.text_len - 1 - current
+            self.idx = self.text_len
+            self.current_char = Lexer.EOF
 
     def lookahead(self):
-        last_position = self.src.tell()
-        next_char = self.src.read(1)
-        self.src.seek(last_position)
-        return next_char
+        idx = self.idx
+        return self.text[idx] if idx < self.text_len else ""
 
     def error(self, code, **kwargs):
         message = code.format(**kwargs)
@@ -63,18 +103,16 @@ class Lexer:
         return Token(TT.NEWLINE, "\\n", line, pos)
 
     def whitespace(self):
-        while (
-            self.current_char != "\n"
-            and self.current_char.isspace()
-            and self.current_char != Lexer.EOF
-        ):
-            self.advance()
+        if self.current_char != Lexer.EOF:
+            self.advance_to(_INLINE_SPACE.match(self.text, self.idx - 1).end())
         if self.current_char == "#":
             self.comment()
 
     def comment(self):
-        while self.current_char != "\n" and self.current_char != Lexer.EOF:
-            self.advance()
+        if self.current_char == Lexer.EOF:
+            return
+        end = self.text.find("\n", self.idx - 1)
+        self.advance_to(end if end != -1 else self.text_len)
 
     def arit_operators(self):
         if self.current_char == "+":
@@ -121,26 +159,29 @@ class Lexer:
             self.error(self.INVALID_SYMBOL, symbol=self.current_char)
 
     def number(self):
-        result = ""
-        while self.current_char.isdigit():
-            result += self.current_char
-            self.advance()
-        if self.current_char == ".":
-            # lookahead to see next char i
-            if self.lookahead().isdigit():
-                result += "."
-                self.advance()
-                while self.current_char.isdigit():
-                    result += self.current_char
-                    self.advance()
-        if "." in result:
-            return Token(
-                TT.REAL, float(result), self.line, self.pos - (len(result) + 1)
-            )
-
-        return Token(
-            TT.INTEGER, int(result), self.line, self.pos - (len(result) + 1)
+        # Lexemes are sliced out of the source instead of being
+        # built one char at a time.
+        # isdigit is used instead of a regex to keep accepting
+        # the same set of digits as before
+        text = self.text
+        text_len = self.text_len
+        start = self.idx - 1
+        end = start
+        while end < text_len and text[end].isdigit():
+            end += 1
+        is_real = (
+            end + 1 < text_len and text[end] == "." and text[end + 1].isdigit()
         )
+        if is_real:
+            end += 1
+            while end < text_len and text[end].isdigit():
+                end += 1
+        self.advance_to(end)
+        result = text[start:end]
+        col = self.pos - (len(result) + 1)
+        if is_real:
+            return Token(TT.REAL, float(result), self.line, col)
+        return Token(TT.INTEGER, int(result), self.line, col)
 
     def escape_seq(self, char, result, seq):
         if self.lookahead() == char:
@@ -155,7 +196,15 @@ class Lexer:
         symbol = self.current_char
         start_pos = self.pos
         self.advance()
+        str_chars = _STR_CHARS[symbol]
         while self.current_char != symbol:
+            if self.current_char != Lexer.EOF:
+                start = self.idx - 1
+                end = str_chars.match(self.text, start).end()
+                if end > start:
+                    result.write(self.text[start:end])
+                    self.advance_to(end)
+                    continue
             if self.current_char == "\\":
                 # Attempt to read different control sequences
                 # if control sequence is not read, just process
@@ -183,17 +232,13 @@ class Lexer:
         )
 
     def identifier(self):
-        result = ""
-        while self.current_char.isalnum() or self.current_char == "_":
-            result += self.current_char
-            self.advance()
-        if TK_KEYWORDS.get(result) is not None:
-            token = copy.copy(TK_KEYWORDS.get(result))
-            token.line = self.line
-            token.col = self.pos - (len(result) + 1)
-            return token
+        start = self.idx - 1
+        end = _IDENT_CHARS.match(self.text, start).end()
+        self.advance_to(end)
+        result = self.text[start:end]
+        token_type = TK_KEYWORDS.get(result, TT.IDENTIFIER)
         return Token(
-            TT.IDENTIFIER, result, self.line, self.pos - (len(result) + 1)
+            token_type, result, self.line, self.pos - (len(result) + 1)
         )
 
     def common_toks(self) -> Token | None:
@@ -225,6 +270,7 @@ class Lexer:
 
     def get_token(self) -> Token:
         if self.current_char is None:
+            self.load_src()
             self.advance()
         if self.current_char == "#":
             self.comment()
@@ -252,6 +298,17 @@ class Lexer:
 
         self.error(self.INVALID_SYMBOL, symbol=self.current_char)
 
+    def tokenize(self) -> List[Token]:
+        """Lexes the whole source in a single pass. The returned
+        list always ends with the EOF token."""
+        tokens = []
+        get_token = self.get_token
+        while True:
+            token = get_token()
+            tokens.append(token)
+            if token.token == Lexer.EOF:
+                return tokens
+
 
 class Parser:
     # Errors messages
@@ -303,13 +360,7 @@ class Parser:
 
     def module(self):
         module = ast.Module()
-        imports = []
-        self.skip_newlines()
-        mod_annotations = self.module_annotations()
-        while self.match(TT.USA):
-            imports.append(self.usa_stmt())
-            self.skip_newlines()
-
+        mod_annotations, imports = self.usa_header()
         self.append_child(module, imports)
         module.annotations = mod_annotations
         while not self.match(Lexer.EOF):
@@ -320,6 +371,18 @@ class Parser:
                 self.append_child(module, child)
         return module
 
+    def usa_header(self) -> tuple[list[ast.Annotation], list[ast.Usa]]:
+        """Parses the annotations and the 'usa' statements at the top of
+        a module. Modules must declare their imports there, so this is
+        all that has to be parsed to find them."""
+        imports = []
+        self.skip_newlines()
+        annotations = self.module_annotations()
+        while self.match(TT.USA):
+            imports.append(self.usa_stmt())
+            self.skip_newlines()
+        return annotations, imports
+
     def module_annotations(self) -> list[ast.Annotation]:
         annotations = []
         while self.match(TT.DOUBLEAT):
@@ -1199,8 +1262,15 @@ class Parser:
         char = format_str.read(1)
         parts = []
 
+        # Parts keep the delimiters, like the lexemes of other strings
+        delimiter = token.lexeme[0]
         tokenify_str = lambda lexeme: ast.Constant(
-            Token(TT.STRING, lexeme=lexeme, line=token.line, col=token.col)
+            Token(
+                TT.STRING,
+                lexeme=f"{delimiter}{lexeme}{delimiter}",
+                line=token.line,
+                col=token.col,
+            )
         )
         # TODO: Reuse this buffer
         current_str = StringIO()
@@ -1347,9 +1417,12 @@ class Parser:
             return self.consume(TT.MINUS)
 
 
-def parse(filename):
-    with open(filename, encoding="utf-8") as src_file:
-        src = StringIO(src_file.read())
+def parse(filename, src: Optional[str] = None):
+    """Parses the module in 'filename', or the source text 'src' as if
+    it had been read from 'filename'."""
+    if src is None:
+        with open(filename, encoding="utf-8") as src_file:
+            src = src_file.read()
     module = Parser(filename, src).parse()
     module.tag_children()
     return module
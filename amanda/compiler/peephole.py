@@ -0,0 +1,174 @@
+"""
+Peephole optimisation of the ops generated for a module.
+
+The pass runs on the list of ops built by the code generator, before
+they are encoded. It rewrites:
+- 'OP_NOT' followed by a conditional jump into the opposite jump;
+- 'SET_LOCAL x; GET_LOCAL x' (and the global variant) into
+'DUP; SET_LOCAL x';
+- jumps whose target is another jump into a jump to the final target;
+- jumps to the next instruction, which are removed;
+- instructions that follow a 'JUMP' or a 'RETURN' and are not the
+target of any jump or the start of a function, which are never run;
+- two consecutive 'GET_LOCAL' into a single 'GET_LOCAL_GET_LOCAL',
+when superinstructions are enabled.
+A rewrite that merges two ops is only done if no jump lands on the
+second one.
+
+Jump args are labels, so the ops keep using the labels of the code
+generator. Each op remembers the index it had in the original list
+(its anchor), which is used to move the labels and every other
+address into the optimised code.
+"""
+
+from bisect import bisect_left, bisect_right
+from amanda.compiler.opcode import Instruction, OpCode, op_sizes
+
+# (anchor, op, args)
+Op = tuple[int, OpCode, tuple[int, ...]]
+
+INVERSE_JUMPS = {
+    OpCode.JUMP_IF_FALSE: OpCode.JUMP_IF_TRUE,
+    OpCode.JUMP_IF_TRUE: OpCode.JUMP_IF_FALSE,
+}
+
+GETTERS = {
+    OpCode.SET_LOCAL: OpCode.GET_LOCAL,
+    OpCode.SET_GLOBAL: OpCode.GET_GLOBAL,
+}
+
+
+class Peephole:
+    def __init__(
+        self,
+        ops: list[Instruction],
+        labels: dict[int, int],
+        entries: list[int],
+        superinstructions: bool = True,
+        compact: bool = False,
+    ):
+        """'labels' maps labels to addresses and 'entries' holds the
+        addresses where functions start."""
+        self.index: dict[int, int] = {}
+        self.sizes = op_sizes(compact)
+        addr = 0
+        for i, (op, _) in enumerate(ops):
+            self.index[addr] = i
+            addr += self.sizes[op]
+        self.index[addr] = len(ops)
+        self.labels = {
+            label: self.index[addr] for label, addr in labels.items()
+        }
+        self.entries = [self.index[addr] for addr in entries]
+        self.superinstructions = superinstructions
+        self.code: list[Op] = [
+            (i, op, args) for i, (op, args) in enumerate(ops)
+        ]
+        self.anchors = list(range(len(ops)))
+        self.addrs: list[int] = []
+        self.size = 0
+
+    def optimize(self) -> list[Instruction]:
+        changed = True
+        while changed:
+            changed = self.thread_jumps()
+            changed = self.rewrite() or changed
+
+        self.addrs = []
+        for _, op, _ in self.code:
+            self.addrs.append(self.size)
+            self.size += self.sizes[op]
+        return [(op, args) for _, op, args in self.code]
+
+    def find(self, anchor: int) -> int:
+        """Position of the first op at or after 'anchor'."""
+        return bisect_left(self.anchors, anchor)
+
+    def target(self, label: int) -> int:
+        return self.find(self.labels[label])
+
+    def thread_jumps(self) -> bool:
+        changed = False
+        for i, (anchor, op, args) in enumerate(self.code):
+            if not op.is_jump():
+                continue
+            label = args[0]
+            seen = {label}
+            while True:
+                pos = self.target(label)
+                if pos == len(self.code):
+                    break
+                _, next_op, next_args = self.code[pos]
+                if next_op != OpCode.JUMP or next_args[0] in seen:
+                    break
+                label = next_args[0]
+                seen.add(label)
+            if label != args[0]:
+                self.code[i] = (anchor, op, (label, *args[1:]))
+                changed = True
+        return changed
+
+    def targets(self) -> set[int]:
+        """Positions of the ops where jumps land or functions start."""
+        targets = {self.find(entry) for entry in self.entries}
+        for _, op, args in self.code:
+            if op.is_jump():
+                targets.add(self.target(args[0]))
+        return targets
+
+    def rewrite(self) -> bool:
+        code = self.code
+        targets = self.targets()
+        out: list[Op] = []
+        i = 0
+        while i < len(code):
+            anchor, op, args = code[i]
+            i += 1
+            nxt = code[i] if i < len(code) else None
+            if op == OpCode.JUMP and self.target(args[0]) == i:
+                continue
+            if nxt and i not in targets:
+                next_anchor, next_op, next_args = nxt
+                if op == OpCode.OP_NOT and next_op in INVERSE_JUMPS:
+                    out.append((anchor, INVERSE_JUMPS[next_op], next_args))
+                    i += 1
+                    continue
+                if GETTERS.get(op) == next_op and args == next_args:
+                    out.append((anchor, OpCode.DUP, ()))
+                    out.append((next_anchor, op, args))
+                    i += 1
+                    continue
+                if self.superinstructions and op == next_op == OpCode.GET_LOCAL:
+                    fused = (
+                        anchor,
+                        OpCode.GET_LOCAL_GET_LOCAL,
+                        args + next_args,
+                    )
+                    out.append(fused)
+                    i += 1
+                    continue
+            out.append((anchor, op, args))
+            if op in (OpCode.JUMP, OpCode.RETURN):
+                while (
+                    i < len(code)
+                    and i not in targets
+                    and code[i][1] != OpCode.HALT
+                ):
+                    i += 1
+
+        changed = out != code
+        self.code = out
+        self.anchors = [anchor for anchor, _, _ in out]
+        return changed
+
+    def relocate(self, addr: int) -> int:
+        """Address in the optimised code of the first op that was at or
+        after 'addr'."""
+        pos = self.find(self.index[addr])
+        return self.addrs[pos] if pos < len(self.addrs) else self.size
+
+    def relocate_end(self, addr: int) -> int:
+        """Address in the optimised code of the last op that was at or
+        before 'addr'."""
+        pos = bisect_right(self.anchors, self.index[addr]) - 1
+        return self.addrs[pos] if pos >= 0 else -1
@@ -0,0 +1,38 @@
+"""
+Resolution of the paths in 'usa' statements.
+
+Kept apart from the rest of the import machinery so the compilation
+cache can check that a program's imports still resolve to the same
+modules without loading the parser.
+"""
+
+import os
+from os import path
+from typing import Iterable, Optional
+from amanda.config import STD_LIB
+
+
+def resolve_import(fpath: str, import_paths: list[str]) -> Optional[str]:
+    # Try to resolve path using cwd
+    if path.isfile(fpath):
+        return path.abspath(fpath)
+    # Attempt to resolve using the import_paths
+    for dir_path in import_paths:
+        mod_path = path.join(dir_path, fpath)
+        if path.isfile(mod_path):
+            return path.abspath(mod_path)
+    return None
+
+
+def same_resolution(
+    cwd: str, import_map: dict[str, str], import_paths: Iterable[str] = ()
+) -> bool:
+    """Whether a program compiled from 'cwd', whose imports resolved as
+    in 'import_map', would have them resolved the same way now."""
+    if cwd != os.getcwd():
+        return False
+    dirs = [STD_LIB, *import_paths]
+    return all(
+        resolve_import(fpath, dirs) == mod_path
+        for fpath, mod_path in import_map.items()
+    )
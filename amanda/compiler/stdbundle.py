@@ -0,0 +1,89 @@
+"""
+Prebuilt bundle of the std lib.
+
+'python -m amanda.compiler.stdbundle' parses every module in the std
+lib and writes their trees to a single file in the std lib dir, which
+is built along with the VM and shipped with the compiler. The bundle is
+read once per process and std modules are then loaded from it instead
+of being parsed, as long as their source hasn't changed since the
+bundle was built.
+
+Only the parsed trees are bundled. The symbols of a module depend on
+the program that imports it and the code of every module is generated
+along with the program, so both are still produced for each program.
+The builtin module is analysed once per process, see
+'Analyzer.init_builtins'.
+"""
+
+import hashlib
+import pickle
+import sys
+from functools import lru_cache
+from glob import glob
+from os import path
+from typing import Optional
+import amanda.compiler.ast as ast
+from amanda.compiler.cache import compiler_version
+from amanda.compiler.parse import Parser
+from amanda.config import BUNDLED, STD_LIB
+
+BUNDLE_PATH = path.join(STD_LIB, "std.bundle")
+
+
+def text_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf8")).hexdigest()
+
+
+def build_bundle(out_path: str = BUNDLE_PATH):
+    """Parses the modules of the std lib into the bundle in 'out_path'."""
+    modules = {}
+    for filename in sorted(glob(path.join(STD_LIB, "*.ama"))):
+        with open(filename, encoding="utf-8") as src_file:
+            source = src_file.read()
+        # Parent links are added when a tree is loaded, as they make
+        # the tree much deeper to pickle
+        program = Parser(filename, source).parse()
+        modules[path.basename(filename)] = (
+            text_hash(source),
+            pickle.dumps(program, pickle.HIGHEST_PROTOCOL),
+        )
+    bundle = {"version": compiler_version(), "modules": modules}
+    with open(out_path, "wb") as bundle_file:
+        pickle.dump(bundle, bundle_file, pickle.HIGHEST_PROTOCOL)
+
+
+@lru_cache(maxsize=None)
+def load_bundle(bundle_path: str = BUNDLE_PATH) -> dict[str, tuple]:
+    """Maps the name of each bundled module to the hash of its source and
+    its pickled tree. Empty if there is no usable bundle."""
+    try:
+        with open(bundle_path, "rb") as bundle_file:
+            bundle = pickle.load(bundle_file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    # A bundled compiler has no sources to fingerprint, but its bundle
+    # is built from the same tree as the executable
+    if not BUNDLED and bundle.get("version") != compiler_version():
+        return {}
+    return bundle["modules"]
+
+
+def load_module(
+    filename: str, source: str, bundle_path: str = BUNDLE_PATH
+) -> Optional[ast.Module]:
+    """The tree of the std module in 'filename', if the bundle has it
+    and it was built from 'source'. Every call returns a new tree, as
+    the analyzer changes the trees it checks."""
+    if path.dirname(path.abspath(filename)) != path.abspath(STD_LIB):
+        return None
+    entry = load_bundle(bundle_path).get(path.basename(filename))
+    if entry is None or entry[0] != text_hash(source):
+        return None
+    program = pickle.loads(entry[1])
+    program.tag_children()
+    return program
+
+
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_PATH
+    build_bundle(out_path)
@@ -175,3 +175,24 @@ class Scope:
         ]
         table = "\n".join(symbols)
         return f"SCOPE:\n______\n{table}\n<EXITING>\n\n"
+
+
+class BuiltinScope(Scope):
+    """
+    Enclosing scope of the global scope of every module. Holds the
+    builtin types and the symbols declared in the builtin module.
+    It is shared by the whole process, so it can't be changed
+    after it has been filled.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frozen = False
+
+    def freeze(self):
+        self.frozen = True
+
+    def define(self, name: str, symbol: Symbol):
+        if self.frozen:
+            raise TypeError(f"Cannot define '{name}' in the builtin scope")
+        super().define(name, symbol)
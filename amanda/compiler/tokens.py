@@ -111,7 +111,9 @@ def build_tokens_dict() -> Dict[str, TokenType]:
     }
 
 
-@dataclass
+# Tokens are created for every lexeme of every module, so they
+# use slots to avoid carrying a __dict__ each
+@dataclass(slots=True)
 class Token:
     token: TokenType
     lexeme: str
@@ -136,16 +138,15 @@ class Token:
         )
 
 
-def build_reserved_keywords() -> Dict[str, Token]:
-    """Build a dictionary of reserved keywords."""
+def build_reserved_keywords() -> Dict[str, TokenType]:
+    """Build a dictionary that maps reserved keywords to their token type."""
     tt_list = list(TokenType)
     start_index = tt_list.index(TokenType.MOSTRA)
     end_index = tt_list.index(TokenType.CLASSE)
-    reserved_keywords = {
-        token_type.value.lower(): Token(token_type, token_type.value.lower())
+    return {
+        token_type.value.lower(): token_type
         for token_type in tt_list[start_index : end_index + 1]
     }
-    return reserved_keywords
 
 
 _ambiguous_chars = [
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 import amanda.compiler.ast as ast
+from amanda.compiler import fold
 from amanda.compiler.module import Module
 from amanda.compiler.symbols.base import Type
 from amanda.compiler.tokens import TokenType as TT, Token
@@ -24,11 +25,14 @@ class ASTTransformer:
     module: Module
     program: ast.Module
 
+    # Whether operations on constants are evaluated at compile time
+    fold_constants: bool = True
+
+    _transformers = ast.Dispatcher("transform", "general_transform")
+
     def transform(self, node, args=None) -> ast.ASTNode:
-        node_class = type(node).__name__.lower()
-        method_name = f"transform_{node_class}"
-        visitor_method = getattr(self, method_name, self.general_transform)
-        new_node: ast.ASTNode | None = visitor_method(node)
+        visitor_method = self._transformers.method(self, node)
+        new_node: ast.ASTNode | None = visitor_method(self, node)
         if new_node is None or not isinstance(new_node, ast.ASTNode):
             return node
         if new_node == node:
@@ -63,6 +67,16 @@ class ASTTransformer:
         if node.of_type(ast.Converta):
             return node
 
+    def transform_binop(self, node: ast.BinOp) -> ast.ASTNode | None:
+        node.for_each_child(self.empty_transform)
+        if self.fold_constants and node.parent:
+            return fold.fold_binop(node)
+
+    def transform_unaryop(self, node: ast.UnaryOp) -> ast.ASTNode | None:
+        node.for_each_child(self.empty_transform)
+        if self.fold_constants and node.parent:
+            return fold.fold_unaryop(node)
+
     def transform_escolha(self, node: ast.Escolha) -> ast.ASTNode:
         token = node.token
         new_token = lambda tt, lexeme: Token(tt, lexeme, token.line, token.col)
@@ -188,5 +202,7 @@ class ASTTransformer:
         return node
 
 
-def transform(ast: ast.Module, module: Module) -> ast.Module:
-    return ASTTransformer(module, ast).transform_module(ast)
+def transform(
+    ast: ast.Module, module: Module, fold_constants: bool = True
+) -> ast.Module:
+    return ASTTransformer(module, ast, fold_constants).transform_module(ast)
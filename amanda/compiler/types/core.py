@@ -45,14 +45,26 @@ class Types(IntEnum):
         return self.name.lower()[1:]
 
 
+def primitive_from_tag(tag: Types) -> Primitive:
+    return Primitive.instances[tag]
+
+
 @dataclass
 class Primitive(Type):
     methods: ClassVar[dict[Types, dict[str, MethodSym]]] = {}
+    # There is only one instance of each primitive, see Builtins
+    instances: ClassVar[dict[Types, Primitive]] = {}
 
     def __init__(self, module: Module, tag: Types, zero_initialized: bool):
         super().__init__(str(tag), module, zero_initialized=zero_initialized)
         self.tag = tag
         self.is_global = True
+        Primitive.instances[tag] = self
+
+    def __reduce__(self):
+        # Pickle by reference, so that ASTs parsed in another process
+        # still point to the builtin instances
+        return (primitive_from_tag, (self.tag,))
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Primitive):
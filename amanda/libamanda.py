@@ -1,14 +1,35 @@
 import ctypes
+from functools import cache
 from amanda.config import LIB_AMA
 
 
-# TODO: Use a struct to represent the module instead of using
-# BSON
-def run_module(module_bin: bytes) -> int:
+@cache
+def load_lib() -> ctypes.CDLL:
+    """Loads the VM once and declares the signatures of its functions."""
     lib_ama = ctypes.CDLL(LIB_AMA)
-    count = len(module_bin)
-    # Note: Using ubyte to guarantee that arg 1 is an array of bytes
-    # on all platforms
-    ByteArray = ctypes.c_uint8 * count
-    bin_arr = ByteArray(*bytearray(module_bin))
-    return lib_ama.run_module(ctypes.byref(bin_arr), ctypes.c_int32(count))
+    # The module is passed as a pointer to the buffer of a bytes object,
+    # which the VM only reads
+    lib_ama.run_module.argtypes = [ctypes.c_char_p, ctypes.c_uint32]
+    lib_ama.run_module.restype = ctypes.c_uint8
+    # Only exported by VMs built with the 'op-count' feature
+    if hasattr(lib_ama, "ops_executed"):
+        lib_ama.ops_executed.argtypes = []
+        lib_ama.ops_executed.restype = ctypes.c_uint64
+    return lib_ama
+
+
+def run_module(module_bin: bytes) -> int:
+    return load_lib().run_module(module_bin, len(module_bin))
+
+
+def ops_executed() -> int:
+    """Number of ops run by the VM on the last call to 'run_module'.
+    The VM only counts them when built with 'python -m utils.build
+    --op-count'."""
+    lib_ama = load_lib()
+    if not hasattr(lib_ama, "ops_executed"):
+        raise RuntimeError(
+            "The VM was built without the 'op-count' feature, rebuild it "
+            "with 'python -m utils.build --op-count'"
+        )
+    return lib_ama.ops_executed()
@@ -0,0 +1,162 @@
+"""
+API to compile and run Amanda programs from Python.
+
+An AmandaRuntime loads the VM and analyses the builtin module when
+it is created, so neither is paid for again by the programs it
+compiles. Compiled programs are also kept in memory: compiling the
+same program again returns the module compiled the first time,
+as long as none of the sources it was compiled from has changed.
+
+'compile_source' compiles programs that aren't files, with imports
+served from memory, and returns the errors it finds instead of
+raising them, so a service can compile many submissions without
+touching the disk.
+"""
+
+import os
+from dataclasses import dataclass, field
+from os import path
+from typing import Iterable, Mapping, Optional
+from amanda.compiler.cache import source_hash
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.error import AmandaError
+from amanda.compiler.imports import (
+    FILE_RESOLVER,
+    ImportResolver,
+    MemoryResolver,
+)
+from amanda.compiler.options import DEFAULT_OPTIONS, CompileOptions
+from amanda.compiler.resolve import same_resolution
+from amanda.compiler.symbols.core import Module
+from amanda.libamanda import load_lib, run_module
+
+# Name of the programs compiled from source text without a filename
+SOURCE_NAME = "<fonte>"
+# Number of compiled programs kept in memory
+CACHE_SIZE = 256
+
+
+@dataclass
+class CompileResult:
+    # The compiled module, None if the program has errors
+    module_bin: Optional[bytes] = None
+    errors: list[AmandaError] = field(default_factory=list)
+
+
+@dataclass
+class CompiledProgram:
+    module_bin: bytes
+    # Hashes of the sources the program was compiled from
+    hashes: dict[str, str]
+    # Imports are resolved relative to the cwd, so the program is only
+    # reused from the same cwd and while its imports resolve the same
+    cwd: str
+    import_map: dict[str, str]
+
+
+class AmandaRuntime:
+    """Compiles and runs Amanda programs in the current process.
+    A runtime is meant to be created once and used for any number of
+    programs."""
+
+    def __init__(
+        self,
+        import_paths: Iterable[str] = (),
+        options: CompileOptions = DEFAULT_OPTIONS,
+    ):
+        # Dirs used to resolve imports, besides the std lib
+        self.import_paths = list(import_paths)
+        # Optimisations applied to every program compiled by the runtime
+        self.options = options
+        # Maps a program (its path and text) to its compiled module
+        self.compiled: dict[tuple[str, Optional[str]], CompiledProgram] = {}
+        load_lib()
+        Analyzer.init_builtins()
+
+    def compile(
+        self, filename: Optional[str] = None, *, source: Optional[str] = None
+    ) -> bytes:
+        """Compiles the program in 'filename' or, if 'source' is given,
+        the program with that text. 'filename' is then only used to name
+        the program. Raises an AmandaError if the program is invalid."""
+        if filename is None:
+            if source is None:
+                raise TypeError("Either 'filename' or 'source' must be given")
+            filename = SOURCE_NAME
+        key = (path.abspath(filename), source)
+        entry = self.compiled.get(key)
+        if entry is not None and self.is_up_to_date(entry):
+            return entry.module_bin
+
+        module_bin, analyzer = self.build(filename, source, FILE_RESOLVER)
+        # Programs given as text only depend on the sources of their imports
+        deps = [*analyzer.imports]
+        if source is None:
+            deps.insert(0, key[0])
+        self.compiled.pop(key, None)
+        if len(self.compiled) >= CACHE_SIZE:
+            # Drop the program compiled the longest time ago
+            del self.compiled[next(iter(self.compiled))]
+        self.compiled[key] = CompiledProgram(
+            module_bin,
+            {dep: source_hash(dep) for dep in deps},
+            os.getcwd(),
+            analyzer.import_map,
+        )
+        return module_bin
+
+    def is_up_to_date(self, entry: CompiledProgram) -> bool:
+        """Whether a program compiled earlier can be reused: its imports
+        must resolve to the same modules and none of its sources may
+        have changed."""
+        if not same_resolution(entry.cwd, entry.import_map, self.import_paths):
+            return False
+        return all(
+            source_hash(dep) == dep_hash
+            for dep, dep_hash in entry.hashes.items()
+        )
+
+    def compile_source(
+        self,
+        text: str,
+        virtual_path: str = SOURCE_NAME,
+        import_resolver: ImportResolver | Mapping[str, str] | None = None,
+    ) -> CompileResult:
+        """Compiles 'text' as the module in 'virtual_path', which doesn't
+        have to exist. Its imports are found by 'import_resolver', which
+        can also be a map of paths to source text. Without one, they are
+        read from files. Errors in the program are returned in the
+        result instead of being raised."""
+        try:
+            if import_resolver is None:
+                module_bin = self.compile(virtual_path, source=text)
+            else:
+                if not isinstance(import_resolver, ImportResolver):
+                    import_resolver = MemoryResolver(import_resolver)
+                # The files served by a resolver can't be checked for
+                # changes, so these programs are never reused
+                module_bin, _ = self.build(virtual_path, text, import_resolver)
+        except AmandaError as e:
+            return CompileResult(errors=[e])
+        return CompileResult(module_bin)
+
+    def build(
+        self, filename: str, source: Optional[str], resolver: ImportResolver
+    ) -> tuple[bytes, Analyzer]:
+        """Compiles a program, returning the compiled module and the
+        analyzer that checked it."""
+        analyzer = Analyzer(
+            filename,
+            self.import_paths,
+            Module(filename),
+            resolver,
+            self.options,
+        )
+        program = analyzer.load_program(source=source)
+        module, imports = analyzer.visit_module(program)
+        return ByteGen(module, self.options).compile(imports), analyzer
+
+    def run(self, module_bin: bytes) -> int:
+        """Runs a compiled program and returns its exit code."""
+        return run_module(module_bin)
@@ -1,4 +1,5 @@
 use crate::ama_value::AmaValue;
+use crate::binmod;
 use crate::modules::module::Module;
 use crate::values::function::AmaFunc;
 use crate::values::function::FuncModule;
@@ -7,7 +8,6 @@ use std::borrow::Cow;
 use std::collections::HashMap;
 use std::io::Cursor;
 use std::io::Read;
-use std::str::FromStr;
 
 #[derive(Debug)]
 pub enum Const {
@@ -30,42 +30,16 @@ impl Const {
 impl<'a> From<BSONType> for Const {
     fn from(bson_val: BSONType) -> Const {
         match bson_val {
-            BSONType::String(string) => Const::from_str(&string).unwrap(),
+            BSONType::String(string) => Const::Str(string),
             BSONType::Int(int) => Const::Int(int),
             BSONType::Double(double) => Const::Double(double),
+            BSONType::Bool(boolean) => Const::Bool(boolean),
+            BSONType::Null => Const::None,
             _ => panic!("Unexpected constant value"),
         }
     }
 }
 
-impl<'a> FromStr for Const {
-    type Err = ();
-
-    fn from_str(constant: &str) -> Result<Const, ()> {
-        if constant == "verdadeiro" || constant == "falso" {
-            let bool_val = if constant == "falso" { false } else { true };
-            return Ok(Const::Bool(bool_val));
-        }
-        if constant == "nulo" {
-            return Ok(Const::None);
-        }
-        let maybe_int = constant.parse::<i64>();
-        let maybe_float = constant.parse::<f64>();
-        if maybe_int.is_ok() {
-            return Ok(Const::Int(maybe_int.unwrap()));
-        } else if maybe_float.is_ok() {
-            return Ok(Const::Double(maybe_float.unwrap()));
-        } else {
-            let slice: &str = if &constant[..1] == "\"" || &constant[..1] == "\'" {
-                &constant[1..constant.len() - 1]
-            } else {
-                constant
-            };
-            return Ok(Const::Str(String::from(slice)));
-        }
-    }
-}
-
 #[derive(Debug, PartialEq)]
 enum BSONType {
     String(String),
@@ -74,6 +48,8 @@ enum BSONType {
     Array(Vec<BSONType>),
     Bytes(Vec<u8>),
     Doc(HashMap<String, BSONType>),
+    Bool(bool),
+    Null,
 }
 
 impl BSONType {
@@ -86,7 +62,7 @@ impl BSONType {
     }
 }
 
-fn read_bson_key(raw_doc: &mut Cursor<&mut [u8]>) -> String {
+fn read_bson_key(raw_doc: &mut Cursor<&[u8]>) -> String {
     let mut key: String = String::new();
     loop {
         let mut buf: [u8; 1] = [0; 1];
@@ -99,13 +75,13 @@ fn read_bson_key(raw_doc: &mut Cursor<&mut [u8]>) -> String {
     key
 }
 
-fn read_bytes<const N: usize>(cursor: &mut Cursor<&mut [u8]>) -> [u8; N] {
+fn read_bytes<const N: usize>(cursor: &mut Cursor<&[u8]>) -> [u8; N] {
     let mut buf = [0; N];
     cursor.read_exact(&mut buf).unwrap();
     buf
 }
 
-fn unpack_bson_value(raw_doc: &mut Cursor<&mut [u8]>, value_type: u8) -> BSONType {
+fn unpack_bson_value(raw_doc: &mut Cursor<&[u8]>, value_type: u8) -> BSONType {
     match value_type {
         //Doc field types
         0x01 => {
@@ -157,6 +133,8 @@ fn unpack_bson_value(raw_doc: &mut Cursor<&mut [u8]>, value_type: u8) -> BSONTyp
             raw_doc.read_exact(&mut bin_data).unwrap();
             BSONType::Bytes(bin_data)
         }
+        0x08 => BSONType::Bool(read_bytes::<1>(raw_doc)[0] != 0),
+        0x0A => BSONType::Null,
         0x12 => {
             let int64 = i64::from_le_bytes(read_bytes::<8>(raw_doc));
             //Ignore subtype
@@ -169,7 +147,7 @@ fn unpack_bson_value(raw_doc: &mut Cursor<&mut [u8]>, value_type: u8) -> BSONTyp
     }
 }
 
-fn unpack_bson_doc(raw_doc: &mut [u8]) -> HashMap<String, BSONType> {
+fn unpack_bson_doc(raw_doc: &[u8]) -> HashMap<String, BSONType> {
     let mut doc = HashMap::new();
     let mut cursor = Cursor::new(raw_doc);
     let mut buf: [u8; 1] = [0; 1];
@@ -238,9 +216,12 @@ pub fn consume_const<'a>(constant: Const) -> AmaValue<'a> {
     }
 }
 
-pub fn load_bin<'bin>(amac_bin: &'bin mut [u8]) -> (Module<'bin>, Vec<Module<'bin>>) {
+pub fn load_bin<'bin>(amac_bin: &'bin [u8]) -> (Module<'bin>, Vec<Module<'bin>>) {
+    if binmod::is_binmod(amac_bin) {
+        return binmod::load_bin(amac_bin);
+    }
     //Skip size bytes
-    let mut prog_data = unpack_bson_doc(amac_bin);
+    let mut prog_data = unpack_bson_doc(&amac_bin[4..]);
     let imports = bson_take!(BSONType::Array, prog_data.remove("imports").unwrap())
         .into_iter()
         .map(|module| build_module(bson_take!(BSONType::Doc, module)))
@@ -322,13 +303,19 @@ fn build_module<'bin>(mut prog_data: HashMap<String, BSONType>) -> Module<'bin>
 
     let name = bson_take!(BSONType::String, prog_data.remove("name").unwrap());
 
+    let compact = match prog_data.remove("compact") {
+        Some(flag) => bson_take!(BSONType::Int, flag) != 0,
+        None => false,
+    };
+
     Module {
         name,
         builtin,
         constants,
         names,
-        code: ops,
+        code: Cow::Owned(ops),
         src_map,
+        compact,
         main: AmaFunc {
             name: "_inicio_",
             bp: -1,
@@ -456,6 +443,19 @@ mod tests {
         assert_eq!(doc.get("age").unwrap().get_i64(), 100);
     }
 
+    #[test]
+    fn test_bool_null_fields() {
+        // { "ok": true, "none": null }
+        let mut bytes = vec![
+            11, 0, 0, 0, 8, 111, 107, 0, 1, 10, 110, 111, 110, 101, 0, 0,
+        ];
+        bytes.drain(0..4);
+
+        let doc = unpack_bson_doc(&mut bytes);
+        assert_eq!(doc.get("ok").unwrap(), &BSONType::Bool(true));
+        assert_eq!(doc.get("none").unwrap(), &BSONType::Null);
+    }
+
     #[test]
     fn test_bytes_field() {
         // { "bytes": [0, 1, 1, 2, 3 , 255] }
@@ -0,0 +1,283 @@
+//! Loader of the flat binary module format written by
+//! amanda/compiler/binmod.py. The code, the string constants and the
+//! names of functions and registos are borrowed from the buffer
+//! instead of being copied.
+use crate::ama_value::AmaValue;
+use crate::modules::module::Module;
+use crate::values::function::AmaFunc;
+use crate::values::function::FuncModule;
+use crate::values::registo::Registo;
+use std::borrow::Cow;
+use std::convert::TryInto;
+use std::str;
+
+pub const MAGIC: &[u8; 4] = b"AMAB";
+const VERSION: u16 = 1;
+
+const BUILTIN: u32 = 0x1;
+const COMPACT: u32 = 0x2;
+
+const SECTION_COUNT: usize = 7;
+const NAME: usize = 0;
+const CONSTANTS: usize = 1;
+const NAMES: usize = 2;
+const CODE: usize = 3;
+const FUNCTIONS: usize = 4;
+const REGISTOS: usize = 5;
+const SRC_MAP: usize = 6;
+
+const CONST_NULL: u8 = 0;
+const CONST_BOOL: u8 = 1;
+const CONST_INT: u8 = 2;
+const CONST_F64: u8 = 3;
+const CONST_STR: u8 = 4;
+
+struct Reader<'bin> {
+    bin: &'bin [u8],
+    pos: usize,
+}
+
+impl<'bin> Reader<'bin> {
+    fn new(bin: &'bin [u8]) -> Self {
+        Reader { bin, pos: 0 }
+    }
+
+    fn bytes(&mut self, size: usize) -> &'bin [u8] {
+        let bytes = &self.bin[self.pos..self.pos + size];
+        self.pos += size;
+        bytes
+    }
+
+    fn u8(&mut self) -> u8 {
+        self.bytes(1)[0]
+    }
+
+    fn u16(&mut self) -> u16 {
+        u16::from_le_bytes(self.bytes(2).try_into().unwrap())
+    }
+
+    fn u32(&mut self) -> u32 {
+        u32::from_le_bytes(self.bytes(4).try_into().unwrap())
+    }
+
+    fn i32(&mut self) -> i32 {
+        i32::from_le_bytes(self.bytes(4).try_into().unwrap())
+    }
+
+    fn i64(&mut self) -> i64 {
+        i64::from_le_bytes(self.bytes(8).try_into().unwrap())
+    }
+
+    fn f64(&mut self) -> f64 {
+        f64::from_le_bytes(self.bytes(8).try_into().unwrap())
+    }
+
+    fn str(&mut self) -> &'bin str {
+        let size = self.u32() as usize;
+        str::from_utf8(self.bytes(size)).expect("Invalid utf-8 string in module")
+    }
+}
+
+pub fn is_binmod(bin: &[u8]) -> bool {
+    bin.len() >= MAGIC.len() && &bin[..MAGIC.len()] == MAGIC
+}
+
+pub fn load_bin<'bin>(bin: &'bin [u8]) -> (Module<'bin>, Vec<Module<'bin>>) {
+    let mut header = Reader::new(bin);
+    header.bytes(MAGIC.len());
+    let version = header.u16();
+    if version != VERSION {
+        panic!("Unsupported module version: {}", version);
+    }
+    header.u16();
+    let count = header.u32() as usize;
+    let mut modules: Vec<Module<'bin>> = (0..count)
+        .map(|_| header.u32() as usize)
+        .collect::<Vec<usize>>()
+        .into_iter()
+        .map(|offset| build_module(&bin[offset..]))
+        .collect();
+    let module = modules.remove(0);
+    (module, modules)
+}
+
+fn build_module<'bin>(bin: &'bin [u8]) -> Module<'bin> {
+    let mut header = Reader::new(bin);
+    let flags = header.u32();
+    let entry_locals = header.u32() as usize;
+    let mut sections: [Reader<'bin>; SECTION_COUNT] = [
+        Reader::new(&[]),
+        Reader::new(&[]),
+        Reader::new(&[]),
+        Reader::new(&[]),
+        Reader::new(&[]),
+        Reader::new(&[]),
+        Reader::new(&[]),
+    ];
+    for section in sections.iter_mut() {
+        let offset = header.u32() as usize;
+        let size = header.u32() as usize;
+        *section = Reader::new(&bin[offset..offset + size]);
+    }
+
+    let name = str::from_utf8(sections[NAME].bin).expect("Invalid module name");
+
+    let consts = &mut sections[CONSTANTS];
+    let constants = (0..consts.u32())
+        .map(|_| match consts.u8() {
+            CONST_NULL => AmaValue::None,
+            CONST_BOOL => AmaValue::Bool(consts.u8() != 0),
+            CONST_INT => AmaValue::Int(consts.i64()),
+            CONST_F64 => AmaValue::F64(consts.f64()),
+            CONST_STR => AmaValue::Str(Cow::Borrowed(consts.str())),
+            tag => panic!("Unexpected constant tag: {}", tag),
+        })
+        .collect();
+
+    let names_section = &mut sections[NAMES];
+    let names = (0..names_section.u32())
+        .map(|_| String::from(names_section.str()))
+        .collect();
+
+    let funcs = &mut sections[FUNCTIONS];
+    let functions = (0..funcs.u32())
+        .map(|_| {
+            let name = funcs.str();
+            let start_ip = funcs.u32() as usize;
+            let locals = funcs.u32() as usize;
+            let module = funcs.i32();
+            AmaFunc {
+                name,
+                bp: -1,
+                start_ip,
+                last_i: start_ip,
+                ip: start_ip,
+                locals,
+                module: if module >= 0 {
+                    FuncModule::Imported(module as usize)
+                } else {
+                    FuncModule::Main
+                },
+            }
+        })
+        .collect();
+
+    let regs = &mut sections[REGISTOS];
+    let registos = (0..regs.u32())
+        .map(|_| {
+            let name = regs.str();
+            let fields = (0..regs.u32())
+                .map(|_| String::from(regs.str()))
+                .collect();
+            Registo { name, fields }
+        })
+        .collect();
+
+    let offsets = &mut sections[SRC_MAP];
+    let src_map = (0..offsets.u32())
+        .map(|_| offsets.i64() as usize)
+        .collect();
+
+    Module {
+        name: String::from(name),
+        builtin: flags & BUILTIN != 0,
+        constants,
+        names,
+        code: Cow::Borrowed(sections[CODE].bin),
+        src_map,
+        compact: flags & COMPACT != 0,
+        main: AmaFunc {
+            name: "_inicio_",
+            bp: -1,
+            start_ip: 0,
+            last_i: 0,
+            ip: 0,
+            locals: entry_locals,
+            module: FuncModule::Main,
+        },
+        functions,
+        globals: Default::default(),
+        registos,
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn push_str(buf: &mut Vec<u8>, string: &str) {
+        buf.extend(&(string.len() as u32).to_le_bytes());
+        buf.extend(string.as_bytes());
+    }
+
+    #[test]
+    fn test_load_module() {
+        let mut sections: Vec<Vec<u8>> = vec![Vec::new(); SECTION_COUNT];
+        sections[NAME].extend(b"main");
+        let consts = &mut sections[CONSTANTS];
+        consts.extend(&4u32.to_le_bytes());
+        consts.extend(&[CONST_BOOL, 1, CONST_INT]);
+        consts.extend(&(-7i64).to_le_bytes());
+        consts.push(CONST_F64);
+        consts.extend(&2.5f64.to_le_bytes());
+        consts.push(CONST_STR);
+        push_str(consts, "olá");
+        sections[NAMES].extend(&1u32.to_le_bytes());
+        push_str(&mut sections[NAMES], "mostra");
+        sections[CODE].extend(&[0x01, 0x00, 0x00, 0xFF]);
+        let funcs = &mut sections[FUNCTIONS];
+        funcs.extend(&1u32.to_le_bytes());
+        push_str(funcs, "f");
+        funcs.extend(&3u32.to_le_bytes());
+        funcs.extend(&2u32.to_le_bytes());
+        funcs.extend(&(-1i32).to_le_bytes());
+        let regs = &mut sections[REGISTOS];
+        regs.extend(&1u32.to_le_bytes());
+        push_str(regs, "Ponto");
+        regs.extend(&1u32.to_le_bytes());
+        push_str(regs, "x");
+        sections[SRC_MAP].extend(&1u32.to_le_bytes());
+        sections[SRC_MAP].extend(&(-1i64).to_le_bytes());
+
+        let mut module: Vec<u8> = Vec::new();
+        module.extend(&(BUILTIN | COMPACT).to_le_bytes());
+        module.extend(&5u32.to_le_bytes());
+        let mut offset = 8 + 8 * SECTION_COUNT;
+        for section in sections.iter() {
+            module.extend(&(offset as u32).to_le_bytes());
+            module.extend(&(section.len() as u32).to_le_bytes());
+            offset += section.len();
+        }
+        for section in sections.iter() {
+            module.extend(section);
+        }
+        let mut bin: Vec<u8> = Vec::new();
+        bin.extend(MAGIC);
+        bin.extend(&VERSION.to_le_bytes());
+        bin.extend(&0u16.to_le_bytes());
+        bin.extend(&1u32.to_le_bytes());
+        bin.extend(&16u32.to_le_bytes());
+        bin.extend(module);
+
+        assert!(is_binmod(&bin));
+        let (main, imports) = load_bin(&bin);
+        assert!(imports.is_empty());
+        assert_eq!(main.name, "main");
+        assert!(main.builtin && main.compact);
+        assert_eq!(main.main.locals, 5);
+        assert_eq!(main.constants.len(), 4);
+        assert!(matches!(main.constants[0], AmaValue::Bool(true)));
+        assert!(matches!(main.constants[1], AmaValue::Int(-7)));
+        assert!(matches!(main.constants[2], AmaValue::F64(x) if x == 2.5));
+        assert!(matches!(&main.constants[3], AmaValue::Str(s) if s == "olá"));
+        assert_eq!(main.names, vec!["mostra"]);
+        assert_eq!(&main.code[..], &[0x01, 0x00, 0x00, 0xFF]);
+        assert_eq!(main.functions[0].name, "f");
+        assert_eq!(main.functions[0].start_ip, 3);
+        assert_eq!(main.functions[0].locals, 2);
+        assert!(matches!(main.functions[0].module, FuncModule::Main));
+        assert_eq!(main.registos[0].name, "Ponto");
+        assert_eq!(main.registos[0].fields, vec!["x"]);
+        assert_eq!(main.src_map, vec![usize::MAX]);
+    }
+}
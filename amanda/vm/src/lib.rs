@@ -1,10 +1,13 @@
 use alloc::Alloc;
 use std::slice;
+#[cfg(feature = "op-count")]
+use std::sync::atomic::{AtomicU64, Ordering};
 use vm::AmaVM;
 
 mod alloc;
 mod ama_value;
 mod binload;
+mod binmod;
 mod errors;
 mod modules;
 mod opcode;
@@ -14,22 +17,36 @@ mod vm;
 const OK: u8 = 0;
 const ERR: u8 = 1;
 
+// Number of ops run by the last call to run_module
+#[cfg(feature = "op-count")]
+static OPS_EXECUTED: AtomicU64 = AtomicU64::new(0);
+
 #[no_mangle]
-pub extern "C" fn run_module(bin_module: *mut u8, size: u32) -> u8 {
+pub extern "C" fn run_module(bin_module: *const u8, size: u32) -> u8 {
+    // The module is only read, so the caller can hand over its buffer
+    // without copying it
     let module = unsafe {
         assert!(!bin_module.is_null());
-        //Skip size bytes
-        &mut slice::from_raw_parts_mut(bin_module, size as usize)[4..]
+        slice::from_raw_parts(bin_module, size as usize)
     };
 
     let alloc = Alloc::new();
     let (main_module, imports) = binload::load_bin(module);
 
     let mut vm = AmaVM::new(&main_module, &imports, alloc);
-    if let Err(err) = vm.run(&main_module) {
+    let result = vm.run(&main_module);
+    #[cfg(feature = "op-count")]
+    OPS_EXECUTED.store(vm.ops_executed, Ordering::Relaxed);
+    if let Err(err) = result {
         eprint!("{}", err);
         ERR
     } else {
         OK
     }
 }
+
+#[cfg(feature = "op-count")]
+#[no_mangle]
+pub extern "C" fn ops_executed() -> u64 {
+    OPS_EXECUTED.load(Ordering::Relaxed)
+}
@@ -3,6 +3,7 @@ use crate::modules::builtins::BuiltinDefs;
 use crate::values::function::AmaFunc;
 use crate::values::registo::Registo;
 use rustc_hash::FxHashMap;
+use std::borrow::Cow;
 use std::cell::RefCell;
 
 pub type MGlobals<'a> = FxHashMap<&'a str, AmaValue<'a>>;
@@ -13,12 +14,14 @@ pub struct Module<'a> {
     pub builtin: bool,
     pub constants: Vec<AmaValue<'a>>,
     pub names: Vec<String>,
-    pub code: Vec<u8>,
+    pub code: Cow<'a, [u8]>,
     pub main: AmaFunc<'a>,
     pub functions: Vec<AmaFunc<'a>>,
     pub globals: RefCell<MGlobals<'a>>,
     pub registos: Vec<Registo<'a>>,
     pub src_map: Vec<usize>,
+    // Whether jump addresses use 32 bits and module indices 16 bits
+    pub compact: bool,
 }
 
 impl<'a> Module<'a> {
@@ -45,12 +45,17 @@ pub enum OpCode {
     BuildVariant,
     BindMatchArgs,
     MatchVariant,
+    JumpIfTrue,
+    Dup,
+    IncLocalConst,
+    LocalLessJumpIfTrue,
+    GetLocalGetLocal,
     Halt = 255,
 }
 
 impl From<&u8> for OpCode {
     fn from(number: &u8) -> Self {
-        let ops: [OpCode; 42] = [
+        let ops: [OpCode; 47] = [
             OpCode::Mostra,
             OpCode::LoadConst,
             OpCode::LoadName,
@@ -93,6 +98,11 @@ impl From<&u8> for OpCode {
             OpCode::BuildVariant,
             OpCode::BindMatchArgs,
             OpCode::MatchVariant,
+            OpCode::JumpIfTrue,
+            OpCode::Dup,
+            OpCode::IncLocalConst,
+            OpCode::LocalLessJumpIfTrue,
+            OpCode::GetLocalGetLocal,
         ];
         if *number == 0xff {
             OpCode::Halt
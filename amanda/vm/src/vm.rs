@@ -11,7 +11,7 @@ use crate::alloc::{Alloc, Ref};
 use crate::opcode::OpCode;
 use crate::modules::builtins;
 use unicode_segmentation::UnicodeSegmentation;
-use std::convert::From;
+use std::convert::{From, TryInto};
 use std::mem;
 use std::rc::Rc;
 
@@ -72,7 +72,10 @@ pub struct AmaVM<'a> {
     alloc: Alloc<'a>, 
     builtin_defs: builtins::BuiltinDefs<'a>, 
     imports: &'a Vec<Module<'a>>, 
-    sp: isize
+    sp: isize,
+    // Number of ops run so far
+    #[cfg(feature = "op-count")]
+    pub ops_executed: u64,
 }
 
 //TODO: Make this faster
@@ -97,6 +100,8 @@ impl<'a> AmaVM<'a> {
             builtin_defs, 
             imports, 
             sp: -1,
+            #[cfg(feature = "op-count")]
+            ops_executed: 0,
         }
     }
 
@@ -136,15 +141,44 @@ impl<'a> AmaVM<'a> {
     }
 
     fn get_u16_arg(&mut self) -> u16 {
-        ((self.get_byte() as u16) << 8) | self.get_byte() as u16
+        let ip = self.frames.peek().ip;
+        let code = &self.ctx_module.unwrap().code;
+        self.frames.peek_mut().ip += 2;
+        u16::from_be_bytes([code[ip + 1], code[ip + 2]])
+    }
+
+    fn get_u32_arg(&mut self) -> u32 {
+        let ip = self.frames.peek().ip;
+        let code = &self.ctx_module.unwrap().code;
+        self.frames.peek_mut().ip += 4;
+        u32::from_be_bytes(code[ip + 1..ip + 5].try_into().unwrap())
     }
 
     fn get_u64_arg(&mut self) -> u64 {
-        let mut uint64 = [0; 8];
-        for i in 0..8 {
-            uint64[i] = self.get_byte();
+        let ip = self.frames.peek().ip;
+        let code = &self.ctx_module.unwrap().code;
+        self.frames.peek_mut().ip += 8;
+        u64::from_be_bytes(code[ip + 1..ip + 9].try_into().unwrap())
+    }
+
+    // Reads a jump address or a variant tag. These use 32 bits in
+    // modules with compact operands.
+    fn get_addr_arg(&mut self) -> u64 {
+        if self.ctx_module.unwrap().compact {
+            self.get_u32_arg() as u64
+        } else {
+            self.get_u64_arg()
+        }
+    }
+
+    // Reads the index of an imported module or of a name. These use
+    // 16 bits in modules with compact operands.
+    fn get_index_arg(&mut self) -> usize {
+        if self.ctx_module.unwrap().compact {
+            self.get_u16_arg() as usize
+        } else {
+            self.get_u64_arg() as usize
         }
-        u64::from_be_bytes(uint64)
     }
 
     fn reserve_stack_space(&mut self, size: usize) {
@@ -181,6 +215,10 @@ impl<'a> AmaVM<'a> {
             }
             let op = self.ctx_module.unwrap().code[self.frames.peek().ip];
             self.frames.peek_mut().last_i = self.frames.peek().ip;
+            #[cfg(feature = "op-count")]
+            {
+                self.ops_executed += 1;
+            }
             match OpCode::from(&op) {
                 OpCode::LoadConst => {
                     let idx = self.get_u16_arg();
@@ -191,8 +229,8 @@ impl<'a> AmaVM<'a> {
                     self.op_push(AmaValue::Str(Cow::Borrowed(&self.ctx_module.unwrap().names[idx as usize])));
                 }
                 OpCode::LoadModuleDef => {
-                    let mod_idx = self.get_u64_arg() as usize;
-                    let def = self.get_u64_arg() as usize;
+                    let mod_idx = self.get_index_arg();
+                    let def = self.get_index_arg();
                     let module_defs = self.imports[mod_idx].globals.borrow();
                     let name = self.ctx_module.unwrap().names[def].as_str();
                     let val = module_defs.get(name).expect("Illegal access to definition.");
@@ -229,7 +267,7 @@ impl<'a> AmaVM<'a> {
                     }
                 }
                 OpCode::MatchVariant => {
-                    let expected_tag = self.get_u64_arg();
+                    let expected_tag = self.get_addr_arg();
                     let obj = self.op_pop();
                     if let AmaValue::Variant(tag, _) = obj {
                         self.op_push(AmaValue::Bool(expected_tag == tag));
@@ -326,7 +364,7 @@ impl<'a> AmaVM<'a> {
                     self.ctx_module.unwrap().globals.borrow_mut().insert(id, value);
                 }
                 OpCode::Jump => {
-                    let addr = self.get_u64_arg() as usize;
+                    let addr = self.get_addr_arg() as usize;
                     self.frames.peek_mut().ip = addr;
                     continue;
                 }
@@ -335,13 +373,61 @@ impl<'a> AmaVM<'a> {
                      * Jumps if the top of the values is false
                      * Pops the values
                      * */
-                    let addr = self.get_u64_arg() as usize;
+                    let addr = self.get_addr_arg() as usize;
                     let value = self.op_pop();
                     if let AmaValue::Bool(false) = value {
                         self.frames.peek_mut().ip = addr;
                         continue;
                     }
                 }
+                OpCode::JumpIfTrue => {
+                    let addr = self.get_addr_arg() as usize;
+                    let value = self.op_pop();
+                    if let AmaValue::Bool(true) = value {
+                        self.frames.peek_mut().ip = addr;
+                        continue;
+                    }
+                }
+                OpCode::Dup => {
+                    self.op_push(self.values[self.sp as usize].clone());
+                }
+                OpCode::IncLocalConst => {
+                    let idx = self.frames.peek().bp as usize + self.get_u16_arg() as usize;
+                    let module = self.ctx_module.unwrap();
+                    let inc = &module.constants[self.get_u16_arg() as usize];
+                    let sum = match (&self.values[idx], inc) {
+                        (AmaValue::Int(local), AmaValue::Int(inc)) => local.checked_add(*inc),
+                        _ => None,
+                    };
+                    if let Some(sum) = sum {
+                        self.values[idx] = AmaValue::Int(sum);
+                    } else {
+                        match AmaValue::binop(inc, OpCode::OpAdd, &self.values[idx]) {
+                            Ok(value) => self.values[idx] = value,
+                            Err(msg) => return self.panic_and_throw(msg),
+                        }
+                    }
+                }
+                OpCode::LocalLessJumpIfTrue => {
+                    let addr = self.get_addr_arg() as usize;
+                    let idx = self.frames.peek().bp as usize + self.get_u16_arg() as usize;
+                    let right = self.op_pop();
+                    let less = match (&self.values[idx], &right) {
+                        (AmaValue::Int(local), AmaValue::Int(end)) => local < end,
+                        (local, end) => local.take_float() < end.take_float(),
+                    };
+                    if less {
+                        self.frames.peek_mut().ip = addr;
+                        continue;
+                    }
+                }
+                OpCode::GetLocalGetLocal => {
+                    let bp = self.frames.peek().bp as usize;
+                    let first = bp + self.get_u16_arg() as usize;
+                    let second = bp + self.get_u16_arg() as usize;
+                    self.op_push(self.values[first].clone());
+                    self.op_push(self.values[second].clone());
+                }
                 OpCode::GetLocal => {
                     let idx = self.get_u16_arg() as usize + self.frames.peek().bp as usize;
                     self.op_push(self.values[idx].clone());
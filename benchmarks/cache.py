@@ -0,0 +1,56 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from os import path
+from amanda.compiler import cache
+from amanda.config import PROJECT_ROOT
+
+
+def run(filename: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "amanda", filename],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def clear(filename: str):
+    entry = cache.cache_path(filename)
+    if path.exists(entry):
+        os.remove(entry)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares cold and warm start times of the compilation cache"
+    )
+    parser.add_argument(
+        "file",
+        nargs="?",
+        default=path.join(PROJECT_ROOT, "examples", "fibo.ama"),
+        help="Program to run",
+    )
+    parser.add_argument(
+        "-r", "--runs", type=int, default=5, help="Number of timed runs"
+    )
+    args = parser.parse_args()
+
+    cold = float("inf")
+    for _ in range(args.runs):
+        clear(args.file)
+        cold = min(cold, run(args.file))
+    warm = float("inf")
+    for _ in range(args.runs):
+        warm = min(warm, run(args.file))
+    print(f"Program: {args.file}")
+    print(f"Cold start: {cold:.3f}s")
+    print(f"Warm start: {warm:.3f}s ({cold / warm:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from amanda.check import check_programs
+
+PROGRAM = """usa "mat" => [abs]
+
+func soma_{i}(n: int): real
+    total: real = 0.0
+    para i de 0..n faca
+        total += abs(i - {i})
+    fim
+    retorna total
+fim
+
+mostra soma_{i}(10)
+"""
+
+
+def write_programs(root: str, count: int) -> list[str]:
+    programs = []
+    for i in range(count):
+        filename = os.path.join(root, f"programa_{i}.ama")
+        with open(filename, "w", encoding="utf8") as src_file:
+            # Every tenth program has an error
+            src_file.write(
+                PROGRAM.format(i=i) + ("" if i % 10 else "mostra x\n")
+            )
+        programs.append(filename)
+    return programs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times checking many programs with one process per "
+        "program, in a single process and across a process pool"
+    )
+    parser.add_argument("-n", "--count", type=int, default=1000)
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        programs = write_programs(tmp, args.count)
+
+        # Processes are slow enough that a few of them are representative
+        sample = programs[:20]
+        start = time.perf_counter()
+        for program in sample:
+            cmd = [sys.executable, "-m", "amanda", "check", program]
+            subprocess.run(cmd, capture_output=True)
+        process = (time.perf_counter() - start) / len(sample) * args.count
+
+        start = time.perf_counter()
+        check_programs(programs, jobs=1)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = check_programs(programs, jobs=args.jobs)
+        pool = time.perf_counter() - start
+
+    print(f"{args.count} programs, {report['summary']['failed']} with errors")
+    print(f"Process per program: {process:.2f}s (estimated)")
+    print(f"Single process: {serial:.2f}s ({process / serial:.0f}x)")
+    print(f"Process pool: {pool:.2f}s ({process / pool:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import tempfile
+import time
+from io import BytesIO
+from os import path
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.module import Module
+
+
+def sample_program(statements: int) -> str:
+    lines = ["total: int = 0"]
+    for i in range(statements):
+        lines.append(f"se total < {i} entao")
+        lines.append(f"    total = total + {i} * 2")
+        lines.append("fim")
+    lines.append("mostra total")
+    return "\n".join(lines) + "\n"
+
+
+def generate(filename: str) -> ByteGen:
+    """Returns a code generator with all the ops of the program."""
+    analyzer = Analyzer(filename, [], Module(filename))
+    module, imports = analyzer.visit_module(analyzer.load_program())
+    gen = ByteGen(module)
+    gen.compile(imports, raw=False)
+    return gen
+
+
+def encode_per_op(gen: ByteGen) -> bytes:
+    """Encodes the ops one at a time, as ByteGen used to."""
+    ops = BytesIO()
+    for op, args in gen.ops:
+        if op.is_jump():
+            args = [gen.labels[args[0]], *args[1:]]
+        code = bytearray([op.value])
+        for arg, size in zip(args, op.arg_sizes(gen.compact)):
+            code += arg.to_bytes(size, "big")
+        ops.write(bytes(code))
+    return ops.getvalue()
+
+
+def best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times the encoding of ops into bytecode, one op at "
+        "a time and in bulk"
+    )
+    parser.add_argument(
+        "-n",
+        "--statements",
+        type=int,
+        default=20000,
+        help="Number of if statements in the compiled program",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        filename = path.join(root, "codegen.ama")
+        with open(filename, "w") as src_file:
+            src_file.write(sample_program(args.statements))
+        start = time.perf_counter()
+        gen = generate(filename)
+        total = time.perf_counter() - start
+
+    assert encode_per_op(gen) == gen.encode_ops()
+    per_op = best_time(lambda: encode_per_op(gen), args.repeat)
+    bulk = best_time(gen.encode_ops, args.repeat)
+    print(f"{len(gen.ops)} ops, {gen.ip} bytes, compiled in {total:.3f}s")
+    print(f"per op: {per_op:.4f}s, bulk: {bulk:.4f}s")
+    print(f"Speedup: {per_op / bulk:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import glob
+from os import path
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.error import AmandaError
+from amanda.compiler.module import Module
+from amanda.compiler.options import CompileOptions
+from amanda.config import PROJECT_ROOT
+
+
+def compiled_size(filename: str, eliminate: bool) -> int:
+    options = CompileOptions(dead_code=eliminate)
+    analyzer = Analyzer(filename, [], Module(filename), options=options)
+    module, imports = analyzer.visit_module(analyzer.load_program())
+    return len(ByteGen(module, options).compile(imports))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reports the size of compiled programs with and "
+        "without dead code elimination"
+    )
+    parser.add_argument(
+        "dirs",
+        nargs="*",
+        default=[
+            path.join(PROJECT_ROOT, "examples"),
+            path.join(PROJECT_ROOT, "tests", "test_cases"),
+        ],
+        help="Dirs with the programs to compile",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="List changed programs"
+    )
+    args = parser.parse_args()
+
+    for src_dir in args.dirs:
+        pattern = path.join(src_dir, "**", "*.ama")
+        before = after = compiled = 0
+        for filename in sorted(glob.glob(pattern, recursive=True)):
+            try:
+                sizes = [
+                    compiled_size(filename, flag) for flag in (False, True)
+                ]
+            except AmandaError:
+                continue
+            compiled += 1
+            before += sizes[0]
+            after += sizes[1]
+            if args.verbose and sizes[0] != sizes[1]:
+                rel = path.relpath(filename, src_dir)
+                print(f"  {rel}: {sizes[0]} -> {sizes[1]} bytes")
+        saved = before - after
+        print(
+            f"{path.relpath(src_dir, PROJECT_ROOT)}: {compiled} programs, "
+            f"{before} -> {after} bytes ({saved} bytes, "
+            f"{saved / before:.1%} smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import time
+import amanda.compiler.ast as ast
+from amanda.compiler.parse import Parser
+
+
+def sample_program(funcs: int) -> str:
+    return "".join(
+        f"func f{i}(x: int, y: real): real\n"
+        f"    se x > {i} e y < {i}.5 entao\n"
+        f"        retorna x * y + {i}\n"
+        f"    senao\n"
+        f"        mostra f{i}(x - 1, y / 2.0)\n"
+        f"    fim\n"
+        f"    retorna (x - {i}) / y\n"
+        f"fim\n\n"
+        for i in range(funcs)
+    )
+
+
+def collect_nodes(program: ast.Module) -> list[ast.ASTNode]:
+    nodes: list[ast.ASTNode] = []
+    pending: list[ast.ASTNode] = [program]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        node.for_each_child(lambda child, _: pending.append(child))
+    return nodes
+
+
+def handle(self, node):
+    pass
+
+
+def with_handlers(cls):
+    """Adds a handler for every node class, as in the compiler passes."""
+    for node_class in vars(ast).values():
+        if isinstance(node_class, type) and issubclass(node_class, ast.ASTNode):
+            setattr(cls, f"visit_{node_class.__name__.lower()}", handle)
+    return cls
+
+
+@with_handlers
+class GetattrVisitor:
+    """Dispatches the way the passes did before the dispatch cache."""
+
+    def general_visit(self, node):
+        pass
+
+    def visit(self, node):
+        node_class = type(node).__name__.lower()
+        method_name = f"visit_{node_class}"
+        visitor_method = getattr(self, method_name, self.general_visit)
+        return visitor_method(node)
+
+
+@with_handlers
+class CachedVisitor:
+    _visitors = ast.Dispatcher("visit", "general_visit")
+
+    def general_visit(self, node):
+        pass
+
+    def visit(self, node):
+        return self._visitors.method(self, node)(self, node)
+
+
+def ns_per_node(visitor, nodes: list[ast.ASTNode], repeat: int) -> float:
+    visit = visitor.visit
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for node in nodes:
+            visit(node)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures the cost of dispatching a visit to the "
+        "handler of each node of a large AST"
+    )
+    parser.add_argument(
+        "-f",
+        "--funcs",
+        type=int,
+        default=2000,
+        help="Number of functions in the sample program",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    program = Parser("<bench>", sample_program(args.funcs)).parse()
+    nodes = collect_nodes(program)
+    print(f"{len(nodes)} nodes")
+    before = ns_per_node(GetattrVisitor(), nodes, args.repeat)
+    after = ns_per_node(CachedVisitor(), nodes, args.repeat)
+    print(f"getattr dispatch: {before:.0f}ns/node")
+    print(f"cached dispatch: {after:.0f}ns/node ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
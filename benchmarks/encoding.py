@@ -0,0 +1,118 @@
+import argparse
+import glob
+import tempfile
+import time
+from os import path
+from amanda.compiler import bindump
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.error import AmandaError
+from amanda.compiler.module import Module
+from amanda.compiler.options import CompileOptions
+from amanda.config import PROJECT_ROOT
+from amanda.libamanda import run_module
+
+
+def sample_program(iterations: int) -> str:
+    return (
+        "func collatz(n: int): int\n"
+        "    passos: int = 0\n"
+        "    enquanto n != 1 faca\n"
+        "        se n % 2 == 0 entao\n"
+        "            n = n // 2\n"
+        "        senao\n"
+        "            n = 3 * n + 1\n"
+        "        fim\n"
+        "        passos = passos + 1\n"
+        "    fim\n"
+        "    retorna passos\n"
+        "fim\n"
+        "total: int = 0\n"
+        f"para i de 1..{iterations} faca\n"
+        "    total = total + collatz(i)\n"
+        "fim\n"
+        "mostra total\n"
+    )
+
+
+def compile_program(filename: str, compact: bool) -> dict:
+    options = CompileOptions(compact_operands=compact)
+    analyzer = Analyzer(filename, [], Module(filename), options=options)
+    module, imports = analyzer.visit_module(analyzer.load_program())
+    return ByteGen(module, options).compile(imports, raw=False)
+
+
+def code_size(module: dict) -> int:
+    return len(module["ops"]) + sum(
+        len(imported["ops"]) for imported in module["imports"]
+    )
+
+
+def best_run(bin_obj: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_module(bin_obj)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares the size of the bytecode and the speed of "
+        "the VM with wide and compact operands"
+    )
+    parser.add_argument(
+        "dirs",
+        nargs="*",
+        default=[
+            path.join(PROJECT_ROOT, "examples"),
+            path.join(PROJECT_ROOT, "tests", "test_cases"),
+        ],
+        help="Dirs with the programs to compile",
+    )
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=3000,
+        help="Number of iterations of the timed program",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for src_dir in args.dirs:
+        pattern = path.join(src_dir, "**", "*.ama")
+        code = [0, 0]
+        total = [0, 0]
+        for filename in sorted(glob.glob(pattern, recursive=True)):
+            try:
+                modules = [
+                    compile_program(filename, compact)
+                    for compact in (False, True)
+                ]
+            except AmandaError:
+                continue
+            for i, module in enumerate(modules):
+                code[i] += code_size(module)
+                total[i] += len(bindump.dumps(module))
+        print(
+            f"{path.relpath(src_dir, PROJECT_ROOT)}: ops {code[0]} -> "
+            f"{code[1]} bytes ({1 - code[1] / code[0]:.1%} smaller), "
+            f"modules {total[0]} -> {total[1]} bytes"
+        )
+
+    with tempfile.TemporaryDirectory() as root:
+        filename = path.join(root, "encoding.ama")
+        with open(filename, "w") as src_file:
+            src_file.write(sample_program(args.iterations))
+        times = []
+        for compact in (False, True):
+            bin_obj = bindump.dumps(compile_program(filename, compact))
+            times.append(best_run(bin_obj, args.repeat))
+    print(f"wide: {times[0]:.3f}s, compact: {times[1]:.3f}s")
+    print(f"Speedup: {times[0] / times[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
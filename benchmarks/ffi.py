@@ -0,0 +1,68 @@
+import argparse
+import ctypes
+import time
+from amanda.compiler import binmod
+from amanda.compiler.opcode import OpCode
+from amanda.config import LIB_AMA
+from amanda.libamanda import run_module
+
+
+def sample_module(size: int) -> bytes:
+    """A module with 'size' bytes of code that halts right away."""
+    return binmod.dumps(
+        {
+            "name": "main",
+            "builtin": 0,
+            "compact": 1,
+            "entry_locals": 0,
+            "constants": [],
+            "names": [],
+            "ops": bytes([OpCode.HALT.value]) * size,
+            "functions": [],
+            "registos": [],
+            "src_map": [],
+            "imports": [],
+        }
+    )
+
+
+def run_copied(module_bin: bytes) -> int:
+    """Hands the module over to the VM the way run_module used to: by
+    loading the library and copying every byte into a ctypes array."""
+    lib_ama = ctypes.CDLL(LIB_AMA)
+    count = len(module_bin)
+    ByteArray = ctypes.c_uint8 * count
+    bin_arr = ByteArray(*bytearray(module_bin))
+    return lib_ama.run_module(ctypes.byref(bin_arr), ctypes.c_int32(count))
+
+
+def best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times running a module that halts right away, which "
+        "is mostly the time taken to hand it over to the VM, for growing "
+        "module sizes"
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in (2**16, 2**20, 2**22, 2**24):
+        module_bin = sample_module(size)
+        copied = best_time(lambda: run_copied(module_bin), args.repeat)
+        shared = best_time(lambda: run_module(module_bin), args.repeat)
+        print(
+            f"{len(module_bin) / 2**20:.2f} MB: copied {copied * 1000:.2f}ms, "
+            f"shared {shared * 1000:.3f}ms ({copied / shared:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
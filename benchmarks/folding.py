@@ -0,0 +1,80 @@
+import argparse
+import os
+import tempfile
+import time
+from os import path
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.module import Module
+from amanda.compiler.options import CompileOptions
+from amanda.libamanda import run_module
+
+
+def sample_program(iterations: int) -> str:
+    return (
+        "total: real = 0.0\n"
+        "segundos: int = 0\n"
+        f"para i de 0..{iterations} faca\n"
+        "    segundos = segundos + 2 * 60 * 60 - 30 * 60 + -(15)\n"
+        "    total = total + 1.5 * 4 / 2 - (10 % 3) * 0.25 + i * (1 + 1)\n"
+        "    se (24 * 60 > 1000) e nao (3 * 3 == 10) entao\n"
+        "        segundos = segundos - (7 // 2) * 2\n"
+        "    fim\n"
+        "fim\n"
+        "mostra segundos\n"
+        "mostra total\n"
+    )
+
+
+def compile_program(filename: str, fold: bool) -> tuple[bytes, int]:
+    """Returns the compiled program and its number of instructions."""
+    options = CompileOptions(fold_constants=fold)
+    analyzer = Analyzer(filename, [], Module(filename), options=options)
+    module, imports = analyzer.visit_module(analyzer.load_program())
+    gen = ByteGen(module, options)
+    bin_obj = gen.compile(imports)
+    return bin_obj, len(gen.ops)
+
+
+def best_run(bin_obj: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_module(bin_obj)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares a loop over constant arithmetic with and "
+        "without constant folding"
+    )
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=100000,
+        help="Number of iterations of the loop",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        filename = path.join(root, "fold.ama")
+        with open(filename, "w") as src_file:
+            src_file.write(sample_program(args.iterations))
+        results = {}
+        for fold in (False, True):
+            bin_obj, op_count = compile_program(filename, fold)
+            results[fold] = (op_count, best_run(bin_obj, args.repeat))
+
+    for fold, (op_count, elapsed) in results.items():
+        label = "folded" if fold else "unfolded"
+        print(f"{label}: {op_count} instructions, {elapsed:.3f}s")
+    speedup = results[False][1] / results[True][1]
+    print(f"Speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import random
+import string
+import time
+from benchmarks.lexer import count_tokens
+
+KEYWORDS = ["se", "enquanto", "retorna", "func", "fim", "verdadeiro"]
+
+
+def synthetic_source(count: int, length: int, seed: int) -> str:
+    """Builds a file with 'count' identifiers, one sixth of them
+    keywords, interleaved with long numeric literals."""
+    rng = random.Random(seed)
+    chars = string.ascii_letters + string.digits + "_"
+    words = []
+    for i in range(count):
+        if i % 6 == 0:
+            words.append(rng.choice(KEYWORDS))
+        else:
+            tail = "".join(rng.choices(chars, k=length - 1))
+            words.append(rng.choice(string.ascii_letters) + tail)
+        if i % 10 == 9:
+            words.append(str(rng.getrandbits(60)))
+            words.append("\n")
+    return " ".join(words) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures how fast the lexer reads identifiers"
+    )
+    parser.add_argument(
+        "-n",
+        "--count",
+        type=int,
+        default=1_000_000,
+        help="Number of identifiers in the synthetic file",
+    )
+    parser.add_argument(
+        "-l", "--length", type=int, default=24, help="Identifier length"
+    )
+    parser.add_argument(
+        "-r", "--runs", type=int, default=3, help="Number of timed runs"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    src = synthetic_source(args.count, args.length, args.seed)
+    best = float("inf")
+    tokens = 0
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        tokens = count_tokens(src)
+        best = min(best, time.perf_counter() - start)
+    print(f"Source: {len(src)} chars, {tokens} tokens")
+    print(f"Best of {args.runs}: {best:.3f}s ({tokens / best:,.0f} tokens/s)")
+
+
+if __name__ == "__main__":
+    main()
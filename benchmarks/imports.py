@@ -0,0 +1,65 @@
+import argparse
+import tempfile
+import time
+from os import path
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.module import Module
+from amanda.compiler.parse import parse
+
+
+def write_project(root: str, modules: int) -> str:
+    """Writes a program that imports 'modules' modules with scoped
+    imports and returns the path of its entry file."""
+    usa_stmts = []
+    calls = []
+    for i in range(modules):
+        with open(path.join(root, f"mod{i}.ama"), "w") as mod_file:
+            mod_file.write(
+                f"func f{i}(x: int): int\n    retorna x + {i}\nfim\n"
+            )
+        usa_stmts.append(f'usa "{path.join(root, f"mod{i}")}" => m{i}\n')
+        calls.append(f"m{i}.f{i}(1)\n")
+    main = path.join(root, "main.ama")
+    with open(main, "w") as main_file:
+        main_file.write("".join(usa_stmts) + "\n" + "".join(calls))
+    return main
+
+
+def check(filename: str):
+    Analyzer(filename, [], Module(filename)).visit_module(parse(filename))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures type checking time as the number of "
+        "imported modules grows"
+    )
+    parser.add_argument(
+        "-m",
+        "--modules",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50, 100, 200],
+        help="Number of imported modules of each run",
+    )
+    parser.add_argument(
+        "-r", "--runs", type=int, default=5, help="Number of timed runs"
+    )
+    args = parser.parse_args()
+
+    for modules in args.modules:
+        with tempfile.TemporaryDirectory() as root:
+            main_file = write_project(root, modules)
+            best = float("inf")
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                check(main_file)
+                best = min(best, time.perf_counter() - start)
+        print(
+            f"{modules:>5} modules: {best * 1000:.2f}ms "
+            f"({best * 1000 / modules:.3f}ms/module)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import glob
+import time
+from os import path
+from amanda.compiler.parse import Lexer
+from amanda.config import PROJECT_ROOT
+
+
+def sample_source(copies: int) -> str:
+    """Builds a large program by repeating the examples and the
+    std lib sources."""
+    files = sorted(
+        glob.glob(path.join(PROJECT_ROOT, "examples", "*.ama"))
+        + glob.glob(path.join(PROJECT_ROOT, "std", "*.ama"))
+    )
+    sources = []
+    for filename in files:
+        with open(filename, encoding="utf8") as src_file:
+            sources.append(src_file.read())
+    return "\n".join(sources) * copies
+
+
+def count_tokens(src: str) -> int:
+    lexer = Lexer("<bench>", src)
+    count = 0
+    while lexer.get_token().token != Lexer.EOF:
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures lexer throughput in tokens/s"
+    )
+    parser.add_argument(
+        "-c",
+        "--copies",
+        type=int,
+        default=200,
+        help="Number of times the sample sources are repeated",
+    )
+    parser.add_argument(
+        "-r", "--runs", type=int, default=5, help="Number of timed runs"
+    )
+    args = parser.parse_args()
+
+    src = sample_source(args.copies)
+    lines = src.count("\n")
+    best = float("inf")
+    tokens = 0
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        tokens = count_tokens(src)
+        best = min(best, time.perf_counter() - start)
+    print(f"Source: {lines} lines, {len(src)} chars, {tokens} tokens")
+    print(f"Best of {args.runs}: {best:.3f}s ({tokens / best:,.0f} tokens/s)")
+
+
+if __name__ == "__main__":
+    main()
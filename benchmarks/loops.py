@@ -0,0 +1,84 @@
+import argparse
+import tempfile
+import time
+from os import path
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.module import Module
+from amanda.compiler.options import CompileOptions
+from amanda.libamanda import ops_executed, run_module
+
+
+def sample_program(iterations: int) -> str:
+    return (
+        "func soma(n: int): int\n"
+        "    total: int = 0\n"
+        "    para i de 0..n faca\n"
+        "        total = total + i\n"
+        "    fim\n"
+        "    retorna total\n"
+        "fim\n"
+        "func soma_quadrados(n: int): int\n"
+        "    total: int = 0\n"
+        "    para i de 0..n faca\n"
+        "        para j de 0..10 faca\n"
+        "            total = total + j * j\n"
+        "        fim\n"
+        "    fim\n"
+        "    retorna total\n"
+        "fim\n"
+        f"mostra soma({iterations})\n"
+        f"mostra soma_quadrados({iterations // 10})\n"
+    )
+
+
+def compile_program(filename: str, fuse: bool) -> bytes:
+    options = CompileOptions(superinstructions=fuse)
+    analyzer = Analyzer(filename, [], Module(filename), options=options)
+    module, imports = analyzer.visit_module(analyzer.load_program())
+    return ByteGen(module, options).compile(imports)
+
+
+def best_run(bin_obj: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_module(bin_obj)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares counted loops with and without "
+        "superinstructions"
+    )
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=100000,
+        help="Number of iterations of the loops",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        filename = path.join(root, "loops.ama")
+        with open(filename, "w") as src_file:
+            src_file.write(sample_program(args.iterations))
+        results = {}
+        for fuse in (False, True):
+            bin_obj = compile_program(filename, fuse)
+            elapsed = best_run(bin_obj, args.repeat)
+            results[fuse] = (ops_executed(), elapsed)
+
+    for fuse, (op_count, elapsed) in results.items():
+        label = "fused" if fuse else "unfused"
+        print(f"{label}: {op_count} ops executed, {elapsed:.3f}s")
+    speedup = results[False][1] / results[True][1]
+    print(f"Speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import tracemalloc
+from amanda.compiler.parse import Lexer
+from benchmarks.lexer import sample_source
+
+
+def measure(fn, *args):
+    """Returns the result of calling fn and the peak memory
+    allocated during the call, in bytes."""
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def tokenize(src: str):
+    return Lexer("<bench>", src).tokenize()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures peak memory used to tokenize a large module"
+    )
+    parser.add_argument(
+        "-c",
+        "--copies",
+        type=int,
+        default=50,
+        help="Number of times the sample sources are repeated",
+    )
+    args = parser.parse_args()
+
+    src = sample_source(args.copies)
+    tokens, lex_peak = measure(tokenize, src)
+    count = len(tokens)
+    mib = 1024 * 1024
+    print(f"Source: {len(src)} chars, {count} tokens")
+    print(
+        f"Tokenize: peak {lex_peak / mib:.2f} MiB "
+        f"({lex_peak / count:.0f} bytes/token)"
+    )
+
+
+if __name__ == "__main__":
+    main()
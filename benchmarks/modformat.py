@@ -0,0 +1,83 @@
+import argparse
+import time
+from amanda.compiler import bindump, binmod
+from amanda.compiler.opcode import OpCode
+from amanda.libamanda import run_module
+
+
+def sample_module(size: int) -> dict:
+    """Builds a module of about 'size' bytes in the flat format. Its
+    code halts right away, so running it only measures the time taken
+    to load it."""
+    count = size // 100
+    constants = []
+    for i in range(count):
+        constants.extend((i, i + 0.5, f"constante {i}"))
+    return {
+        "name": "main",
+        "builtin": 0,
+        "compact": 1,
+        "entry_locals": 0,
+        "constants": constants,
+        "names": [f"nome_{i}" for i in range(count)],
+        "ops": bytes([OpCode.HALT.value]) * (size // 4),
+        "functions": [
+            {"name": f"func_{i}", "start_ip": 0, "locals": 2, "module": -1}
+            for i in range(count // 10)
+        ],
+        "registos": [
+            {"name": f"Registo{i}", "fields": ["x", "y"]}
+            for i in range(count // 10)
+        ],
+        "src_map": list(range(count * 3)),
+        "imports": [],
+    }
+
+
+def best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares the time taken to write and to load a large "
+        "module in BSON and in the flat binary format"
+    )
+    parser.add_argument(
+        "-s",
+        "--size",
+        type=int,
+        default=5_000_000,
+        help="Approximate size of the module in bytes",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    module = sample_module(args.size)
+    results = {}
+    for fmt in (bindump, binmod):
+        dump_time = best_time(lambda: fmt.dumps(module), args.repeat)
+        bin_obj = fmt.dumps(module)
+        load_time = best_time(lambda: run_module(bin_obj), args.repeat)
+        results[fmt.__name__.split(".")[-1]] = (
+            len(bin_obj),
+            dump_time,
+            load_time,
+        )
+
+    for name, (size, dump_time, load_time) in results.items():
+        print(
+            f"{name}: {size / 1e6:.2f} MB, written in {dump_time:.3f}s, "
+            f"loaded in {load_time:.3f}s"
+        )
+    speedup = results["bindump"][2] / results["binmod"][2]
+    print(f"Load speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import tempfile
+import time
+from os import path
+from amanda.compiler.imports import import_graph, parse_modules
+
+
+def write_project(root: str, modules: int, funcs: int) -> str:
+    """Writes a program that imports 'modules' modules, each declaring
+    'funcs' functions, and returns the path of its entry file."""
+    usa_stmts = []
+    for i in range(modules):
+        body = "".join(
+            f"func f{j}(x: int, y: real): real\n"
+            f"    se x > {j} entao\n"
+            f"        retorna x * y + {j}\n"
+            f"    fim\n"
+            f"    retorna (x - {j}) / y\n"
+            f"fim\n\n"
+            for j in range(funcs)
+        )
+        with open(path.join(root, f"mod{i}.ama"), "w") as mod_file:
+            mod_file.write(body)
+        usa_stmts.append(f'usa "{path.join(root, f"mod{i}")}" => m{i}\n')
+    main = path.join(root, "main.ama")
+    with open(main, "w") as main_file:
+        main_file.write("".join(usa_stmts))
+    return main
+
+
+def timed(modules: list[str], workers: int) -> float:
+    start = time.perf_counter()
+    parse_modules(modules, workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares serial and parallel parsing of a program's "
+        "modules"
+    )
+    parser.add_argument(
+        "-m", "--modules", type=int, default=64, help="Number of modules"
+    )
+    parser.add_argument(
+        "-f",
+        "--funcs",
+        type=int,
+        default=100,
+        help="Number of functions in each module",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, os.cpu_count() or 1],
+        help="Worker counts to measure",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        main_file = write_project(root, args.modules, args.funcs)
+        start = time.perf_counter()
+        modules = list(import_graph(main_file, []))
+        scan = time.perf_counter() - start
+        print(f"Import scan of {len(modules)} modules: {scan * 1000:.1f}ms")
+        serial = timed(modules, 1)
+        print(f"1 worker: {serial:.3f}s")
+        for workers in sorted(set(args.workers) - {1}):
+            elapsed = timed(modules, workers)
+            print(
+                f"{workers} workers: {elapsed:.3f}s "
+                f"({serial / elapsed:.1f}x speedup)"
+            )
+
+
+if __name__ == "__main__":
+    main()
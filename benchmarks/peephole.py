@@ -0,0 +1,95 @@
+import argparse
+import glob
+import os
+import sys
+import tempfile
+from os import path
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.error import AmandaError
+from amanda.compiler.module import Module
+from amanda.compiler.options import CompileOptions
+from amanda.config import PROJECT_ROOT
+from amanda.libamanda import ops_executed, run_module
+
+
+def compile_program(filename: str, optimize: bool) -> tuple[bytes, int]:
+    """Returns the compiled program and its number of instructions."""
+    options = CompileOptions(peephole=optimize)
+    analyzer = Analyzer(filename, [], Module(filename))
+    module, imports = analyzer.visit_module(analyzer.load_program())
+    gen = ByteGen(module, options)
+    bin_obj = gen.compile(imports)
+    return bin_obj, len(gen.ops)
+
+
+def run(bin_obj: bytes) -> tuple[int, bytes]:
+    """Runs a program and returns the number of ops executed by the VM
+    and everything the program wrote."""
+    sys.stdout.flush()
+    saved = os.dup(1), os.dup(2)
+    with tempfile.TemporaryFile() as output:
+        os.dup2(output.fileno(), 1)
+        os.dup2(output.fileno(), 2)
+        try:
+            run_module(bin_obj)
+        finally:
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+        output.seek(0)
+        return ops_executed(), output.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Counts the instructions of programs, and the ones the "
+        "VM executes, with and without the peephole optimizer"
+    )
+    parser.add_argument(
+        "dirs",
+        nargs="*",
+        default=[path.join(PROJECT_ROOT, "tests", "test_cases")],
+        help="Dirs with the programs to run",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="List changed programs"
+    )
+    args = parser.parse_args()
+
+    for src_dir in args.dirs:
+        pattern = path.join(src_dir, "**", "*.ama")
+        static = [0, 0]
+        executed = [0, 0]
+        programs = 0
+        for filename in sorted(glob.glob(pattern, recursive=True)):
+            results = []
+            try:
+                for optimize in (False, True):
+                    bin_obj, op_count = compile_program(filename, optimize)
+                    results.append((op_count, *run(bin_obj)))
+            except AmandaError:
+                continue
+            programs += 1
+            rel = path.relpath(filename, src_dir)
+            (ops, ran, out), (opt_ops, opt_ran, opt_out) = results
+            if out != opt_out:
+                print(f"  {rel}: output changed!")
+            static[0] += ops
+            static[1] += opt_ops
+            executed[0] += ran
+            executed[1] += opt_ran
+            if args.verbose and ran != opt_ran:
+                print(f"  {rel}: {ran} -> {opt_ran} ops executed")
+        print(
+            f"{path.relpath(src_dir, PROJECT_ROOT)}: {programs} programs\n"
+            f"  instructions: {static[0]} -> {static[1]} "
+            f"({1 - static[1] / static[0]:.1%} fewer)\n"
+            f"  executed: {executed[0]} -> {executed[1]} "
+            f"({1 - executed[1] / executed[0]:.1%} fewer)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from amanda import AmandaRuntime
+
+PROGRAM = """usa "mat" => [abs]
+
+func soma(n: int): real
+    total: real = 0.0
+    para i de 0..n faca
+        total += abs(i - {seed})
+    fim
+    retorna total
+fim
+
+x: real = soma(100)
+"""
+
+
+def mean_time(func, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times compiling and running a small program with a new "
+        "process per run, against a single AmandaRuntime"
+    )
+    parser.add_argument("-n", "--count", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "main.ama")
+        with open(filename, "w", encoding="utf8") as src_file:
+            src_file.write(PROGRAM.format(seed=0))
+
+        def run_process(_):
+            cmd = [sys.executable, "-m", "amanda", "--no-cache", filename]
+            subprocess.run(cmd, check=True)
+
+        # Processes are slow enough that a few runs are representative
+        process = mean_time(run_process, min(args.count, 20))
+
+    start = time.perf_counter()
+    runtime = AmandaRuntime()
+    startup = time.perf_counter() - start
+
+    def run_new(i):
+        runtime.run(runtime.compile(source=PROGRAM.format(seed=i)))
+
+    def run_cached(_):
+        runtime.run(runtime.compile(source=PROGRAM.format(seed=0)))
+
+    def compile_memory(i):
+        runtime.compile_source(PROGRAM.format(seed=i), "main.ama", {})
+
+    new = mean_time(run_new, args.count)
+    cached = mean_time(run_cached, args.count)
+    memory = mean_time(compile_memory, args.count)
+    print(f"Process per run: {process * 1000:.2f}ms")
+    print(f"Runtime startup: {startup * 1000:.2f}ms")
+    print(f"Runtime, new program: {new * 1000:.2f}ms ({process / new:.0f}x)")
+    print(
+        f"Runtime, compiled program: {cached * 1000:.3f}ms "
+        f"({process / cached:.0f}x)"
+    )
+    print(
+        f"Compiles from memory: {memory * 1000:.2f}ms "
+        f"({1 / memory:.0f} per second)"
+    )
+
+
+if __name__ == "__main__":
+    main()
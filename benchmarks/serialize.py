@@ -0,0 +1,64 @@
+import argparse
+import time
+from amanda.compiler.binmod import dumps
+from tests.test_binmod import reference_dumps
+
+
+def sample_module(functions: int, imports: int = 0) -> dict:
+    return {
+        "name": "main",
+        "builtin": 0,
+        "compact": 1,
+        "entry_locals": 0,
+        "constants": [True, False, *range(functions)],
+        "names": [f"nome_{i}" for i in range(functions)],
+        "ops": bytes(functions * 20),
+        "functions": [
+            {"name": f"func_{i}", "start_ip": i, "locals": 2, "module": -1}
+            for i in range(functions)
+        ],
+        "registos": [],
+        "src_map": list(range(functions * 3)),
+        "imports": [sample_module(functions) for _ in range(imports)],
+    }
+
+
+def best_time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times the module writer on modules with a growing "
+        "number of imports, against the previous writer"
+    )
+    parser.add_argument(
+        "-f",
+        "--functions",
+        type=int,
+        default=200,
+        help="Number of functions of each module",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for imports in (10, 100, 1000):
+        module = sample_module(args.functions, imports)
+        size = len(dumps(module)) / 1e6
+        single = best_time(lambda: dumps(module), args.repeat)
+        previous = best_time(lambda: reference_dumps(module), args.repeat)
+        print(
+            f"{imports} imports, {size:.2f} MB: "
+            f"single buffer {single:.3f}s ({single / size:.3f}s/MB), "
+            f"previous {previous:.3f}s ({previous / size:.3f}s/MB), "
+            f"{previous / single:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
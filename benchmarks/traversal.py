@@ -0,0 +1,53 @@
+import argparse
+import time
+import tracemalloc
+from amanda.compiler.parse import Parser
+from benchmarks.dispatch import collect_nodes, sample_program
+
+
+def parse_retained(src: str):
+    """Parses src and returns the tree and the memory it retains, in bytes."""
+    tracemalloc.start()
+    try:
+        program = Parser("<bench>", src).parse()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return program, retained
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures the memory held by a large AST and the "
+        "time taken to walk its children"
+    )
+    parser.add_argument(
+        "-f",
+        "--funcs",
+        type=int,
+        default=2000,
+        help="Number of functions in the sample program",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    program, retained = parse_retained(sample_program(args.funcs))
+    count = len(collect_nodes(program))
+    print(f"{count} nodes, {retained / count:.0f} bytes/node")
+    walk = best_of(args.repeat, collect_nodes, program)
+    print(f"Walk children: {walk * 1000:.1f}ms")
+    tag = best_of(args.repeat, program.tag_children)
+    print(f"Tag children: {tag * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
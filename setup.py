@@ -38,6 +38,7 @@ def main():
             "--noconfirm",
             # Builtin modules
             f"--add-data=./std/embutidos.ama{path_sep}./std/",
+            f"--add-data=./std/std.bundle{path_sep}./std/",
             # VM dynamic lib
             f"--add-data={LIB_AMA}{path_sep}./deps/",
             f"--distpath={build_dir}",
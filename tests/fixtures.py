@@ -0,0 +1,28 @@
+import os
+import tempfile
+from os import path
+from unittest import TestCase
+
+
+class SourceTestCase(TestCase):
+    """Test case with a temporary dir for the sources it compiles,
+    removed after each test."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def write(self, name, text):
+        """Writes 'text' to 'name' in the temporary dir and returns
+        the path of the file."""
+        filename = path.join(self.root, name)
+        os.makedirs(path.dirname(filename), exist_ok=True)
+        with open(filename, "w", encoding="utf8") as src_file:
+            src_file.write(text)
+        return filename
+
+    def chdir(self, dir_path):
+        """Changes the cwd to 'dir_path' until the test ends."""
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(dir_path)
@@ -94,6 +94,8 @@ def get_case_output(case):
 
 def load_test_cases(suite):
     for root, dirs, files in os.walk(suite):
+        # Skip compilation caches written while running the cases
+        dirs[:] = [d for d in dirs if d != "__amacache__"]
         dirname = os.path.basename(root)
         test_cases = [
             (join(root, filename), get_case_output(join(root, filename)))
@@ -0,0 +1,84 @@
+import glob
+from os import path
+from unittest import TestCase
+
+import amanda.compiler.ast as ast
+from amanda.compiler.error import AmandaError
+from amanda.compiler.parse import Parser, parse
+from amanda.compiler.tokens import Token, TokenType as TT
+
+TEST_DIR = path.dirname(__file__)
+
+
+def slots(node: ast.ASTNode) -> list[str]:
+    return [
+        attr
+        for cls in type(node).__mro__
+        for attr in cls.__dict__.get("__slots__", ())
+    ]
+
+
+def holds_nodes(value) -> bool:
+    if isinstance(value, list):
+        return any(isinstance(item, ast.ASTNode) for item in value)
+    return isinstance(value, ast.ASTNode)
+
+
+class TestFields(TestCase):
+    def test_nodes_have_no_dict(self):
+        for node_class in vars(ast).values():
+            if isinstance(node_class, type) and issubclass(
+                node_class, ast.ASTNode
+            ):
+                self.assertEqual(
+                    node_class.__dictoffset__, 0, node_class.__name__
+                )
+
+    def test_fields_cover_children(self):
+        sources = glob.glob(
+            path.join(TEST_DIR, "test_cases", "**", "*.ama"), recursive=True
+        )
+        for src in sources:
+            try:
+                pending: list[ast.ASTNode] = [parse(src)]
+            except AmandaError:
+                continue
+            while pending:
+                node = pending.pop()
+                children = [
+                    attr
+                    for attr in slots(node)
+                    if attr != "parent"
+                    and holds_nodes(getattr(node, attr, None))
+                ]
+                for attr in children:
+                    self.assertIn(attr, node._fields, type(node).__name__)
+                node.for_each_child(lambda child, _: pending.append(child))
+
+
+class TestTagChildren(TestCase):
+    DEPTH = 100_000
+
+    def test_deep_tree(self):
+        program = Parser("<test>", "mostra 1" + " + 1" * self.DEPTH).parse()
+        program.tag_children()
+        node = program.children[0].exp
+        depth = 0
+        while isinstance(node, ast.BinOp):
+            self.assertIs(node.left.parent, node)
+            self.assertIs(node.right.parent, node)
+            node = node.left
+            depth += 1
+        self.assertEqual(depth, self.DEPTH)
+
+    def test_deep_built_tree(self):
+        token = Token(TT.MINUS, "-", 1, 1)
+        leaf = node = ast.Constant(Token(TT.INTEGER, 1, 1, 1))
+        for _ in range(self.DEPTH):
+            node = ast.UnaryOp(token, operand=node)
+        program = ast.Module([ast.Mostra(token, node)])
+        program.tag_children()
+        self.assertIs(program.children[0].parent, program)
+        for _ in range(self.DEPTH):
+            leaf = leaf.parent
+        self.assertIs(leaf, node)
@@ -0,0 +1,175 @@
+import struct
+from os import path
+from typing import Any
+from unittest import TestCase
+
+from amanda.compiler import binmod
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.module import Module
+from amanda.config import PROJECT_ROOT
+
+
+def module(name: str, **fields) -> dict:
+    return {
+        "name": name,
+        "builtin": 0,
+        "compact": 1,
+        "entry_locals": 0,
+        "constants": [],
+        "names": [],
+        "ops": b"",
+        "functions": [],
+        "registos": [],
+        "src_map": [],
+        "imports": [],
+        **fields,
+    }
+
+
+def reference_module(module: dict[str, Any]) -> bytes:
+    sections = [bytearray() for _ in range(binmod.SECTION_COUNT)]
+    name, constants, names, code, functions, registos, src_map = sections
+    name += module["name"].encode()
+    constants += struct.pack("<I", len(module["constants"]))
+    for constant in module["constants"]:
+        binmod.dump_const(constants, constant)
+    names += struct.pack("<I", len(module["names"]))
+    for item in module["names"]:
+        binmod.dump_str(names, item)
+    code += module["ops"]
+    functions += struct.pack("<I", len(module["functions"]))
+    for func in module["functions"]:
+        binmod.dump_str(functions, func["name"])
+        functions += struct.pack(
+            "<IIi", func["start_ip"], func["locals"], func["module"]
+        )
+    registos += struct.pack("<I", len(module["registos"]))
+    for registo in module["registos"]:
+        binmod.dump_str(registos, registo["name"])
+        registos += struct.pack("<I", len(registo["fields"]))
+        for field in registo["fields"]:
+            binmod.dump_str(registos, field)
+    src_map += struct.pack(
+        f"<I{len(module['src_map'])}q",
+        len(module["src_map"]),
+        *module["src_map"],
+    )
+    flags = binmod.BUILTIN if module["builtin"] else 0
+    if module.get("compact"):
+        flags |= binmod.COMPACT
+    out = bytearray(struct.pack("<II", flags, module["entry_locals"]))
+    offset = binmod.MODULE_HEADER_SIZE
+    for section in sections:
+        out += struct.pack("<II", offset, len(section))
+        offset += len(section)
+    for section in sections:
+        out += section
+    return bytes(out)
+
+
+def reference_dumps(data: dict[str, Any]) -> bytes:
+    """The previous writer, which writes every module and each of its
+    sections on its own and then copies them into the output."""
+    modules = [reference_module(mod) for mod in (data, *data["imports"])]
+    out = bytearray(
+        struct.pack("<4sHHI", binmod.MAGIC, binmod.VERSION, 0, len(modules))
+    )
+    offset = len(out) + 4 * len(modules)
+    for mod in modules:
+        out += struct.pack("<I", offset)
+        offset += len(mod)
+    for mod in modules:
+        out += mod
+    return bytes(out)
+
+
+def sections(bin_obj: bytes, offset: int) -> list[bytes]:
+    """Returns the sections of the module at 'offset'."""
+    table = struct.unpack_from(
+        f"<{2 * binmod.SECTION_COUNT}I", bin_obj, offset + 8
+    )
+    return [
+        bin_obj[offset + start : offset + start + size]
+        for start, size in zip(table[::2], table[1::2])
+    ]
+
+
+class TestBinMod(TestCase):
+    def test_header(self):
+        lib = module("lib", builtin=1, compact=0)
+        bin_obj = binmod.dumps(module("main", entry_locals=3, imports=[lib]))
+        magic, version, _, count, main, imported = struct.unpack_from(
+            "<4sHHIII", bin_obj
+        )
+        self.assertEqual((magic, version, count), (b"AMAB", 1, 2))
+        self.assertEqual(struct.unpack_from("<II", bin_obj, main), (2, 3))
+        self.assertEqual(struct.unpack_from("<II", bin_obj, imported), (1, 0))
+        self.assertEqual(sections(bin_obj, main)[0], b"main")
+        self.assertEqual(sections(bin_obj, imported)[0], b"lib")
+
+    def test_sections(self):
+        functions = [{"name": "f", "start_ip": 4, "locals": 2, "module": -1}]
+        registos = [{"name": "P", "fields": ["x"]}]
+        bin_obj = binmod.dumps(
+            module(
+                "main",
+                names=["mostra"],
+                ops=bytes([1, 0, 0, 255]),
+                functions=functions,
+                registos=registos,
+                src_map=[0, 3, 1],
+            )
+        )
+        _, _, names, ops, funcs, regs, src_map = sections(bin_obj, 16)
+        self.assertEqual(names, b"\x01\0\0\0\x06\0\0\0mostra")
+        self.assertEqual(ops, bytes([1, 0, 0, 255]))
+        self.assertEqual(
+            funcs, b"\x01\0\0\0\x01\0\0\0f" + struct.pack("<IIi", 4, 2, -1)
+        )
+        self.assertEqual(regs, b"\x01\0\0\0\x01\0\0\0P\x01\0\0\0\x01\0\0\0x")
+        self.assertEqual(src_map, struct.pack("<I3q", 3, 0, 3, 1))
+
+    def test_constants(self):
+        constants = [True, None, 12, 2.5, "olá", "7"]
+        bin_obj = binmod.dumps(module("main", constants=constants))
+        pool = sections(bin_obj, 16)[1]
+        self.assertEqual(
+            pool,
+            struct.pack("<I", 6)
+            + bytes([binmod.CONST_BOOL, 1, binmod.CONST_NULL])
+            + struct.pack("<Bq", binmod.CONST_INT, 12)
+            + struct.pack("<Bd", binmod.CONST_F64, 2.5)
+            + struct.pack("<BI", binmod.CONST_STR, 4)
+            + "olá".encode()
+            + struct.pack("<BI", binmod.CONST_STR, 1)
+            + b"7",
+        )
+
+    def test_same_bytes(self):
+        lib = module(
+            "lib",
+            builtin=1,
+            constants=["x", 1.5],
+            names=["y"],
+            ops=bytes(10),
+            registos=[{"name": "P", "fields": ["x", "y"]}],
+        )
+        main = module(
+            "main",
+            entry_locals=2,
+            constants=[None, False, -3, "olá"],
+            functions=[{"name": "f", "start_ip": 1, "locals": 0, "module": 0}],
+            src_map=[0, 4, 1],
+            imports=[lib, module("vazio")],
+        )
+        self.assertEqual(binmod.dumps(main), reference_dumps(main))
+
+    def test_same_bytes_program(self):
+        filename = path.join(
+            PROJECT_ROOT, "tests", "test_cases", "usa", "usa_multiple.ama"
+        )
+        analyzer = Analyzer(filename, [], Module(filename))
+        program, imports = analyzer.visit_module(analyzer.load_program())
+        compiled = ByteGen(program).compile(imports, raw=False)
+        self.assertEqual(binmod.dumps(compiled), reference_dumps(compiled))
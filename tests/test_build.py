@@ -0,0 +1,87 @@
+import os
+from contextlib import redirect_stdout
+from io import StringIO
+from os import path
+from unittest import mock
+
+from amanda.build import Builder
+from tests.fixtures import SourceTestCase
+
+
+class TestBuild(SourceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.lib = self.write("lib.ama", "func f(): int\n    retorna 1\nfim\n")
+        usa = f'usa "{path.join(self.root, "lib")}" => lib\n'
+        self.main = self.write("main.ama", usa + "mostra lib.f()\n")
+        self.other = self.write("other.ama", "mostra 2\n")
+        self.manifest = path.join(self.root, "manifest.json")
+
+    def build(self):
+        out = StringIO()
+        with redirect_stdout(out):
+            failed = Builder([self.root], self.manifest).build()
+        built = [
+            line.split()[-1]
+            for line in out.getvalue().splitlines()
+            if line.startswith("Built")
+        ]
+        return failed, sorted(path.basename(name) for name in built)
+
+    def test_incremental_build(self):
+        self.assertEqual(
+            self.build(), (0, ["lib.ama", "main.ama", "other.ama"])
+        )
+        self.assertEqual(self.build(), (0, []))
+        self.write("lib.ama", "func f(): int\n    retorna 3\nfim\n")
+        self.assertEqual(self.build(), (0, ["lib.ama", "main.ama"]))
+
+    def test_failed_programs_are_rebuilt(self):
+        self.write("other.ama", "mostra x\n")
+        self.assertEqual(self.build(), (1, ["lib.ama", "main.ama"]))
+        self.assertEqual(self.build(), (1, []))
+
+    def test_unreadable_programs_fail(self):
+        with open(path.join(self.root, "bad.ama"), "wb") as src_file:
+            src_file.write(b"mostra '\xff'\n")
+        with mock.patch("sys.stderr"):
+            self.assertEqual(
+                self.build(), (1, ["lib.ama", "main.ama", "other.ama"])
+            )
+            self.assertTrue(path.exists(self.manifest))
+            self.assertEqual(self.build(), (1, []))
+
+    def test_rebuilt_from_another_cwd(self):
+        self.build()
+        self.chdir(self.root)
+        self.assertEqual(
+            self.build(), (0, ["lib.ama", "main.ama", "other.ama"])
+        )
+        self.assertEqual(self.build(), (0, []))
+
+    def test_rebuilt_when_import_resolves_elsewhere(self):
+        self.chdir(self.root)
+        self.write("calc.ama", 'usa "mat"\nmostra abs(-1)\n')
+        self.build()
+        # Hides the std lib module for programs built from this dir
+        self.write("mat.ama", "func abs(x: int): int\n    retorna x\nfim\n")
+        self.assertEqual(self.build(), (0, ["calc.ama", "mat.ama"]))
+
+    def test_watch_sees_changes_saved_during_a_build(self):
+        builder = Builder([self.root], self.manifest)
+
+        def edit_during_first_build():
+            if builder.build.call_count == 1:
+                self.write("other.ama", "mostra 3\n")
+                stat = os.stat(self.other)
+                os.utime(self.other, (stat.st_atime, stat.st_mtime + 10))
+            return 0
+
+        with mock.patch.object(
+            builder, "build", side_effect=edit_during_first_build
+        ) as build, mock.patch(
+            "amanda.build.time.sleep", side_effect=[None, KeyboardInterrupt]
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                builder.watch(0)
+        self.assertEqual(build.call_count, 2)
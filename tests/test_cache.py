@@ -0,0 +1,63 @@
+from argparse import Namespace
+from os import path
+from unittest import mock
+
+from amanda.__main__ import compile_file
+from amanda.compiler import cache
+from amanda.config import STD_LIB
+from tests.fixtures import SourceTestCase
+
+
+class TestCache(SourceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.main = self.write("main.ama", "mostra 1\n")
+        self.dep = self.write("dep.ama", "func f(): int\n retorna 1\nfim\n")
+
+    def test_miss(self):
+        self.assertIsNone(cache.load(self.main))
+
+    def test_hit(self):
+        cache.store(self.main, [self.dep], b"\x00\n\x01module", {})
+        self.assertEqual(cache.load(self.main), b"\x00\n\x01module")
+
+    def test_source_changed(self):
+        cache.store(self.main, [self.dep], b"module", {})
+        self.write("main.ama", "mostra 2\n")
+        self.assertIsNone(cache.load(self.main))
+
+    def test_dependency_changed(self):
+        cache.store(self.main, [self.dep], b"module", {})
+        self.write("dep.ama", "func f(): int\n retorna 2\nfim\n")
+        self.assertIsNone(cache.load(self.main))
+
+    def test_compiler_changed(self):
+        cache.store(self.main, [self.dep], b"module", {})
+        with mock.patch.object(cache, "compiler_version", return_value="v2"):
+            self.assertIsNone(cache.load(self.main))
+
+    def test_cwd_changed(self):
+        cache.store(self.main, [self.dep], b"module", {})
+        self.chdir(self.root)
+        self.assertIsNone(cache.load(self.main))
+
+    def test_import_resolves_elsewhere(self):
+        # A module in the cwd hides the std lib module of the same name
+        mat = path.join(STD_LIB, "mat.ama")
+        self.chdir(self.root)
+        cache.store(self.main, [mat], b"module", {"mat.ama": mat})
+        self.assertEqual(cache.load(self.main), b"module")
+        self.write("mat.ama", "mostra 1\n")
+        self.assertIsNone(cache.load(self.main))
+
+    def test_program_run_from_another_dir(self):
+        main = self.write("prog/main.ama", 'usa "lib"\nmostra f()\n')
+        args = Namespace(file=main, debug=False, no_cache=False, jobs=1)
+        modules = []
+        for name, value in (("a", 1), ("b", 2)):
+            lib = self.write(
+                f"{name}/lib.ama", f"func f(): int\n retorna {value}\nfim\n"
+            )
+            self.chdir(path.dirname(lib))
+            modules.append(compile_file(args))
+        self.assertNotEqual(modules[0], modules[1])
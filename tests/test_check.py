@@ -0,0 +1,58 @@
+from os import path
+
+from amanda.check import check_programs, exit_code, expand_paths
+from tests.fixtures import SourceTestCase
+
+
+class TestCheck(SourceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.lib = self.write("lib.ama", "func f(): int\n    retorna 1\nfim\n")
+        usa = f'usa "{path.join(self.root, "lib")}" => lib\n'
+        self.main = self.write("main.ama", usa + "mostra lib.f()\n")
+        self.bad = self.write("bad.ama", "mostra x\n")
+
+    def test_expand_paths(self):
+        self.write("notes.txt", "")
+        self.assertEqual(
+            expand_paths([self.root]), [self.bad, self.lib, self.main]
+        )
+        pattern = path.join(self.root, "*")
+        self.assertEqual(
+            expand_paths([pattern, self.main]), [self.bad, self.lib, self.main]
+        )
+
+    def test_report(self):
+        report = check_programs([self.main, self.bad], jobs=1)
+        main, bad = report["programs"]
+        self.assertTrue(main["ok"])
+        self.assertEqual(
+            bad["errors"],
+            [
+                {
+                    "kind": "semantic",
+                    "file": self.bad,
+                    "line": 1,
+                    "col": -1,
+                    "message": "o identificador 'x' não foi declarado",
+                }
+            ],
+        )
+        self.assertEqual(report["summary"]["failed"], 1)
+        self.assertEqual(exit_code(report), 1)
+
+    def test_parallel(self):
+        programs = [self.main, self.bad, self.lib] * 4
+        serial = check_programs(programs, jobs=1)
+        parallel = check_programs(programs, jobs=2)
+        for report in (serial, parallel):
+            for result in report["programs"]:
+                del result["time_ms"]
+        self.assertEqual(serial["programs"], parallel["programs"])
+
+    def test_missing_file(self):
+        missing = path.join(self.root, "missing.ama")
+        report = check_programs([missing, self.lib], jobs=1)
+        self.assertEqual(report["programs"][0]["errors"][0]["kind"], "read")
+        self.assertEqual(exit_code(report), 1)
+        self.assertEqual(exit_code(check_programs([self.lib], jobs=1)), 0)
@@ -0,0 +1,191 @@
+import os
+import sys
+import tempfile
+from os import path
+from unittest import TestCase, mock
+
+from amanda.compiler import codegen
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.error import AmandaError
+from amanda.compiler.module import Module
+from amanda.compiler.opcode import OpCode
+from amanda.compiler.options import CompileOptions
+from amanda.libamanda import run_module
+from tests.fixtures import SourceTestCase
+
+
+class TestSuperinstructions(SourceTestCase):
+    def generate(
+        self, src: str, superinstructions: bool = True
+    ) -> tuple[ByteGen, bytes]:
+        filename = self.write("main.ama", src)
+        analyzer = Analyzer(filename, [], Module(filename))
+        module, imports = analyzer.visit_module(analyzer.load_program())
+        options = CompileOptions(superinstructions=superinstructions)
+        gen = ByteGen(module, options)
+        return gen, gen.compile(imports)
+
+    def compile(self, src: str, superinstructions: bool = True) -> list[OpCode]:
+        gen, _ = self.generate(src, superinstructions)
+        return [op for op, _ in gen.ops]
+
+    def run_error(self, src: str, superinstructions: bool = True) -> str:
+        """Runs a program and returns what the VM wrote to stderr."""
+        _, module_bin = self.generate(src, superinstructions)
+        sys.stderr.flush()
+        saved = os.dup(2)
+        with tempfile.TemporaryFile() as output:
+            os.dup2(output.fileno(), 2)
+            try:
+                run_module(module_bin)
+            finally:
+                os.dup2(saved, 2)
+                os.close(saved)
+            output.seek(0)
+            return output.read().decode()
+
+    def test_counted_para(self):
+        ops = self.compile("para i de 0..10 inc 2 faca\n    mostra i\nfim\n")
+        self.assertEqual(
+            ops,
+            [
+                OpCode.LOAD_CONST,
+                OpCode.SET_LOCAL,
+                OpCode.JUMP,
+                OpCode.GET_LOCAL,
+                OpCode.MOSTRA,
+                OpCode.INC_LOCAL_CONST,
+                OpCode.LOAD_CONST,
+                OpCode.LOCAL_LESS_JUMP_IF_TRUE,
+                OpCode.HALT,
+            ],
+        )
+
+    def test_other_para(self):
+        src = (
+            "func f(): int\n    retorna 3\nfim\n"
+            "para i de 0..f() faca\n    mostra i\nfim\n"
+        )
+        self.assertNotIn(OpCode.INC_LOCAL_CONST, self.compile(src))
+        ops = self.compile("para i de 0..10 faca\n    mostra i\nfim\n", False)
+        self.assertNotIn(OpCode.LOCAL_LESS_JUMP_IF_TRUE, ops)
+
+    def test_error_lines(self):
+        overflow = (
+            "x: int = 0\n"
+            "para i de 9223372036854775800..9223372036854775807 inc 5 faca\n"
+            "    x += 1\n"
+            "fim\n"
+        )
+        in_body = (
+            "x: int = 0\n"
+            "para i de 0..3 inc 1 faca\n"
+            "    x += 1\n"
+            "    mostra 1 / (x - 2)\n"
+            "fim\n"
+        )
+        for superinstructions in (True, False):
+            # Errors in the increment are reported on the line of the loop
+            self.assertIn(
+                "linha 2:", self.run_error(overflow, superinstructions)
+            )
+            self.assertIn(
+                "linha 4:", self.run_error(in_body, superinstructions)
+            )
+
+
+class TestCompactOperands(SourceTestCase):
+    def test_encoding(self):
+        gen = ByteGen(Module("main.ama"))
+        gen.labels[0] = 0x0102
+        jump = (OpCode.JUMP, (0,))
+        module_def = (OpCode.LOAD_MODULE_DEF, (1, 2))
+        self.assertEqual(
+            gen.write_op_bytes(jump), bytes([OpCode.JUMP.value, 0, 0, 1, 2])
+        )
+        self.assertEqual(
+            gen.write_op_bytes(module_def),
+            bytes([OpCode.LOAD_MODULE_DEF.value, 0, 1, 0, 2]),
+        )
+        gen = ByteGen(
+            Module("main.ama"), CompileOptions(compact_operands=False)
+        )
+        gen.labels[0] = 0x0102
+        self.assertEqual(
+            gen.write_op_bytes(jump),
+            bytes([OpCode.JUMP.value, 0, 0, 0, 0, 0, 0, 1, 2]),
+        )
+        self.assertEqual(len(gen.write_op_bytes(module_def)), 17)
+
+    def test_encode_ops(self):
+        for compact in (True, False):
+            options = CompileOptions(compact_operands=compact)
+            gen = ByteGen(Module("main.ama"), options)
+            gen.labels[0] = 7
+            gen.ops = [
+                (OpCode.LOAD_CONST, (3,)),
+                (OpCode.LOCAL_LESS_JUMP_IF_TRUE, (0, 1)),
+                (OpCode.LOAD_MODULE_DEF, (1, 2)),
+                (OpCode.HALT, ()),
+            ]
+            self.assertEqual(
+                gen.encode_ops(),
+                b"".join(gen.write_op_bytes(op) for op in gen.ops),
+            )
+
+    def test_too_many_modules(self):
+        filename = self.write(
+            "main.ama", 'usa "mat" => [abs]\nescrevaln(abs(-2))\n'
+        )
+        analyzer = Analyzer(filename, [], Module(filename))
+        module, imports = analyzer.visit_module(analyzer.load_program())
+        with mock.patch.object(codegen, "MAX_COMPACT_MODULE", 0):
+            gen = ByteGen(module)
+            module_bin = gen.compile(imports)
+        # Modules whose indices don't fit in compact operands use wide ones
+        self.assertFalse(gen.compact)
+        self.assertEqual(run_module(module_bin), 0)
+
+    def test_table_limit(self):
+        src = "".join(f"mostra {i}\n" for i in range(100))
+        filename = self.write("main.ama", src)
+        analyzer = Analyzer(filename, [], Module(filename))
+        module, imports = analyzer.visit_module(analyzer.load_program())
+        gen = ByteGen(module)
+        gen.compile(imports)
+        # Room for every name but not for every constant
+        limit = len(gen.names)
+        self.assertLess(limit, len(gen.constants))
+        with mock.patch.object(codegen, "MAX_TABLE_INDEX", limit - 1):
+            with self.assertRaises(AmandaError) as ctx:
+                ByteGen(module).compile(imports)
+        self.assertIn(f"limite de {limit} constantes", ctx.exception.message)
+        self.assertEqual(ctx.exception.line, limit - 1)
+
+
+class TestConstants(TestCase):
+    def test_typed_constants(self):
+        with tempfile.TemporaryDirectory() as root:
+            filename = path.join(root, "main.ama")
+            with open(filename, "w", encoding="utf8") as src_file:
+                src_file.write(
+                    'x: int = 1\nmostra x\nmostra 1.0\nmostra "1"\n'
+                    'mostra f"007{x}"\nmostra nulo\n'
+                )
+            analyzer = Analyzer(filename, [], Module(filename))
+            module, imports = analyzer.visit_module(analyzer.load_program())
+        gen = ByteGen(module)
+        gen.compile(imports)
+        self.assertEqual(
+            [(type(const), const) for const in gen.constants],
+            [
+                (bool, True),
+                (bool, False),
+                (int, 1),
+                (float, 1.0),
+                (str, "1"),
+                (str, "007"),
+                (type(None), None),
+            ],
+        )
@@ -0,0 +1,56 @@
+import amanda.compiler.ast as ast
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.module import Module
+from tests.fixtures import SourceTestCase
+
+
+class TestDeadCode(SourceTestCase):
+    def analyze(self, src: str) -> ast.Module:
+        filename = self.write("main.ama", src)
+        analyzer = Analyzer(filename, [], Module(filename))
+        module, _ = analyzer.visit_module(analyzer.load_program())
+        return module.ast
+
+    def test_constant_conditions(self):
+        program = self.analyze(
+            "se 1 > 2 entao\n    mostra 1\nsenao\n    mostra 2\nfim\n"
+            "enquanto falso faca\n    mostra 3\nfim\n"
+            "se falso entao\n    mostra 4\nfim\n"
+        )
+        self.assertEqual(len(program.children), 1)
+        self.assertIsInstance(program.children[0], ast.Block)
+
+    def test_code_after_return(self):
+        program = self.analyze(
+            "func f(): int\n    retorna 1\n    mostra 2\nfim\nmostra f()\n"
+        )
+        func = program.children[0]
+        self.assertEqual(len(func.block.children), 1)
+
+    def test_repeated_cases(self):
+        program = self.analyze(
+            "x: int = 1\n"
+            "escolha x:\n"
+            "    caso 1:\n        mostra 1\n"
+            "    caso 1:\n        mostra 2\n"
+            "    caso 2:\n        mostra 3\n"
+            "fim\n"
+        )
+        se = program.children[1]
+        self.assertIsInstance(se, ast.Se)
+        self.assertEqual(len(se.elsif_branches), 1)
+
+    def test_unused_functions(self):
+        program = self.analyze(
+            "func b(): int\n    retorna 1\nfim\n"
+            "func a(): int\n    retorna b()\nfim\n"
+            "func c(): int\n    retorna c()\nfim\n"
+            "mostra a()\n"
+        )
+        names = [
+            child.name.lexeme
+            for child in program.children
+            if isinstance(child, ast.FunctionDecl)
+        ]
+        self.assertEqual(names, ["b", "a"])
+        self.assertIsNone(program.symbols.symbols.get("c"))
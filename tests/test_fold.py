@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from amanda.compiler import fold
+from amanda.compiler.tokens import Token, TokenType as TT
+
+
+class TestFold(TestCase):
+    def test_literal_values(self):
+        literal = lambda tt, lexeme: fold.literal_value(Token(tt, lexeme, 1, 1))
+        self.assertEqual(literal(TT.INTEGER, 42), 42)
+        self.assertEqual(literal(TT.REAL, 2.5), 2.5)
+        self.assertIs(literal(TT.VERDADEIRO, "verdadeiro"), True)
+        self.assertIs(literal(TT.FALSO, "falso"), False)
+        self.assertEqual(literal(TT.STRING, '"abc"'), "abc")
+        self.assertEqual(literal(TT.STRING, '"1"'), "1")
+        self.assertIsNone(literal(TT.NULO, "nulo"))
+        # The VM loads integers that don't fit in an i64 as reals
+        self.assertEqual(literal(TT.INTEGER, 2**63), float(2**63))
+
+    def test_arithmetic(self):
+        self.assertEqual(fold.binop(TT.STAR, 60, 60), 3600)
+        self.assertEqual(fold.binop(TT.PLUS, 1, 0.5), 1.5)
+        self.assertEqual(fold.binop(TT.SLASH, 7, 2), 3.5)
+        self.assertEqual(fold.binop(TT.DOUBLESLASH, -7, 2), -3)
+        self.assertEqual(fold.binop(TT.MODULO, -7, 2), -1)
+        self.assertEqual(fold.binop(TT.MODULO, 7.5, -2), 1.5)
+
+    def test_runtime_errors_are_not_folded(self):
+        self.assertIsNone(fold.binop(TT.PLUS, fold.I64_MAX, 1))
+        self.assertIsNone(fold.binop(TT.STAR, 2**62, 2))
+        self.assertIsNone(fold.binop(TT.MINUS, fold.I64_MIN, 1))
+        self.assertIsNone(fold.binop(TT.DOUBLESLASH, fold.I64_MIN, -1))
+        self.assertIsNone(fold.binop(TT.MODULO, fold.I64_MIN, -1))
+        self.assertIsNone(fold.binop(TT.SLASH, 1, 0))
+        self.assertIsNone(fold.binop(TT.MODULO, 1.5, 0.0))
+        self.assertIsNone(fold.unaryop(TT.MINUS, fold.I64_MIN))
+
+    def test_comparisons(self):
+        self.assertIs(fold.binop(TT.GREATER, 2, 1.5), True)
+        self.assertIs(fold.binop(TT.DOUBLEEQUAL, 1, 1.0), True)
+        self.assertIs(fold.binop(TT.NOTEQUAL, "a", "b"), True)
+        self.assertIs(fold.binop(TT.E, True, False), False)
+        self.assertIs(fold.unaryop(TT.NAO, False), True)
+        # Not supported by the VM
+        self.assertIsNone(fold.binop(TT.PLUS, "a", "b"))
+        self.assertIsNone(fold.binop(TT.LESS, "a", "b"))
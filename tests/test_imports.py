@@ -0,0 +1,62 @@
+from os import path
+from unittest import mock
+
+import amanda.compiler.ast as ast
+from amanda.compiler import imports
+from amanda.compiler.error import AmandaError
+from amanda.compiler.imports import (
+    MIN_PARALLEL_MODULES,
+    MemoryResolver,
+    import_graph,
+    parse_modules,
+)
+from amanda.config import STD_LIB
+from tests.fixtures import SourceTestCase
+
+
+class TestImports(SourceTestCase):
+    def usa(self, name, alias=None):
+        stmt = f'usa "{path.join(self.root, name)}"'
+        return f"{stmt} => {alias}\n" if alias else f"{stmt}\n"
+
+    def test_import_graph(self):
+        main = self.write("main.ama", self.usa("a") + self.usa("b", "b"))
+        a = self.write("a.ama", self.usa("b") + "mostra 1\n")
+        b = self.write("b.ama", "mostra 2\n")
+        self.assertEqual(import_graph(main, []), {main: [a, b], b: [], a: [b]})
+
+    def test_unresolved_import(self):
+        main = self.write("main.ama", self.usa("missing"))
+        self.assertEqual(import_graph(main, []), {main: []})
+
+    def test_parse_errors_are_deferred(self):
+        good = self.write("good.ama", "mostra 1\n")
+        bad = self.write("bad.ama", "mostra (\n")
+        for workers in (1, 2):
+            parsed = parse_modules([good, bad] * 4, workers)
+            self.assertIsInstance(parsed[good], ast.Module)
+            self.assertIsInstance(parsed[bad], AmandaError)
+            self.assertEqual(parsed[bad].fpath, bad)
+
+    def test_parsed_in_process_by_default(self):
+        modules = [
+            self.write(f"mod{i}.ama", f"mostra {i}\n")
+            for i in range(2 * MIN_PARALLEL_MODULES)
+        ]
+        with mock.patch.object(imports, "ProcessPoolExecutor") as pool:
+            parsed = parse_modules(modules)
+        pool.assert_not_called()
+        self.assertEqual(list(parsed), modules)
+
+    def test_memory_resolver(self):
+        main, a = path.abspath("main.ama"), path.join(self.root, "a.ama")
+        resolver = MemoryResolver({"main.ama": self.usa("a"), a: "mostra 1\n"})
+        self.assertEqual(
+            import_graph("main.ama", [], None, resolver), {main: [a], a: []}
+        )
+        self.assertEqual(resolver.resolve("a.ama", [self.root]), a)
+        mat = path.abspath(path.join(STD_LIB, "mat.ama"))
+        self.assertEqual(resolver.resolve("mat.ama", [STD_LIB]), mat)
+        self.assertIsNone(resolver.resolve("../setup.py", [STD_LIB]))
+        with self.assertRaises(FileNotFoundError):
+            resolver.read(self.write("b.ama", "mostra 2\n"))
@@ -0,0 +1,40 @@
+import re
+from os import path
+from unittest import TestCase
+
+from amanda.compiler.opcode import (
+    COMPACT_OP_SIZES,
+    OP_SIZE,
+    OP_SIZES,
+    OpCode,
+    op_sizes,
+)
+from amanda.config import PROJECT_ROOT
+
+
+class TestOpSizes(TestCase):
+    def test_tables(self):
+        num_ops = len(OpCode)
+        self.assertEqual(
+            num_ops,
+            48,
+            f"Please update the size of ops after adding a new Op. New size: {num_ops}",
+        )
+        for compact, table in ((False, OP_SIZES), (True, COMPACT_OP_SIZES)):
+            self.assertIs(op_sizes(compact), table)
+            self.assertEqual(set(table), set(OpCode))
+            for op in OpCode:
+                self.assertEqual(
+                    table[op], 1 + sum(op.arg_sizes(compact)), op.name
+                )
+                self.assertEqual(op.op_size(compact), OP_SIZE * table[op])
+
+    def test_vm_ops(self):
+        # The VM declares the same ops
+        rs_file = path.join(PROJECT_ROOT, "amanda", "vm", "src", "opcode.rs")
+        with open(rs_file, encoding="utf8") as src:
+            enum_body = re.search(
+                r"pub enum OpCode \{(.*?)\}", src.read(), re.S
+            )
+        variants = re.findall(r"^\s*(\w+)", enum_body.group(1), re.M)
+        self.assertEqual(len(variants), len(OpCode))
@@ -408,6 +408,14 @@ class LexerTestCase(unittest.TestCase):
         self.buffer.seek(0)
         self.assertRaises(AmandaError, self.lexer.get_token)
 
+    def test_tokenize(self):
+        src = "var x: int = 12 + 3.5\nmostra x\n"
+        tokens = Lexer("", src).tokenize()
+        lexer = Lexer("", src)
+        for token in tokens:
+            self.assertEqual(token, lexer.get_token())
+        self.assertEqual(tokens[-1].token, Lexer.EOF)
+
 
 class ParserTestCase(unittest.TestCase):
     def setUp(self):
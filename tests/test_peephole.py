@@ -0,0 +1,117 @@
+from unittest import TestCase
+
+from amanda.compiler.opcode import OpCode
+from amanda.compiler.peephole import Peephole
+
+
+class TestPeephole(TestCase):
+    def test_not_before_jump(self):
+        # 0: LOAD_CONST 0, 3: OP_NOT, 4: JUMP_IF_FALSE 0, 13: HALT
+        ops = [
+            (OpCode.LOAD_CONST, (0,)),
+            (OpCode.OP_NOT, ()),
+            (OpCode.JUMP_IF_FALSE, (0,)),
+            (OpCode.HALT, ()),
+        ]
+        optimizer = Peephole(ops, {0: 13}, [])
+        self.assertEqual(
+            optimizer.optimize(),
+            [
+                (OpCode.LOAD_CONST, (0,)),
+                (OpCode.JUMP_IF_TRUE, (0,)),
+                (OpCode.HALT, ()),
+            ],
+        )
+        self.assertEqual(optimizer.relocate(13), 12)
+
+    def test_set_then_get(self):
+        ops = [
+            (OpCode.LOAD_CONST, (0,)),
+            (OpCode.SET_LOCAL, (1,)),
+            (OpCode.GET_LOCAL, (1,)),
+            (OpCode.MOSTRA, ()),
+            (OpCode.SET_GLOBAL, (2,)),
+            (OpCode.GET_GLOBAL, (3,)),
+            (OpCode.HALT, ()),
+        ]
+        self.assertEqual(
+            Peephole(ops, {}, []).optimize(),
+            [
+                (OpCode.LOAD_CONST, (0,)),
+                (OpCode.DUP, ()),
+                (OpCode.SET_LOCAL, (1,)),
+                (OpCode.MOSTRA, ()),
+                (OpCode.SET_GLOBAL, (2,)),
+                (OpCode.GET_GLOBAL, (3,)),
+                (OpCode.HALT, ()),
+            ],
+        )
+        # A jump lands between both ops
+        ops = ops[:3] + [(OpCode.JUMP, (0,))]
+        self.assertEqual(Peephole(ops, {0: 6}, []).optimize(), ops)
+
+    def test_jumps(self):
+        # Jumps to a jump, to the next op and to unreachable code
+        ops = [
+            (OpCode.LOAD_CONST, (0,)),
+            (OpCode.JUMP_IF_FALSE, (0,)),
+            (OpCode.JUMP, (1,)),
+            (OpCode.JUMP, (2,)),
+            (OpCode.MOSTRA, ()),
+            (OpCode.HALT, ()),
+        ]
+        labels = {0: 21, 1: 30, 2: 31}
+        optimizer = Peephole(ops, labels, [])
+        self.assertEqual(
+            optimizer.optimize(),
+            [
+                (OpCode.LOAD_CONST, (0,)),
+                (OpCode.JUMP_IF_FALSE, (2,)),
+                (OpCode.MOSTRA, ()),
+                (OpCode.HALT, ()),
+            ],
+        )
+        self.assertEqual(
+            [optimizer.relocate(labels[i]) for i in labels], [12, 12, 13]
+        )
+
+    def test_unreachable_code(self):
+        # A function that returns before its default return
+        ops = [
+            (OpCode.JUMP, (0,)),
+            (OpCode.LOAD_CONST, (1,)),
+            (OpCode.RETURN, ()),
+            (OpCode.LOAD_CONST, (0,)),
+            (OpCode.RETURN, ()),
+            (OpCode.HALT, ()),
+        ]
+        optimizer = Peephole(ops, {0: 17, 1: 9}, [9])
+        self.assertEqual(
+            optimizer.optimize(),
+            [
+                (OpCode.JUMP, (0,)),
+                (OpCode.LOAD_CONST, (1,)),
+                (OpCode.RETURN, ()),
+                (OpCode.HALT, ()),
+            ],
+        )
+        self.assertEqual(optimizer.relocate(9), 9)
+        self.assertEqual(optimizer.relocate(17), 13)
+        self.assertEqual(optimizer.relocate_end(16), 12)
+
+    def test_fused_locals(self):
+        ops = [
+            (OpCode.GET_LOCAL, (0,)),
+            (OpCode.GET_LOCAL, (1,)),
+            (OpCode.OP_ADD, ()),
+            (OpCode.HALT, ()),
+        ]
+        self.assertEqual(
+            Peephole(ops, {}, []).optimize(),
+            [
+                (OpCode.GET_LOCAL_GET_LOCAL, (0, 1)),
+                (OpCode.OP_ADD, ()),
+                (OpCode.HALT, ()),
+            ],
+        )
+        self.assertEqual(Peephole(ops, {}, [], False).optimize(), ops)
@@ -0,0 +1,117 @@
+from os import path
+from unittest import mock
+
+from amanda import AmandaRuntime
+from amanda.compiler import imports
+from amanda.compiler.error import AmandaError
+from amanda.compiler.options import CompileOptions
+from tests.fixtures import SourceTestCase
+
+
+class TestRuntime(SourceTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.runtime = AmandaRuntime()
+
+    def test_compile_source(self):
+        module_bin = self.runtime.compile(source="x: int = 1 + 2\n")
+        self.assertEqual(module_bin[:4], b"AMAB")
+        self.assertEqual(self.runtime.run(module_bin), 0)
+
+    def test_source_matches_file(self):
+        text = (
+            "func dobro(x: int): int\n retorna x * 2\nfim\ny: int = dobro(2)\n"
+        )
+        main = self.write("main.ama", text)
+        self.assertEqual(
+            self.runtime.compile(main),
+            self.runtime.compile(main, source=text),
+        )
+
+    def test_compiled_once(self):
+        main = self.write("main.ama", "x: int = 1\n")
+        module_bin = self.runtime.compile(main)
+        self.assertIs(self.runtime.compile(main), module_bin)
+
+    def test_import_changed(self):
+        dep = self.write("dep.ama", "func f(): int\n retorna 1\nfim\n")
+        main = self.write("main.ama", f'usa "{dep}"\nx: int = f()\n')
+        module_bin = self.runtime.compile(main)
+        self.write("dep.ama", "func f(): int\n retorna 2\nfim\n")
+        self.assertNotEqual(self.runtime.compile(main), module_bin)
+
+    def test_compiled_from_another_cwd(self):
+        main = self.write("prog/main.ama", 'usa "lib"\nx: int = f()\n')
+        modules = []
+        for name, value in (("a", 1), ("b", 2)):
+            lib = self.write(
+                f"{name}/lib.ama", f"func f(): int\n retorna {value}\nfim\n"
+            )
+            self.chdir(path.dirname(lib))
+            modules.append(self.runtime.compile(main))
+        self.assertNotEqual(modules[0], modules[1])
+
+    def test_errors_are_raised(self):
+        with self.assertRaises(AmandaError):
+            self.runtime.compile(source="x: int = verdadeiro\n")
+        # The runtime can still be used after an invalid program
+        self.assertEqual(self.runtime.run(self.runtime.compile(source="")), 0)
+
+    def test_filename_or_source(self):
+        with self.assertRaises(TypeError):
+            self.runtime.compile()
+
+    def test_options(self):
+        src = "x: int = 1 + 2\n"
+        folded = self.runtime.compile(source=src)
+        runtime = AmandaRuntime(options=CompileOptions(fold_constants=False))
+        unfolded = runtime.compile(source=src)
+        self.assertLess(len(folded), len(unfolded))
+        # Each runtime keeps its own options
+        self.assertEqual(AmandaRuntime().compile(source=src), folded)
+
+    def test_compile_source_from_memory(self):
+        files = {
+            "lib/util.ama": "func dobro(x: int): int\n retorna x * 2\nfim\n"
+        }
+        result = self.runtime.compile_source(
+            'usa "lib/util"\nusa "mat"\nx: int = dobro(2)\n',
+            "servico/main.ama",
+            files,
+        )
+        self.assertEqual(result.errors, [])
+        self.assertEqual(self.runtime.run(result.module_bin), 0)
+
+    def test_compile_source_errors(self):
+        result = self.runtime.compile_source(
+            "x: int = verdadeiro\n", "main.ama"
+        )
+        self.assertIsNone(result.module_bin)
+        [error] = result.errors
+        self.assertEqual(
+            (error.err_type, error.fpath, error.line),
+            (AmandaError.COMMON_ERR, "main.ama", 1),
+        )
+
+    def test_compile_source_import_errors(self):
+        files = {"util.ama": "mostra (\n"}
+        result = self.runtime.compile_source('usa "util"\n', "main.ama", files)
+        [error] = result.errors
+        self.assertEqual(error.err_type, AmandaError.SYNTAX_ERR)
+        self.assertEqual(error.fpath, path.abspath("util.ama"))
+
+    def test_memory_imports_stay_in_memory(self):
+        # Modules outside of the map are never read from the disk
+        dep = self.write("dep.ama", "func f(): int\n retorna 1\nfim\n")
+        result = self.runtime.compile_source(f'usa "{dep}"\n', "main.ama", {})
+        self.assertIsNone(result.module_bin)
+        self.assertEqual(len(result.errors), 1)
+
+    def test_imports_parsed_in_process(self):
+        libs = [
+            self.write(f"lib{i}.ama", f"x{i}: int = {i}\n") for i in range(8)
+        ]
+        main = self.write("main.ama", "".join(f'usa "{lib}"\n' for lib in libs))
+        with mock.patch.object(imports, "ProcessPoolExecutor") as pool:
+            self.runtime.compile(main)
+        pool.assert_not_called()
@@ -1,6 +1,50 @@
+from io import BytesIO
+from os import path
+from typing import Any
 from unittest import TestCase
 
-from amanda.compiler.bindump import dumps, into_bson_int32, into_int32
+from amanda.compiler.bindump import (
+    dumps,
+    into_bson_f64,
+    into_bson_int32,
+    into_bson_int64,
+    into_int32,
+)
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.module import Module
+from amanda.config import PROJECT_ROOT
+
+
+def reference_dumps(data: dict[str, Any]) -> bytes:
+    """The previous writer, which dumps every nested document on its
+    own and copies it into the document that holds it."""
+    e_list = BytesIO()
+    for key, value in data.items():
+        name = key.encode() + b"\x00"
+        val_t = type(value)
+        if val_t == float:
+            e_list.write(b"\x01" + name + into_bson_f64(value))
+        elif val_t == str:
+            str_bytes = value.encode()
+            e_list.write(b"\x02" + name + into_bson_int32(len(str_bytes)))
+            e_list.write(str_bytes + b"\x00")
+        elif val_t == dict:
+            e_list.write(b"\x03" + name + reference_dumps(value))
+        elif val_t == list:
+            arr_obj = {str(i): val for i, val in enumerate(value)}
+            e_list.write(b"\x04" + name + reference_dumps(arr_obj))
+        elif val_t == bytes:
+            e_list.write(b"\x05" + name + into_bson_int32(len(value)))
+            e_list.write(b"\x80" + value)
+        elif val_t == int:
+            e_list.write(b"\x12" + name + into_bson_int64(value))
+        elif val_t == bool:
+            e_list.write(b"\x08" + name + bytes([value]))
+        elif value is None:
+            e_list.write(b"\x0a" + name)
+    elements = e_list.getvalue()
+    return into_bson_int32(len(elements)) + elements + b"\x00"
 
 
 class TestSerialize(TestCase):
@@ -33,3 +77,38 @@ class TestSerialize(TestCase):
         doc = {"credit": 100.50}
         ser_doc = dumps(doc)
         print("F64: ", [int(byte) for byte in ser_doc])
+
+    def test_known_bytes(self):
+        # Documents read by the tests of the VM's loader
+        self.assertEqual(
+            list(dumps({"age": 100})),
+            [13, 0, 0, 0, 18, 97, 103, 101, 0, 100, 0, 0, 0, 0, 0, 0, 0, 0],
+        )
+        self.assertEqual(
+            list(dumps({"bytes": bytes([0, 1, 1, 2, 3, 255])})),
+            [18, 0, 0, 0, 5, 98, 121, 116, 101, 115, 0, 6, 0, 0, 0, 128]
+            + [0, 1, 1, 2, 3, 255, 0],
+        )
+        self.assertEqual(
+            list(dumps({"ok": True, "none": None})),
+            [11, 0, 0, 0, 8, 111, 107, 0, 1, 10, 110, 111, 110, 101, 0, 0],
+        )
+
+    def test_same_bytes(self):
+        docs = [
+            {},
+            {"user": {"name": "João Boris", "age": 28, "balance": 1000.52}},
+            {"names": ["João Boris", "Some other dude"], "empty": []},
+            {"nested": [[1, [2.5, {"a": [None, True]}]], {"b": b"\x00"}]},
+        ]
+        for doc in docs:
+            self.assertEqual(dumps(doc), reference_dumps(doc))
+
+    def test_same_bytes_module(self):
+        filename = path.join(
+            PROJECT_ROOT, "tests", "test_cases", "registo", "normal_registo.ama"
+        )
+        analyzer = Analyzer(filename, [], Module(filename))
+        module, imports = analyzer.visit_module(analyzer.load_program())
+        compiled = ByteGen(module).compile(imports, raw=False)
+        self.assertEqual(dumps(compiled), reference_dumps(compiled))
@@ -0,0 +1,53 @@
+from os import path
+from unittest import mock
+
+import amanda.compiler.ast as ast
+from amanda.compiler import stdbundle
+from amanda.compiler.parse import parse
+from amanda.config import STD_LIB
+from tests.fixtures import SourceTestCase
+
+
+class TestStdBundle(SourceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.bundle = path.join(self.root, "std.bundle")
+        stdbundle.build_bundle(self.bundle)
+        self.mat = path.join(STD_LIB, "mat.ama")
+        with open(self.mat, encoding="utf-8") as src_file:
+            self.source = src_file.read()
+
+    def test_load(self):
+        program = stdbundle.load_module(self.mat, self.source, self.bundle)
+        self.assertIsInstance(program, ast.Module)
+        parsed = parse(self.mat, self.source)
+        self.assertEqual(
+            [type(child) for child in program.children],
+            [type(child) for child in parsed.children],
+        )
+        self.assertIs(program.children[0].parent, program)
+
+    def test_new_tree_per_load(self):
+        first = stdbundle.load_module(self.mat, self.source, self.bundle)
+        second = stdbundle.load_module(self.mat, self.source, self.bundle)
+        self.assertIsNot(first, second)
+
+    def test_source_changed(self):
+        source = self.source + "mostra 1\n"
+        self.assertIsNone(stdbundle.load_module(self.mat, source, self.bundle))
+
+    def test_not_in_std_lib(self):
+        mat = self.write("mat.ama", self.source)
+        self.assertIsNone(stdbundle.load_module(mat, self.source, self.bundle))
+
+    def test_compiler_changed(self):
+        bundle = path.join(self.root, "old.bundle")
+        with mock.patch.object(
+            stdbundle, "compiler_version", return_value="v0"
+        ):
+            stdbundle.build_bundle(bundle)
+        self.assertIsNone(stdbundle.load_module(self.mat, self.source, bundle))
+
+    def test_missing_bundle(self):
+        bundle = path.join(self.root, "missing.bundle")
+        self.assertIsNone(stdbundle.load_module(self.mat, self.source, bundle))
@@ -0,0 +1,38 @@
+import argparse
+import difflib
+import sys
+from amanda.compiler.check.core import Analyzer
+from amanda.compiler.codegen import ByteGen
+from amanda.compiler.error import AmandaError, throw_error
+from amanda.compiler.module import Module
+from amanda.compiler.options import CompileOptions
+
+
+def disassemble(filename: str, optimize: bool) -> list[str]:
+    try:
+        analyzer = Analyzer(filename, [], Module(filename))
+        module, imports = analyzer.visit_module(analyzer.load_program())
+    except AmandaError as e:
+        throw_error(e)
+    compiler = ByteGen(module, CompileOptions(peephole=optimize))
+    compiler.compile(imports)
+    return compiler.make_debug_asm().splitlines(keepends=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Shows the changes made by the peephole optimizer to "
+        "the disassembled code of a program"
+    )
+    parser.add_argument("file", help="source file to be compiled")
+    args = parser.parse_args()
+
+    before = disassemble(args.file, False)
+    after = disassemble(args.file, True)
+    sys.stdout.writelines(
+        difflib.unified_diff(before, after, "unoptimized", "optimized")
+    )
+
+
+if __name__ == "__main__":
+    main()
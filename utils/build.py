@@ -18,6 +18,12 @@ def main():
         help="Build vm lib with release flag",
         action="store_true",
     )
+    parser.add_argument(
+        "--op-count",
+        help="Count the ops run by the VM, for the benchmarks that "
+        "report them",
+        action="store_true",
+    )
     args = parser.parse_args()
 
     os.environ["RUST_BACKTRACE"] = "1"
@@ -25,6 +31,8 @@ def main():
     if args.release:
         print("Bulding VM lib with release optimizations.")
         main_args.append("--release")
+    if args.op_count:
+        main_args.extend(["--features", "op-count"])
 
     return_code = subprocess.call(
         [*main_args, "--manifest-path", VM_CONFIG],
@@ -34,6 +42,10 @@ def main():
     if return_code != 0:
         subprocess.call(["cargo", "check", "--manifest-path", VM_CONFIG])
         sys.exit(1)
+    # Ship the std lib parsed, see amanda.compiler.stdbundle
+    subprocess.run(
+        [sys.executable, "-m", "amanda.compiler.stdbundle"], check=True
+    )
 
 
 if __name__ == "__main__":